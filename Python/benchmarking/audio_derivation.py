@@ -0,0 +1,277 @@
+from time import perf_counter
+from typing import List, Dict, Tuple, Union
+import numpy as np
+from tdw.flatbuffers.builder import Builder
+from tdw.FBOutput import SegmentationColors as Segm
+from tdw.FBOutput import StaticRigidbodies as Srig
+from tdw.FBOutput import Bounds as Boun
+from tdw.backend.fake_build import FakeBuild
+from tdw.response import Response
+from tdw.add_ons.py_impact import PyImpact
+from tdw.add_ons.clatter import Clatter
+from tdw.physics_audio.audio_material import AudioMaterial
+from tdw.physics_audio.impact_material import ImpactMaterial
+from tdw.physics_audio.object_audio_static import ObjectAudioStatic, DEFAULT_OBJECT_AUDIO_STATIC_DATA
+from tdw.physics_audio.clatter_object import ClatterObject, DEFAULT_OBJECTS
+
+
+"""
+Check that PyImpact and Clatter derive the same audio values for unknown models as the original O(n^2) derivation, and compare the speed of the two.
+
+Each scene is real `SegmentationColors`, `StaticRigidbodies`, and `Bounds` output data. The scenes cover override data, default audio data, unknown models (which are derived from objects in the same category), and scenes without any known models (which are derived from the default values).
+
+An object is always in its own category, so the mass fallback can't be reached from output data. It is checked directly against the original scan, including masses at exactly 1.5 times the object's mass, the adjacent floats, and negative masses.
+
+This doesn't require a build.
+"""
+
+
+# Audio values: amp, material, resonance.
+Values = Tuple[float, Union[AudioMaterial, ImpactMaterial], float]
+
+
+class Scene:
+    """
+    A randomly generated scene.
+    """
+
+    def __init__(self, seed: int, num_objects: int, known_models: bool = True, num_overrides: int = 10):
+        rng = np.random.RandomState(seed)
+        self.ids: List[int] = [int(i) for i in rng.choice(10 ** 6, size=num_objects, replace=False)]
+        self.names: List[str] = list()
+        default_names: List[str] = list(DEFAULT_OBJECT_AUDIO_STATIC_DATA.keys()) + list(DEFAULT_OBJECTS.keys())
+        for i in range(num_objects):
+            if known_models and rng.random_sample() < 0.5:
+                self.names.append(default_names[rng.randint(len(default_names))])
+            else:
+                self.names.append(f"unknown_{rng.randint(50)}")
+        self.categories: List[str] = [f"category_{rng.randint(8)}" for _ in range(num_objects)]
+        self.masses: np.ndarray = np.round(rng.lognormal(0, 1.5, size=num_objects), 3).astype(np.float32)
+        self.extents: np.ndarray = rng.uniform(0.05, 3, size=(num_objects, 3))
+        override_ids: List[int] = self.ids[::max(1, num_objects // max(1, num_overrides))][:num_overrides]
+        self.py_impact_overrides: Dict[int, Tuple[AudioMaterial, float, float]] = dict()
+        self.clatter_overrides: Dict[int, Tuple[ImpactMaterial, float, float]] = dict()
+        for i, object_id in enumerate(override_ids):
+            self.py_impact_overrides[object_id] = (list(AudioMaterial)[i % 5], 0.05 * (i % 9 + 1), 0.1 * (i % 7 + 1))
+            self.clatter_overrides[object_id] = (list(ImpactMaterial)[i % 5], 0.05 * (i % 9 + 1), 0.1 * (i % 7 + 1))
+
+    def get_response(self) -> Response:
+        """
+        :return: The scene's static output data.
+        """
+
+        return Response(resp=[self._get_segmentation_colors(), self._get_static_rigidbodies(), self._get_bounds(),
+                              (0).to_bytes(4, byteorder="big")])
+
+    def _get_segmentation_colors(self) -> bytes:
+        builder = Builder(0)
+        colors = FakeBuild._create_vector(builder, np.zeros(len(self.ids) * 3, dtype=np.int32))
+        categories = Scene._create_string_vector(builder, self.categories)
+        names = Scene._create_string_vector(builder, self.names)
+        ids = FakeBuild._create_vector(builder, np.array(self.ids, dtype=np.int32))
+        Segm.SegmentationColorsStart(builder)
+        Segm.SegmentationColorsAddIds(builder, ids)
+        Segm.SegmentationColorsAddNames(builder, names)
+        Segm.SegmentationColorsAddCategories(builder, categories)
+        Segm.SegmentationColorsAddColors(builder, colors)
+        return FakeBuild._finish(builder, Segm.SegmentationColorsEnd(builder), "segm")
+
+    def _get_static_rigidbodies(self) -> bytes:
+        builder = Builder(0)
+        # Mass, dynamic friction, static friction, bounciness.
+        physics_values = np.zeros(shape=(len(self.ids), 4), dtype=np.float32)
+        physics_values[:, 0] = self.masses
+        physics_values[:, 3] = 0.5
+        kinematic = FakeBuild._create_vector(builder, np.zeros(len(self.ids), dtype=np.uint8))
+        physics_values = FakeBuild._create_vector(builder, physics_values.flatten())
+        ids = FakeBuild._create_vector(builder, np.array(self.ids, dtype=np.int32))
+        Srig.StaticRigidbodiesStart(builder)
+        Srig.StaticRigidbodiesAddIds(builder, ids)
+        Srig.StaticRigidbodiesAddPhysicsValues(builder, physics_values)
+        Srig.StaticRigidbodiesAddKinematic(builder, kinematic)
+        return FakeBuild._finish(builder, Srig.StaticRigidbodiesEnd(builder), "srig")
+
+    def _get_bounds(self) -> bytes:
+        builder = Builder(0)
+        # Front, back, left, right, top, bottom, center.
+        positions = np.zeros(shape=(len(self.ids), 7, 3), dtype=np.float32)
+        positions[:, 0, 2] = self.extents[:, 2] / 2
+        positions[:, 1, 2] = -self.extents[:, 2] / 2
+        positions[:, 2, 0] = -self.extents[:, 0] / 2
+        positions[:, 3, 0] = self.extents[:, 0] / 2
+        positions[:, 4, 1] = self.extents[:, 1]
+        bound_positions = FakeBuild._create_vector(builder, positions.flatten())
+        ids = FakeBuild._create_vector(builder, np.array(self.ids, dtype=np.int32))
+        Boun.BoundsStart(builder)
+        Boun.BoundsAddIds(builder, ids)
+        Boun.BoundsAddBoundPositions(builder, bound_positions)
+        return FakeBuild._finish(builder, Boun.BoundsEnd(builder), "boun")
+
+    @staticmethod
+    def _create_string_vector(builder: Builder, strings: List[str]) -> int:
+        offsets = [builder.CreateString(s) for s in strings]
+        builder.StartVector(4, len(offsets), 4)
+        for offset in reversed(offsets):
+            builder.PrependUOffsetTRelative(offset)
+        return builder.EndVector(len(offsets))
+
+
+def derive_original(resp: Response, known: Dict[str, Values], overrides: Dict[int, Values], default: Values) -> Dict[int, Values]:
+    """
+    The original O(n^2) derivation in `PyImpact` and `Clatter`.
+
+    :param resp: The static output data.
+    :param known: Audio values per model name.
+    :param overrides: Audio values per object ID.
+    :param default: The default audio values.
+
+    :return: The audio values of each object. Key = The object ID.
+    """
+
+    names: Dict[int, str] = dict()
+    categories: Dict[int, str] = dict()
+    object_masses: Dict[int, float] = dict()
+    for segm in resp.get_output_data("segm"):
+        for j in range(segm.get_num()):
+            names[segm.get_object_id(j)] = segm.get_object_name(j).lower()
+            categories[segm.get_object_id(j)] = segm.get_object_category(j)
+    for srig in resp.get_output_data("srig"):
+        for j in range(srig.get_num()):
+            object_masses[srig.get_id(j)] = srig.get_mass(j)
+    values: Dict[int, Values] = dict()
+    need_to_derive: List[int] = list()
+    for object_id in names:
+        if object_id in overrides:
+            values[object_id] = overrides[object_id]
+        elif names[object_id] in known:
+            values[object_id] = known[names[object_id]]
+        else:
+            need_to_derive.append(object_id)
+    current_values = list(values.values())
+    derived: Dict[int, Values] = dict()
+    for object_id in need_to_derive:
+        objects_in_same_category = [o for o in categories if categories[o] == categories[object_id]]
+        if len(objects_in_same_category) > 0:
+            similar = current_values
+        else:
+            similar = [values[m_id] for m_id in similar_mass_ids_original(object_id=object_id,
+                                                                          object_masses=object_masses,
+                                                                          object_ids=values.keys())]
+        if len(similar) == 0:
+            derived[object_id] = default
+        else:
+            materials = [s[1] for s in similar]
+            derived[object_id] = (round(sum([s[0] for s in similar]) / len(similar), 3),
+                                  max(set(materials), key=materials.count),
+                                  round(sum([s[2] for s in similar]) / len(similar), 3))
+    values.update(derived)
+    return values
+
+
+def similar_mass_ids_original(object_id: int, object_masses: Dict[int, float], object_ids) -> List[int]:
+    """
+    The original mass fallback.
+
+    :param object_id: The object ID.
+    :param object_masses: The mass of each object. Key = The object ID.
+    :param object_ids: The IDs of the objects that have audio data.
+
+    :return: The IDs of objects with a similar mass.
+    """
+
+    return [m_id for m_id in object_masses if m_id != object_id and m_id in object_ids and
+            np.abs(object_masses[m_id] / object_masses[object_id]) < 1.5]
+
+
+def check_py_impact(scene: Scene) -> Tuple[float, float]:
+    """
+    :param scene: The scene.
+
+    :return: Tuple: The time elapsed in seconds with the original derivation and with `PyImpact`.
+    """
+
+    resp = scene.get_response()
+    overrides = {object_id: ObjectAudioStatic(name="override", mass=1, material=material, bounciness=0.5,
+                                              resonance=resonance, size=2, amp=amp, object_id=object_id)
+                 for object_id, (material, amp, resonance) in scene.py_impact_overrides.items()}
+    py_impact = PyImpact(rng=np.random.RandomState(0), static_audio_data_overrides=overrides, scrape=False)
+    t0 = perf_counter()
+    py_impact._cache_static_data(resp=resp)
+    t1 = perf_counter()
+    expected = derive_original(resp=resp,
+                               known={k: (v.amp, v.material, v.resonance) for k, v in DEFAULT_OBJECT_AUDIO_STATIC_DATA.items()},
+                               overrides={k: (v[1], v[0], v[2]) for k, v in scene.py_impact_overrides.items()},
+                               default=(PyImpact.DEFAULT_AMP, PyImpact.DEFAULT_MATERIAL, PyImpact.DEFAULT_RESONANCE))
+    t2 = perf_counter()
+    actual = {k: (v.amp, v.material, v.resonance) for k, v in py_impact._static_audio_data.items()}
+    assert actual == expected, "PyImpact derived different audio values."
+    return t2 - t1, t1 - t0
+
+
+def check_clatter(scene: Scene) -> Tuple[float, float]:
+    """
+    :param scene: The scene.
+
+    :return: Tuple: The time elapsed in seconds with the original derivation and with `Clatter`.
+    """
+
+    resp = scene.get_response()
+    objects = {object_id: ClatterObject(impact_material=material, size=2, amp=amp, resonance=resonance)
+               for object_id, (material, amp, resonance) in scene.clatter_overrides.items()}
+    clatter = Clatter(objects=objects)
+    t0 = perf_counter()
+    clatter.on_send(resp=resp)
+    t1 = perf_counter()
+    default = Clatter._get_default_clatter_object()
+    expected = derive_original(resp=resp,
+                               known={k: (v.amp, v.impact_material, v.resonance) for k, v in DEFAULT_OBJECTS.items()},
+                               overrides={k: (v[1], v[0], v[2]) for k, v in scene.clatter_overrides.items()},
+                               default=(default.amp, default.impact_material, default.resonance))
+    t2 = perf_counter()
+    actual = {k: (v.amp, v.impact_material, v.resonance) for k, v in clatter._objects.items()}
+    assert actual == expected, "Clatter derived different audio values."
+    return t2 - t1, t1 - t0
+
+
+def check_mass_fallback(num_trials: int = 2000) -> None:
+    """
+    Check `_get_similar_mass_ids()` in `PyImpact` and `Clatter` against the original scan.
+
+    :param num_trials: The number of random trials.
+    """
+
+    rng = np.random.RandomState(0)
+    base_masses = np.array([0.1, 0.15, 0.2, 0.3, 0.45, 1, 1.5, 2, 2.25, 3, -1, -1.5])
+    for trial in range(num_trials):
+        num_objects = rng.randint(1, 40)
+        masses = rng.choice(base_masses, size=num_objects)
+        # Test masses at exactly 1.5 times another mass and the adjacent floats.
+        nudge = rng.randint(0, 3, size=num_objects)
+        masses = np.where(nudge == 1, np.nextafter(masses, np.inf), np.where(nudge == 2, np.nextafter(masses, -np.inf), masses))
+        object_masses: Dict[int, float] = {int(i): float(m) for i, m in zip(rng.choice(1000, size=num_objects, replace=False), masses)}
+        object_ids = [object_id for object_id in object_masses if rng.random_sample() < 0.7]
+        mass_ids = sorted(object_ids, key=lambda m_id: object_masses[m_id])
+        sorted_masses = [object_masses[m_id] for m_id in mass_ids]
+        mass_orders = {m_id: i for i, m_id in enumerate(object_masses)}
+        for object_id in object_masses:
+            if object_id in object_ids:
+                continue
+            expected = similar_mass_ids_original(object_id=object_id, object_masses=object_masses, object_ids=object_ids)
+            for cls in [PyImpact, Clatter]:
+                actual = cls._get_similar_mass_ids(object_id=object_id, object_masses=object_masses, mass_ids=mass_ids,
+                                                   sorted_masses=sorted_masses, mass_orders=mass_orders)
+                assert actual == expected, f"{cls.__name__} found different objects with a similar mass."
+
+
+if __name__ == "__main__":
+    check_mass_fallback()
+    output = "| Test | Original (s) | PyImpact (s) | Original (s) | Clatter (s) |\n| --- | --- | --- | --- | --- |\n"
+    for name, s in [("No known models", Scene(seed=0, num_objects=100, known_models=False, num_overrides=0)),
+                    ("Overrides only", Scene(seed=1, num_objects=100, known_models=False)),
+                    ("100 objects", Scene(seed=2, num_objects=100)),
+                    ("1000 objects", Scene(seed=3, num_objects=1000)),
+                    ("3000 objects", Scene(seed=4, num_objects=3000))]:
+        p_original, p_new = check_py_impact(scene=s)
+        c_original, c_new = check_clatter(scene=s)
+        output += f"| {name} | {round(p_original, 3)} | {round(p_new, 3)} | {round(c_original, 3)} | {round(c_new, 3)} |\n"
+    print(output)
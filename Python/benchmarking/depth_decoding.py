@@ -0,0 +1,33 @@
+from time import perf_counter
+import numpy as np
+from tdw.tdw_utils import TDWUtils
+from tdw.image_data.depth_decoder import DepthDecoder
+
+
+"""
+Compare the speed of `TDWUtils.get_depth_values()` to `DepthDecoder`.
+This doesn't require a build. The depth passes are random pixels.
+"""
+
+
+def run(size: int, depth_pass: str, num_trials: int = 200) -> str:
+    image = np.random.randint(0, 256, size=size * size * 3, dtype=np.uint8)
+    t0 = perf_counter()
+    for i in range(num_trials):
+        TDWUtils.get_depth_values(image=image, depth_pass=depth_pass, width=size, height=size)
+    t_utils = (perf_counter() - t0) / num_trials * 1000
+    decoder = DepthDecoder()
+    out = np.empty((size, size), dtype=np.float32)
+    t0 = perf_counter()
+    for i in range(num_trials):
+        decoder.decode_array(image=image, depth_pass=depth_pass, width=size, height=size, out=out)
+    t_decoder = (perf_counter() - t0) / num_trials * 1000
+    return f"| {size}x{size} {depth_pass} | {round(t_utils, 2)} | {round(t_decoder, 2)} |\n"
+
+
+if __name__ == "__main__":
+    output = "| Test | TDWUtils.get_depth_values() (ms) | DepthDecoder (ms) |\n| --- | --- | --- |\n"
+    for s in [256, 512, 1024]:
+        for p in ["_depth", "_depth_simple"]:
+            output += run(size=s, depth_pass=p)
+    print(output)
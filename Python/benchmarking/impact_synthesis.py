@@ -0,0 +1,39 @@
+from time import perf_counter
+import numpy as np
+from tdw.add_ons.py_impact import PyImpact
+
+
+"""
+Compare the speed of synthesizing PyImpact impact sounds one at a time to synthesizing every impact on a frame at once.
+Both use the same path as `PyImpact.on_send(resp)`: `_get_impulse_responses()` and then `_convolve_impact_force()`.
+This doesn't require a build. The modes are sampled from random materials. The impulse response cache is disabled.
+"""
+
+
+def run(num_impacts: int, num_trials: int = 20) -> str:
+    py_impact = PyImpact(rng=np.random.RandomState(0))
+    materials = list(py_impact.material_data.keys())
+    rng = np.random.RandomState(0)
+    # The modes of object 1, the modes of object 2, the resonance of object 1, the resonance of object 2, and no cache keys.
+    impacts = [(py_impact._get_object_modes(materials[rng.randint(0, len(materials))]),
+                py_impact._get_object_modes(materials[rng.randint(0, len(materials))]),
+                rng.uniform(0.1, 1), rng.uniform(0.1, 1), None) for _ in range(num_impacts)]
+    masses = rng.uniform(0.1, 5, num_impacts)
+    t0 = perf_counter()
+    for i in range(num_trials):
+        for impact, mass in zip(impacts, masses):
+            PyImpact._convolve_impact_force(h=py_impact._get_impulse_responses([impact])[0], mass=mass)
+    t_single = (perf_counter() - t0) / num_trials * 1000
+    t0 = perf_counter()
+    for i in range(num_trials):
+        for h, mass in zip(py_impact._get_impulse_responses(impacts), masses):
+            PyImpact._convolve_impact_force(h=h, mass=mass)
+    t_batch = (perf_counter() - t0) / num_trials * 1000
+    return f"| {num_impacts} | {round(t_single, 2)} | {round(t_batch, 2)} |\n"
+
+
+if __name__ == "__main__":
+    output = "| Impacts per frame | One at a time (ms) | Batch (ms) |\n| --- | --- | --- |\n"
+    for n in [1, 4, 16, 64]:
+        output += run(num_impacts=n)
+    print(output)
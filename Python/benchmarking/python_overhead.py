@@ -0,0 +1,61 @@
+from tempfile import mkdtemp
+from typing import List
+from tdw.controller import Controller
+from tdw.controller_pool import ControllerPool
+from tdw.add_ons.benchmark import Benchmark
+from tdw.add_ons.object_manager import ObjectManager
+from tdw.add_ons.image_capture import ImageCapture
+from tdw.backend.fake_build import FakeBuild
+
+
+"""
+Benchmark the Python side of TDW (command serialization, add-ons, output data deserialization) with a fake build.
+This doesn't require a build or a GPU. Images are saved to a temporary directory.
+"""
+
+
+def run(port: int, num_frames: int = 2000, **kwargs) -> float:
+    build = FakeBuild(port=port, **kwargs)
+    build.start()
+    c = Controller(port=port, check_version=False, launch_build=False)
+    b = Benchmark()
+    c.add_ons.extend([b, ObjectManager(transforms=True, rigidbodies=False, bounds=False),
+                      ImageCapture(avatar_ids=["a"], path=mkdtemp(), png=False)])
+    b.start()
+    for i in range(num_frames):
+        c.communicate([])
+    b.stop()
+    c.communicate({"$type": "terminate"})
+    build.join()
+    return b.fps
+
+
+def run_pool(ports: List[int], num_frames: int = 2000, **kwargs) -> float:
+    builds = [FakeBuild(port=port, **kwargs) for port in ports]
+    for build in builds:
+        build.start()
+    b = Benchmark()
+    pool = ControllerPool(num_controllers=len(ports), ports=ports, check_version=False, launch_build=False,
+                          add_ons=lambda index: [b, ObjectManager(transforms=True, rigidbodies=False, bounds=False)]
+                          if index == 0 else [ObjectManager(transforms=True, rigidbodies=False, bounds=False)])
+    b.start()
+    for i in range(num_frames):
+        pool.communicate([[] for _ in range(pool.num_controllers)])
+    b.stop()
+    pool.close()
+    for build in builds:
+        build.join()
+    return b.fps
+
+
+if __name__ == "__main__":
+    output = "| Test | FPS |\n| --- | --- |\n"
+    output += f"| Empty | {round(run(port=1071))} |\n"
+    output += f"| 100 objects | {round(run(port=1072, num_objects=100))} |\n"
+    output += f"| 1000 objects | {round(run(port=1073, num_objects=1000))} |\n"
+    output += f"| 10 collisions | {round(run(port=1074, num_objects=100, num_collisions=10))} |\n"
+    output += f"| 256x256 _img | {round(run(port=1075, avatar_ids=['a'], image_size=256))} |\n"
+    output += f"| 256x256 _img, _id, _depth | " \
+              f"{round(run(port=1076, avatar_ids=['a'], image_size=256, passes=['_img', '_id', '_depth']))} |\n"
+    output += f"| 4 controllers, 100 objects | {round(run_pool(ports=[1077, 1078, 1079, 1080], num_objects=100))} |\n"
+    print(output)
@@ -46,7 +46,7 @@ class AddOn(ABC):
         Use this function to send commands to the build on the next `Controller.communicate(commands)` call, given the `resp` response.
         Any commands in the `self.commands` list will be sent on the *next* `Controller.communicate(commands)` call.
 
-        :param resp: The response from the build.
+        :param resp: The response from the build. When called from `Controller.communicate(commands)`, this is a [`Response`](../response.md), which is indexed by output data type; use `Response.get_response(resp)` to read output data that has already been deserialized by another add-on.
         """
 
         raise Exception()
@@ -3,7 +3,8 @@ from typing import List, Dict, Optional, Union
 import numpy as np
 from tdw.tdw_utils import TDWUtils
 from tdw.quaternion_utils import QuaternionUtils
-from tdw.output_data import OutputData, AvatarKinematic, ImageSensors
+from tdw.output_data import AvatarKinematic, ImageSensors
+from tdw.response import Response
 from tdw.add_ons.third_person_camera_base import ThirdPersonCameraBase
 
 
@@ -107,39 +108,38 @@ class CinematicCamera(ThirdPersonCameraBase):
         return commands
 
     def on_send(self, resp: List[bytes]) -> None:
-        for i in range(len(resp) - 1):
-            r_id = OutputData.get_data_type_id(resp[i])
-            if r_id == "imse":
-                imse = ImageSensors(resp[i])
-                if imse.get_avatar_id() == self.avatar_id:
-                    # Update the rotation.
-                    self._sensor_forward = np.array(imse.get_sensor_forward(0))
-                    self._sensor_rotation = np.array(imse.get_sensor_rotation(0))
-                    # Set the field of view.
-                    self._field_of_view = imse.get_sensor_field_of_view(0)
-                    set_field_of_view = False
-                    if self._field_of_view_target is None:
-                        self._field_of_view_target = self._field_of_view
-                    f = np.linalg.norm(self._field_of_view - self._field_of_view_target)
-                    if f > self.field_of_view_speed:
-                        if self._field_of_view > self._field_of_view_target:
-                            self._field_of_view -= self.field_of_view_speed
-                        else:
-                            self._field_of_view += self.field_of_view_speed
-                        set_field_of_view = True
+        resp = Response.get_response(resp)
+        imse: ImageSensors
+        for imse in resp.get_output_data("imse"):
+            if imse.get_avatar_id() == self.avatar_id:
+                # Update the rotation.
+                self._sensor_forward = np.array(imse.get_sensor_forward(0))
+                self._sensor_rotation = np.array(imse.get_sensor_rotation(0))
+                # Set the field of view.
+                self._field_of_view = imse.get_sensor_field_of_view(0)
+                set_field_of_view = False
+                if self._field_of_view_target is None:
+                    self._field_of_view_target = self._field_of_view
+                f = np.linalg.norm(self._field_of_view - self._field_of_view_target)
+                if f > self.field_of_view_speed:
+                    if self._field_of_view > self._field_of_view_target:
+                        self._field_of_view -= self.field_of_view_speed
                     else:
-                        if f < 1e-5 and f < self.field_of_view_speed:
-                            self._field_of_view = self._field_of_view_target
-                            set_field_of_view = True
-                    if set_field_of_view:
-                        self.commands.append({"$type": "set_field_of_view",
-                                              "field_of_view": self._field_of_view,
-                                              "avatar_id": self.avatar_id})
-            elif r_id == "avki":
-                a = AvatarKinematic(resp[i])
-                if a.get_avatar_id() == self.avatar_id:
-                    # Update the position.
-                    self.position = TDWUtils.array_to_vector3(np.array(a.get_position()))
+                        self._field_of_view += self.field_of_view_speed
+                    set_field_of_view = True
+                else:
+                    if f < 1e-5 and f < self.field_of_view_speed:
+                        self._field_of_view = self._field_of_view_target
+                        set_field_of_view = True
+                if set_field_of_view:
+                    self.commands.append({"$type": "set_field_of_view",
+                                          "field_of_view": self._field_of_view,
+                                          "avatar_id": self.avatar_id})
+        a: AvatarKinematic
+        for a in resp.get_output_data("avki"):
+            if a.get_avatar_id() == self.avatar_id:
+                # Update the position.
+                self.position = TDWUtils.array_to_vector3(np.array(a.get_position()))
         if self._move_target is not None:
             if self._move_target_type == _MoveTargetType.position:
                 self.commands.append({"$type": "move_avatar_towards_position",
@@ -1,13 +1,15 @@
 from copy import copy
-from typing import List, Dict, Union, Optional
+from bisect import bisect_right
+from typing import List, Dict, Union, Optional, Tuple
 import numpy as np
 from tdw.add_ons.add_on import AddOn
 from tdw.tdw_utils import TDWUtils
-from tdw.output_data import OutputData, SegmentationColors, Bounds, StaticRigidbodies, StaticRobot, StaticOculusTouch
+from tdw.output_data import SegmentationColors, Bounds, StaticRigidbodies, StaticRobot, StaticOculusTouch
 from tdw.physics_audio.impact_material import ImpactMaterial
 from tdw.physics_audio.scrape_model import ScrapeModel, DEFAULT_SCRAPE_MODELS
 from tdw.physics_audio.clatter_object import ClatterObject, DEFAULT_OBJECTS
 from tdw.librarian import MaterialLibrarian, ModelRecord
+from tdw.response import Response
 
 
 class Clatter(AddOn):
@@ -120,6 +122,7 @@ class Clatter(AddOn):
                  "value": False}]
 
     def on_send(self, resp: List[bytes]) -> None:
+        resp = Response.get_response(resp)
         if not self._initialized_clatter:
             self._initialized_clatter = True
             # Initialize each object.
@@ -130,65 +133,63 @@ class Clatter(AddOn):
             extents: Dict[int, np.ndarray] = dict()
             vr_nodes: Dict[int, ClatterObject] = dict()
             scrape_models: Dict[int, Optional[ScrapeModel]] = dict()
-            for i in range(len(resp) - 1):
-                r_id = OutputData.get_data_type_id(resp[i])
-                if r_id == "boun":
-                    boun = Bounds(resp[i])
-                    for j in range(boun.get_num()):
-                        extents[boun.get_id(j)] = TDWUtils.get_bounds_extents(bounds=boun, index=j)
-                if r_id == "segm":
-                    segm = SegmentationColors(resp[i])
-                    for j in range(segm.get_num()):
-                        object_id = segm.get_object_id(j)
-                        model_name = segm.get_object_name(j).lower()
-                        names[object_id] = model_name
-                        categories[object_id] = segm.get_object_category(j)
-                        # Enable a scrape surface.
-                        if model_name in DEFAULT_SCRAPE_MODELS or (object_id in self._objects and self._objects[object_id].scrape_model is not None):
-                            if model_name in DEFAULT_SCRAPE_MODELS:
-                                scrape_model = DEFAULT_SCRAPE_MODELS[model_name]
-                            else:
-                                scrape_model = self._objects[object_id].scrape_model
-                            scrape_models[object_id] = scrape_model
-                            # Add the visual material.
-                            material_record = Clatter.__VISUAL_MATERIAL_LIBRARIAN.get_record(name=scrape_model.visual_material)
-                            self.commands.append({"$type": "add_material",
-                                                  "name": material_record.name,
-                                                  "url": material_record.get_url()})
-                            # Set the visual material.
-                            for sub_object in scrape_model.sub_objects:
-                                self.commands.append({"$type": "set_visual_material",
-                                                      "material_index": sub_object.material_index,
-                                                      "material_name": material_record.name,
-                                                      "object_name": sub_object.name,
-                                                      "id": object_id})
+            boun: Bounds
+            for boun in resp.get_output_data("boun"):
+                for j in range(boun.get_num()):
+                    extents[boun.get_id(j)] = TDWUtils.get_bounds_extents(bounds=boun, index=j)
+            segm: SegmentationColors
+            for segm in resp.get_output_data("segm"):
+                for j in range(segm.get_num()):
+                    object_id = segm.get_object_id(j)
+                    model_name = segm.get_object_name(j).lower()
+                    names[object_id] = model_name
+                    categories[object_id] = segm.get_object_category(j)
+                    # Enable a scrape surface.
+                    if model_name in DEFAULT_SCRAPE_MODELS or (object_id in self._objects and self._objects[object_id].scrape_model is not None):
+                        if model_name in DEFAULT_SCRAPE_MODELS:
+                            scrape_model = DEFAULT_SCRAPE_MODELS[model_name]
                         else:
-                            scrape_models[object_id] = None
-                elif r_id == "srob":
-                    srob = StaticRobot(resp[i])
-                    for j in range(srob.get_num_joints()):
-                        if srob.get_is_joint_immovable(j):
-                            continue
-                        joint_id = srob.get_joint_id(j)
-                        robot_joints[joint_id] = {"name": srob.get_joint_name(j),
-                                                  "mass": srob.get_joint_mass(j),
-                                                  "robot_id": srob.get_id()}
-                elif r_id == "srig":
-                    srig = StaticRigidbodies(resp[i])
-                    for j in range(srig.get_num()):
-                        object_masses[srig.get_id(j)] = srig.get_mass(j)
-                # Add VR nodes.
-                elif r_id == "soct":
-                    soct = StaticOculusTouch(resp[i])
-                    if soct.get_human_hands():
-                        vr_material = self._human_material
+                            scrape_model = self._objects[object_id].scrape_model
+                        scrape_models[object_id] = scrape_model
+                        # Add the visual material.
+                        material_record = Clatter.__VISUAL_MATERIAL_LIBRARIAN.get_record(name=scrape_model.visual_material)
+                        self.commands.append({"$type": "add_material",
+                                              "name": material_record.name,
+                                              "url": material_record.get_url()})
+                        # Set the visual material.
+                        for sub_object in scrape_model.sub_objects:
+                            self.commands.append({"$type": "set_visual_material",
+                                                  "material_index": sub_object.material_index,
+                                                  "material_name": material_record.name,
+                                                  "object_name": sub_object.name,
+                                                  "id": object_id})
                     else:
-                        vr_material = self._robot_material
-                    for vr_node_id in [soct.get_body_id(), soct.get_left_hand_id(), soct.get_right_hand_id()]:
-                        vr_nodes[vr_node_id] = ClatterObject(impact_material=vr_material,
-                                                             size=self._default_object.size,
-                                                             amp=self._default_object.amp,
-                                                             resonance=self._default_object.resonance)
+                        scrape_models[object_id] = None
+            srob: StaticRobot
+            for srob in resp.get_output_data("srob"):
+                for j in range(srob.get_num_joints()):
+                    if srob.get_is_joint_immovable(j):
+                        continue
+                    joint_id = srob.get_joint_id(j)
+                    robot_joints[joint_id] = {"name": srob.get_joint_name(j),
+                                              "mass": srob.get_joint_mass(j),
+                                              "robot_id": srob.get_id()}
+            srig: StaticRigidbodies
+            for srig in resp.get_output_data("srig"):
+                for j in range(srig.get_num()):
+                    object_masses[srig.get_id(j)] = srig.get_mass(j)
+            # Add VR nodes.
+            soct: StaticOculusTouch
+            for soct in resp.get_output_data("soct"):
+                if soct.get_human_hands():
+                    vr_material = self._human_material
+                else:
+                    vr_material = self._robot_material
+                for vr_node_id in [soct.get_body_id(), soct.get_left_hand_id(), soct.get_right_hand_id()]:
+                    vr_nodes[vr_node_id] = ClatterObject(impact_material=vr_material,
+                                                         size=self._default_object.size,
+                                                         amp=self._default_object.amp,
+                                                         resonance=self._default_object.resonance)
             need_to_derive: List[int] = list()
             for object_id in names:
                 name = names[object_id]
@@ -201,37 +202,33 @@ class Clatter(AddOn):
                     self._objects[object_id].scrape_model = scrape_models[object_id]
                 else:
                     need_to_derive.append(object_id)
-            current_values = self._objects.values()
+            current_values = list(self._objects.values())
+            # Index the objects by category.
+            category_objects: Dict[str, List[int]] = dict()
+            for object_id in categories:
+                if categories[object_id] in category_objects:
+                    category_objects[categories[object_id]].append(object_id)
+                else:
+                    category_objects[categories[object_id]] = [object_id]
+            # The values derived from comparable objects in the same category. These are the same for every object, so they're derived only once.
+            category_values: Optional[Tuple[float, ImpactMaterial, float]] = None
+            # Objects with audio data, sorted by mass, and the order of each object in `object_masses`.
+            mass_ids: List[int] = sorted([m_id for m_id in object_masses if m_id in self._objects], key=lambda m_id: object_masses[m_id])
+            sorted_masses: List[float] = [object_masses[m_id] for m_id in mass_ids]
+            mass_orders: Dict[int, int] = {m_id: i for i, m_id in enumerate(object_masses)}
             derived_data: Dict[int, ClatterObject] = dict()
             for object_id in need_to_derive:
                 # Fallback option: comparable objects in the same category.
-                objects_in_same_category = [o for o in categories if categories[o] == categories[object_id]]
+                objects_in_same_category = category_objects[categories[object_id]]
                 if len(objects_in_same_category) > 0:
-                    amps: List[float] = [a.amp for a in current_values]
-                    materials: List[ImpactMaterial] = [a.impact_material for a in current_values]
-                    resonances: List[float] = [a.resonance for a in current_values]
+                    if category_values is None:
+                        category_values = self._get_derived_values(objects=current_values)
+                    amp, material, resonance = category_values
                 # Fallback option: Find objects with similar volume.
                 else:
-                    amps: List[float] = list()
-                    materials: List[ImpactMaterial] = list()
-                    resonances: List[float] = list()
-                    for m_id in object_masses:
-                        if m_id == object_id or m_id not in self._objects:
-                            continue
-                        if np.abs(object_masses[m_id] / object_masses[object_id]) < 1.5:
-                            amps.append(self._objects[m_id].amp)
-                            materials.append(self._objects[m_id].impact_material)
-                            resonances.append(self._objects[m_id].resonance)
-                # Fallback option: Use default values.
-                if len(amps) == 0:
-                    amp: float = self._default_object.amp
-                    material: ImpactMaterial = self._default_object.impact_material
-                    resonance: float = self._default_object.resonance
-                # Get averages or maximums of each value.
-                else:
-                    amp: float = round(sum(amps) / len(amps), 3)
-                    material: ImpactMaterial = max(set(materials), key=materials.count)
-                    resonance: float = round(sum(resonances) / len(resonances), 3)
+                    similar_ids = Clatter._get_similar_mass_ids(object_id=object_id, object_masses=object_masses, mass_ids=mass_ids,
+                                                                sorted_masses=sorted_masses, mass_orders=mass_orders)
+                    amp, material, resonance = self._get_derived_values(objects=[self._objects[m_id] for m_id in similar_ids])
                 derived_data[object_id] = ClatterObject(impact_material=material,
                                                         size=Clatter.get_size(model=extents[object_id]),
                                                         amp=amp,
@@ -354,6 +351,44 @@ class Clatter(AddOn):
         else:
             return 5
 
+    def _get_derived_values(self, objects: List[ClatterObject]) -> Tuple[float, ImpactMaterial, float]:
+        """
+        :param objects: Comparable objects.
+
+        :return: Tuple: The average amp, the most common impact material, and the average resonance of the objects. If there are no objects, the default values.
+        """
+
+        # Fallback option: Use default values.
+        if len(objects) == 0:
+            return self._default_object.amp, self._default_object.impact_material, self._default_object.resonance
+        # Get averages or maximums of each value.
+        else:
+            amps: List[float] = [a.amp for a in objects]
+            materials: List[ImpactMaterial] = [a.impact_material for a in objects]
+            resonances: List[float] = [a.resonance for a in objects]
+            return round(sum(amps) / len(amps), 3), max(set(materials), key=materials.count), round(sum(resonances) / len(resonances), 3)
+
+    @staticmethod
+    def _get_similar_mass_ids(object_id: int, object_masses: Dict[int, float], mass_ids: List[int],
+                              sorted_masses: List[float], mass_orders: Dict[int, int]) -> List[int]:
+        """
+        :param object_id: The object ID.
+        :param object_masses: The mass of each object. Key = The object ID.
+        :param mass_ids: The IDs of the objects that have audio data, sorted by mass.
+        :param sorted_masses: The mass of each object in `mass_ids`.
+        :param mass_orders: The index of each object in `object_masses`. Key = The object ID.
+
+        :return: The IDs of the objects in `mass_ids` other than `object_id` whose mass is less than 1.5 times the mass of the object, in the same order as `object_masses`.
+        """
+
+        # Only objects with less than 1.5 times this mass can be similar. The mass ratio is checked again below.
+        if len(mass_ids) > 0 and object_masses[object_id] > 0:
+            candidate_ids = mass_ids[:bisect_right(sorted_masses, object_masses[object_id] * 1.5 * (1 + 1e-9))]
+        else:
+            candidate_ids = mass_ids
+        return sorted([m_id for m_id in candidate_ids if m_id != object_id and np.abs(object_masses[m_id] / object_masses[object_id]) < 1.5],
+                      key=lambda m_id: mass_orders[m_id])
+
     @staticmethod
     def _get_default_clatter_object() -> ClatterObject:
         """
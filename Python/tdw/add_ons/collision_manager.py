@@ -1,5 +1,6 @@
 from typing import Dict, List
-from tdw.output_data import OutputData, Collision, EnvironmentCollision
+from tdw.output_data import Collision, EnvironmentCollision
+from tdw.response import Response
 from tdw.collision_data.collision_obj_obj import CollisionObjObj
 from tdw.collision_data.collision_obj_env import CollisionObjEnv
 from tdw.int_pair import IntPair
@@ -47,17 +48,16 @@ class CollisionManager(AddOn):
         return [self._send_collision_commands]
 
     def on_send(self, resp: List[bytes]) -> None:
+        resp = Response.get_response(resp)
         self.obj_collisions.clear()
         self.env_collisions.clear()
-        for i in range(len(resp) - 1):
-            r_id = OutputData.get_data_type_id(resp[i])
-            if r_id == "coll":
-                collision = Collision(resp[i])
-                # Get the pair of IDs in this collision and use it as a key.
-                ids = IntPair(int1=collision.get_collider_id(), int2=collision.get_collidee_id())
-                coo = CollisionObjObj(collision=collision)
-                self.obj_collisions[ids] = coo
-            elif r_id == "enco":
-                collision = EnvironmentCollision(resp[i])
-                coe = CollisionObjEnv(collision=collision)
-                self.env_collisions[collision.get_object_id()] = coe
+        collision: Collision
+        for collision in resp.get_output_data("coll"):
+            # Get the pair of IDs in this collision and use it as a key.
+            ids = IntPair(int1=collision.get_collider_id(), int2=collision.get_collidee_id())
+            coo = CollisionObjObj(collision=collision)
+            self.obj_collisions[ids] = coo
+        environment_collision: EnvironmentCollision
+        for environment_collision in resp.get_output_data("enco"):
+            coe = CollisionObjEnv(collision=environment_collision)
+            self.env_collisions[environment_collision.get_object_id()] = coe
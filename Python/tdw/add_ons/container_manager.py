@@ -1,6 +1,7 @@
 from typing import List, Dict
 import numpy as np
-from tdw.output_data import OutputData, StaticCompositeObjects, Containment
+from tdw.output_data import StaticCompositeObjects, Containment
+from tdw.response import Response
 from tdw.add_ons.add_on import AddOn
 from tdw.container_data.container_tag import ContainerTag
 from tdw.container_data.containment_event import ContainmentEvent
@@ -43,35 +44,31 @@ class ContainerManager(AddOn):
                  "frequency": "always"}]
 
     def on_send(self, resp: List[bytes]) -> None:
+        resp = Response.get_response(resp)
         # Get model names.
         if self._getting_static_data:
             self._getting_static_data = False
-            for i in range(len(resp) - 1):
-                r_id = OutputData.get_data_type_id(resp[i])
-                # Exclude composite sub-objects.
-                if r_id == "scom":
-                    static_composite_objects = StaticCompositeObjects(resp[i])
-                    for j in range(static_composite_objects.get_num()):
-                        s = CompositeObjectStatic(static_composite_objects, j)
-                        self._excluded_objects.extend(s.sub_object_ids)
-                    break
+            # Exclude composite sub-objects.
+            static_composite_objects: StaticCompositeObjects = resp.get_first("scom")
+            if static_composite_objects is not None:
+                for j in range(static_composite_objects.get_num()):
+                    s = CompositeObjectStatic(static_composite_objects, j)
+                    self._excluded_objects.extend(s.sub_object_ids)
         self.events.clear()
-        for i in range(len(resp) - 1):
-            r_id = OutputData.get_data_type_id(resp[i])
-            # Use the model names from SegmentationColors output data to add container shapes.
-            if r_id == "cont":
-                containment = Containment(resp[i])
-                container_id = containment.get_container_id()
-                tag = containment.get_tag()
-                # Add the shape.
-                if container_id not in self.container_shapes:
-                    self.container_shapes[container_id] = containment.get_object_id()
-                    self.tags[container_id] = tag
-                # Add the event.
-                self.events[container_id] = ContainmentEvent(container_id=container_id,
-                                                             object_ids=np.array([o_id for o_id in containment.get_overlap_ids()
-                                                                                  if int(o_id) not in self._excluded_objects], dtype=int),
-                                                             tag=tag)
+        # Use the model names from SegmentationColors output data to add container shapes.
+        containment: Containment
+        for containment in resp.get_output_data("cont"):
+            container_id = containment.get_container_id()
+            tag = containment.get_tag()
+            # Add the shape.
+            if container_id not in self.container_shapes:
+                self.container_shapes[container_id] = containment.get_object_id()
+                self.tags[container_id] = tag
+            # Add the event.
+            self.events[container_id] = ContainmentEvent(container_id=container_id,
+                                                         object_ids=np.array([o_id for o_id in containment.get_overlap_ids()
+                                                                              if int(o_id) not in self._excluded_objects], dtype=int),
+                                                         tag=tag)
 
     def reset(self) -> None:
         """
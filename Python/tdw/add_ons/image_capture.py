@@ -1,9 +1,15 @@
-from typing import List, Dict
+from typing import List, Dict, Tuple, Deque, Optional, Callable
 from pathlib import Path
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, Future
 from PIL.Image import Image
 from tdw.add_ons.add_on import AddOn
 from tdw.tdw_utils import TDWUtils
-from tdw.output_data import OutputData, Images
+from tdw.output_data import Images
+from tdw.image_data.image_shard_writer import ImageShardWriter
+from tdw.image_data.video_encoder import VideoEncoder
+from tdw.image_data.video_writer import VideoWriter
+from tdw.response import Response
 from tdw.type_aliases import PATH
 
 
@@ -39,17 +45,62 @@ class ImageCapture(AddOn):
 
     c.communicate({"$type": "terminate"})
     ```
+
+    ## Saving images in the background
+
+    By default, images are saved to disk within `on_send(resp)`, which means that `c.communicate(commands)` doesn't return until every image has been written. If `num_workers` is greater than 0, images are instead saved by a pool of worker threads, and writing to disk overlaps with the build rendering the next frame. `max_in_flight` is the maximum number of frames that can be waiting to be saved; if the workers fall behind, `on_send(resp)` either waits for them (`drop_frames=False`) or doesn't save the new frame (`drop_frames=True`).
+
+    ```python
+    capture = ImageCapture(avatar_ids=["a"], path="D:/image_capture_test", num_workers=4, max_in_flight=8)
+    # ... run the trial ...
+    # Wait until every image has been saved.
+    capture.flush()
+    # ... at the end of the simulation ...
+    capture.close()
+    ```
+
+    ## Saving images to shards
+
+    By default, each pass of each avatar's images is saved as a separate file per frame. If there are many frames, this can result in a very large number of small files. If `shard_size` is greater than 0, images are instead saved to [WebDataset](https://github.com/webdataset/webdataset)-style .tar shards of at most `shard_size` bytes in `path` (see: [`ImageShardWriter`](../image_data/image_shard_writer.md)). Each frame is a record that includes every pass of every avatar's images. To read the images, use [`ImageShardReader`](../image_data/image_shard_reader.md). Call `flush()` or `close()` to update the shard index before reading.
+
+    If `num_workers` is greater than 0, the worker threads encode the images and a single shard writer thread writes the records, so the records are always in frame order.
+
+    ```python
+    capture = ImageCapture(avatar_ids=["a"], path="D:/image_capture_test", pass_masks=["_img", "_id"], shard_size=1 << 30)
+    ```
+
+    ## Saving videos
+
+    If `video_encoder` isn't None, the `_img` pass of each avatar is streamed to a video encoder as it arrives rather than saved as image files; each avatar's video is saved to `path/<avatar_id>.mp4`. The video encoder runs in its own writer thread, and `max_in_flight` and `drop_frames` determine what happens if it falls behind. Other passes aren't saved. Call `close()` to finish the videos.
+
+    The video encoder can be [`FfmpegEncoder`](../image_data/ffmpeg_encoder.md) (which requires ffmpeg) or any other subclass of [`VideoEncoder`](../image_data/video_encoder.md).
+
+    ```python
+    from tdw.image_data.ffmpeg_encoder import FfmpegEncoder
+
+    capture = ImageCapture(avatar_ids=["a"], path="D:/image_capture_test", video_encoder=FfmpegEncoder, video_framerate=30)
+    # ... run the trial ...
+    capture.close()
+    ```
     """
 
     # A list of valid pass masks.
     _PASS_MASKS: List[str] = list(Images.PASS_MASKS.values())
 
-    def __init__(self, path: PATH, avatar_ids: List[str] = None, png: bool = False, pass_masks: List[str] = None):
+    def __init__(self, path: PATH, avatar_ids: List[str] = None, png: bool = False, pass_masks: List[str] = None,
+                 num_workers: int = 0, max_in_flight: int = 4, drop_frames: bool = False, shard_size: int = 0,
+                 video_encoder: Callable[[Path, int], VideoEncoder] = None, video_framerate: int = 30):
         """
         :param path: The path to the output directory.
         :param avatar_ids: The IDs of the avatars that will capture and save images. If empty, all avatars will capture and save images. Note that these avatars must already exist in the scene (if you've added the avatars via a [`ThirdPersonCamera` add-on](third_person_camera.md), you must add the `ThirdPersonCamera` first, *then* `ImageCapture`).
         :param png: If True, images will be lossless png files. If False, images will be jpgs. Usually, jpg is sufficient.
         :param pass_masks: A list of image passes that will be captured by the avatars. If None, defaults to `["_img"]`. For a description of each of pass mask, [read this](https://github.com/threedworld-mit/tdw/blob/master/Documentation/api/command_api.md#set_pass_masks).
+        :param num_workers: If greater than 0, images are saved in the background by this many worker threads. If 0, images are saved within `on_send(resp)`.
+        :param max_in_flight: If `num_workers` is greater than 0 or `video_encoder` isn't None, this is the maximum number of frames that can be waiting to be saved.
+        :param drop_frames: If `num_workers` is greater than 0 or `video_encoder` isn't None, and `max_in_flight` frames are waiting to be saved: If True, the new frame isn't saved. If False, `on_send(resp)` waits until there is room for the new frame.
+        :param shard_size: If greater than 0, images are saved to .tar shards of at most this many bytes rather than as separate files. See above.
+        :param video_encoder: If not None, the `_img` pass of each avatar is streamed to a video rather than saved as image files. This is a function or class that creates a [`VideoEncoder`](../image_data/video_encoder.md) given a path and a framerate, for example [`FfmpegEncoder`](../image_data/ffmpeg_encoder.md). See above.
+        :param video_framerate: If `video_encoder` isn't None, this is the framerate of each video.
         """
 
         super().__init__()
@@ -86,6 +137,35 @@ class ImageCapture(AddOn):
         Raw [`Images` output data](../../api/output_data.md#Images) from the build. Key = The ID of the avatar. This is updated per frame. If an avatar didn't capture an image on this frame, it won't be in this dictionary.
         """
         self.images: Dict[str, Images] = dict()
+        """:field
+        The total number of frames that weren't saved because `max_in_flight` frames were already waiting to be saved. This is always 0 if `drop_frames == False`.
+        """
+        self.num_dropped_frames: int = 0
+        """:field
+        The total number of frames for which `on_send(resp)` had to wait because `max_in_flight` frames were already waiting to be saved.
+        """
+        self.num_blocked_frames: int = 0
+        self._num_workers: int = num_workers
+        self._max_in_flight: int = max_in_flight
+        self._drop_frames: bool = drop_frames
+        # The worker threads. This is created when it is first needed.
+        self._executor: Optional[ThreadPoolExecutor] = None
+        # The shard writer thread. This is created when it is first needed.
+        self._shard_executor: Optional[ThreadPoolExecutor] = None
+        # Frames that are waiting to be saved. Each element is a list of futures: one per avatar, or, if images are saved to shards, one to encode the record and one to write it.
+        self._in_flight: Deque[List[Future]] = deque()
+        # Write images to shards.
+        if shard_size > 0:
+            self._shard_writer: Optional[ImageShardWriter] = ImageShardWriter(path=self.path, shard_size=shard_size)
+        else:
+            self._shard_writer = None
+        # Stream images to videos.
+        if video_encoder is not None:
+            self._video_writer: Optional[VideoWriter] = VideoWriter(path=self.path, video_encoder=video_encoder,
+                                                                    framerate=video_framerate,
+                                                                    max_in_flight=max_in_flight)
+        else:
+            self._video_writer = None
 
     def get_initialization_commands(self) -> List[dict]:
         commands = [{"$type": "set_img_pass_encoding",
@@ -99,25 +179,26 @@ class ImageCapture(AddOn):
         return commands
 
     def on_send(self, resp: List[bytes]) -> None:
-        got_images = False
+        resp = Response.get_response(resp)
         self.images.clear()
-        for i in range(len(resp) - 1):
-            r_id = OutputData.get_data_type_id(resp[i])
-            if r_id == "imag":
-                images = Images(resp[i])
-                a = images.get_avatar_id()
-                # Store the image data.
-                self.images[a] = images
-                if self._save and (len(self.avatar_ids) == 0 or a in self.avatar_ids):
-                    output_dir = self.path.joinpath(a)
-                    if not output_dir.exists():
-                        output_dir.mkdir(parents=True)
-                    # Save images.
-                    TDWUtils.save_images(images=images,
-                                         output_directory=str(output_dir.resolve()),
-                                         filename=TDWUtils.zero_padding(self.frame, 4))
-                    got_images = True
-        if got_images:
+        # Images to save. Each element is a tuple: The images, the output directory.
+        frame_images: List[Tuple[Images, Path]] = list()
+        images: Images
+        for images in resp.get_output_data("imag"):
+            a = images.get_avatar_id()
+            # Store the image data.
+            self.images[a] = images
+            if self._save and (len(self.avatar_ids) == 0 or a in self.avatar_ids):
+                output_dir = self.path.joinpath(a)
+                if self._shard_writer is None and self._video_writer is None and not output_dir.exists():
+                    output_dir.mkdir(parents=True)
+                frame_images.append((images, output_dir))
+        if len(frame_images) > 0 and self._video_writer is not None:
+            self._write_video_frame(frame_images=frame_images)
+            self.frame += 1
+        elif len(frame_images) > 0:
+            # Save images.
+            self._save_frame(frame_images=frame_images, filename=TDWUtils.zero_padding(self.frame, 4))
             self.frame += 1
         # If we're requesting images per-frame, send the command.
         # We can't use the "always" value because of cases like that Magnebot that will turn off image capture.
@@ -154,6 +235,46 @@ class ImageCapture(AddOn):
         else:
             raise Exception(f"Invalid frequency: {self._frequency}")
 
+    def get_queue_depth(self) -> int:
+        """
+        :return: The number of frames that are waiting to be saved by the worker threads or the video writer thread.
+        """
+
+        if self._video_writer is not None:
+            return self._video_writer.get_queue_depth()
+        self._remove_saved_frames()
+        return len(self._in_flight)
+
+    def flush(self) -> None:
+        """
+        Wait until every frame has been saved. Call this at the end of a trial to ensure that every image is on disk. If `shard_size` is greater than 0, this also updates the index of the current shard. If `video_encoder` isn't None, this waits until every frame has been encoded, but the videos aren't finished until `close()` is called.
+        """
+
+        while len(self._in_flight) > 0:
+            for future in self._in_flight.popleft():
+                future.result()
+        if self._shard_writer is not None:
+            self._shard_writer.flush()
+        if self._video_writer is not None:
+            self._video_writer.flush()
+
+    def close(self) -> None:
+        """
+        Wait until every frame has been saved and then stop the worker threads. If `shard_size` is greater than 0, this also closes the current shard. If `video_encoder` isn't None, this finishes each video. If more images are saved after this, new worker threads will be started and images will be saved to a new shard or to new videos.
+        """
+
+        self.flush()
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+        if self._shard_executor is not None:
+            self._shard_executor.shutdown()
+            self._shard_executor = None
+        if self._shard_writer is not None:
+            self._shard_writer.close()
+        if self._video_writer is not None:
+            self._video_writer.close()
+
     def get_pil_images(self) -> Dict[str, Dict[str, Image]]:
         """
         Convert the latest image data from the build (`self.images`) to PIL images. Note that it is not necessary to call this function to save images; use this only to analyze an image at runtime.
@@ -169,6 +290,105 @@ class ImageCapture(AddOn):
                     TDWUtils.get_pil_image(images=self.images[avatar_id], index=i)
         return images
 
+    def _save_frame(self, frame_images: List[Tuple[Images, Path]], filename: str) -> None:
+        """
+        Save a frame of images, either immediately or in the worker threads.
+
+        :param frame_images: A list of tuples: The images, the output directory.
+        :param filename: The filename of each image, minus the pass prefix and the extension.
+        """
+
+        # Save the images now.
+        if self._num_workers <= 0:
+            # Save the frame as one record.
+            if self._shard_writer is not None:
+                self._shard_writer.write_images(key=filename, images=[images for images, _ in frame_images])
+            # Save each avatar's images separately.
+            else:
+                for images, output_dir in frame_images:
+                    self._save_images(images=images, output_directory=output_dir, filename=filename)
+            return
+        self._remove_saved_frames()
+        if len(self._in_flight) >= self._max_in_flight:
+            # Don't save this frame.
+            if self._drop_frames:
+                self.num_dropped_frames += 1
+                return
+            # Wait for the oldest frames to be saved.
+            self.num_blocked_frames += 1
+            while len(self._in_flight) >= self._max_in_flight:
+                for future in self._in_flight.popleft():
+                    future.result()
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self._num_workers)
+        if self._shard_writer is not None:
+            if self._shard_executor is None:
+                self._shard_executor = ThreadPoolExecutor(max_workers=1)
+            # Encode the record in a worker thread.
+            record = self._executor.submit(ImageShardWriter.get_record, [images for images, _ in frame_images])
+            # The shard writer thread writes the records in the order in which they were submitted, i.e. in frame order.
+            self._in_flight.append([record, self._shard_executor.submit(self._write_shard_record, filename, record)])
+        else:
+            self._in_flight.append([self._executor.submit(self._save_images, images, output_dir, filename)
+                                    for images, output_dir in frame_images])
+
+    def _write_video_frame(self, frame_images: List[Tuple[Images, Path]]) -> None:
+        """
+        Send the `_img` pass of each avatar to the video writer thread.
+
+        :param frame_images: A list of tuples: The images, the output directory.
+        """
+
+        frame: Dict[str, bytes] = dict()
+        for images, _ in frame_images:
+            for i in range(images.get_num_passes()):
+                if images.get_pass_mask(i) == "_img":
+                    frame[images.get_avatar_id()] = images.get_image(i)
+                    break
+        if len(frame) == 0:
+            return
+        if self._video_writer.is_full():
+            # Don't save this frame.
+            if self._drop_frames:
+                self.num_dropped_frames += 1
+                return
+            self.num_blocked_frames += 1
+        self._video_writer.write(frame=frame)
+
+    def _save_images(self, images: Images, output_directory: Path, filename: str) -> None:
+        """
+        Save each pass of an avatar's images. This might be called in a worker thread.
+
+        :param images: The images.
+        :param output_directory: The output directory.
+        :param filename: The filename of each image, minus the pass prefix and the extension.
+        """
+
+        TDWUtils.save_images(images=images,
+                             output_directory=str(output_directory.resolve()),
+                             filename=filename)
+
+    def _write_shard_record(self, key: str, record: Future) -> None:
+        """
+        Wait for a record to be encoded and then write it to the current shard. This is called in the shard writer thread.
+
+        :param key: The key of the record.
+        :param record: The future of the encoded record.
+        """
+
+        self._shard_writer.write(key=key, files=record.result())
+
+    def _remove_saved_frames(self) -> None:
+        """
+        Stop tracking frames that the worker threads have finished saving. If a worker thread raised an exception, it is raised here.
+
+        Frames are removed from the front of the queue, so a frame that is saved out of order is removed along with the frames before it.
+        """
+
+        while len(self._in_flight) > 0 and all([future.done() for future in self._in_flight[0]]):
+            for future in self._in_flight.popleft():
+                future.result()
+
     def _get_pass_mask_commands(self, pass_masks: List[str] = None) -> List[dict]:
         """
         :param pass_masks: The pass masks. If None, defaults to `["_img"]`.
@@ -1,33 +1,76 @@
 from pathlib import Path
-from typing import List
+from typing import List, Optional, BinaryIO
 from json import loads
+import numpy as np
 from tdw.add_ons.add_on import AddOn
+from tdw.add_ons.logger import Logger
 from tdw.type_aliases import PATH
 
 
 class LogPlayback(AddOn):
     """
     Load and play back commands that were logged by a [`Logger`](logger.md) add-on.
+
+    By default, `load(path)` reads the log file and adds each list of commands to `self.playback`. If `lazy=True`, the log file is read lazily: per `communicate()` call, this add-on reads the next line of the log file. The log is never loaded into memory all at once. In either case, playback can start at any frame, and can be limited to a range of frames:
+
+    ```python
+    from tdw.controller import Controller
+    from tdw.add_ons.log_playback import LogPlayback
+
+    c = Controller()
+    playback = LogPlayback()
+    # Play back frames 100 through 199.
+    playback.load(path="log.txt", start_frame=100, end_frame=200, lazy=True)
+    c.add_ons.append(playback)
+    while not playback.done:
+        c.communicate([])
+    c.communicate({"$type": "terminate"})
+    ```
     """
 
     def __init__(self):
         """
         (no arguments)
         """
-        
+
         super().__init__()
         # We don't want to wait a frame to start sending commands, so this is always initialized.
         self.initialized = True
         """:field
-        A list of lists of commands. Each list of commands is from a `communicate()` call from a prior controller, and will be sent per `communicate()` call to the current controller.
+        A list of lists of commands. Each list of commands is from a `communicate()` call from a prior controller, and will be sent per `communicate()` call to the current controller. If the log file was loaded with `lazy=True`, these commands are sent before the commands that haven't been read yet from the log file.
         """
         self.playback: List[List[dict]] = list()
+        """:field
+        The number of frames (lists of commands) in the log file.
+        """
+        self.num_frames: int = 0
+        """:field
+        The next frame in the log file that will be read.
+        """
+        self.frame: int = 0
+        """:field
+        Stop playing back the log file at this frame.
+        """
+        self.end_frame: int = 0
+        """:field
+        If True, every list of commands in `self.playback` and in the log file has been sent.
+        """
+        self.done: bool = True
+        # The offset of each frame in the log file.
+        self._offsets: np.ndarray = np.zeros(0, dtype=np.int64)
+        # The log file.
+        self._file: Optional[BinaryIO] = None
+        # The current offset in the log file.
+        self._offset: int = -1
 
-    def load(self, path: PATH) -> None:
+    def load(self, path: PATH, start_frame: int = 0, end_frame: int = None, lazy: bool = False) -> None:
         """
-        Load a log file. This will deserialize all the commands in the log file and add each list of commands to `self.record`. Per `communicate()` call (i.e. when `on_send(resp)` is invoked), this add-on will pop the first list of commands and add it to `self.commands`; in other words, it will send each list of commands exactly as they were sent when they were logged.
+        Load a log file. Per `communicate()` call (i.e. when `on_send(resp)` is invoked), this add-on will add the next list of commands to `self.commands`; in other words, it will send each list of commands exactly as they were sent when they were logged.
 
         :param path: The path to the log file as a string or [`Path`](https://docs.python.org/3/library/pathlib.html).
+        :param start_frame: Start playing back the log file at this frame.
+        :param end_frame: Stop playing back the log file at this frame. If None, play back the entire log file.
+        :param lazy: If False, read the log file now and add each list of commands to `self.playback`. If True, don't add the commands to `self.playback`; instead, read the next list of commands from the log file per `communicate()` call. Use `self.done` to check whether playback is done.
         """
 
         # Get or create the playback file path.
@@ -36,10 +79,62 @@ class LogPlayback(AddOn):
         else:
             p: Path = path
         assert p.exists(), f"Log not found: {p}"
-        # Open the file. Strip the file of empty lines. Remove Windows line breaks. Split along line breaks.
-        for commands_text in p.read_text(encoding="utf-8").strip().replace("\r", "").split("\n"):
-            # Deserialize the list of commands and append it.
-            self.playback.append(loads(commands_text))
+        self.close()
+        self._offsets = Logger.get_offsets(p)
+        self.num_frames = len(self._offsets)
+        self._file = Logger.open_log(p)
+        self._offset = 0
+        self.end_frame = self.num_frames if end_frame is None else min(end_frame, self.num_frames)
+        self.seek(frame=start_frame)
+        # Read every frame now.
+        if not lazy:
+            self.playback.extend([self.read(frame=frame) for frame in range(self.frame, self.end_frame)])
+            self.frame = self.end_frame
+            self.done = len(self.playback) == 0
+
+    def seek(self, frame: int) -> None:
+        """
+        Set the next frame in the log file that will be sent.
+
+        :param frame: The frame.
+        """
+
+        if frame < 0 or frame > self.num_frames:
+            raise Exception(f"Invalid frame: {frame}. The log has {self.num_frames} frames.")
+        self.frame = frame
+        self.done = len(self.playback) == 0 and self.frame >= self.end_frame
+
+    def read(self, frame: int) -> List[dict]:
+        """
+        :param frame: The frame.
+
+        :return: The list of commands sent on this frame. This doesn't change which frame will be sent next.
+        """
+
+        if frame < 0 or frame >= self.num_frames:
+            raise Exception(f"Invalid frame: {frame}. The log has {self.num_frames} frames.")
+        offset = int(self._offsets[frame])
+        # Seeking backwards in a compressed file is slow, so only seek if the file isn't already at this frame.
+        if self._offset != offset:
+            self._file.seek(offset)
+        line = self._file.readline()
+        self._offset = offset + len(line)
+        return loads(line)
+
+    def close(self) -> None:
+        """
+        Close the log file.
+        """
+
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self._offset = -1
+        self._offsets = np.zeros(0, dtype=np.int64)
+        self.num_frames = 0
+        self.frame = 0
+        self.end_frame = 0
+        self.done = len(self.playback) == 0
 
     def get_initialization_commands(self) -> List[dict]:
         return []
@@ -48,3 +143,7 @@ class LogPlayback(AddOn):
         # Send the next list of commands.
         if len(self.playback) > 0:
             self.commands.extend(self.playback.pop(0))
+        elif self.frame < self.end_frame:
+            self.commands.extend(self.read(frame=self.frame))
+            self.frame += 1
+        self.done = len(self.playback) == 0 and self.frame >= self.end_frame
@@ -1,6 +1,8 @@
+import gzip
 from pathlib import Path
-from typing import List
+from typing import List, Optional, BinaryIO
 from json import dumps
+import numpy as np
 from tdw.output_data import OutputData, LogMessage
 from tdw.add_ons.add_on import AddOn
 from tdw.type_aliases import PATH
@@ -23,28 +25,42 @@ class Logger(AddOn):
     ```
 
     The log file can be automatically re-loaded into another controller using the [`LogPlayback`](log_playback.md) add-on.
+
+    Each line of the log file is the list of commands sent on one `communicate()` call, serialized as JSON. The log file is written with a buffered file handle; it is flushed every `flush_interval` frames, when the `terminate` command is sent, or when you call `flush()` or `close()`. If the controller crashes or is killed, the log will include every frame up to the most recent flush. The logger also writes an index file (`<path>.index`) with the offset of each line, which allows `LogPlayback` to seek to any frame without reading the whole log.
+
+    If `compress` is True, the log file is compressed with gzip.
     """
 
-    def __init__(self, path: PATH, overwrite: bool = True, log_commands_in_build: bool = False):
+    # The size of the file buffer.
+    _BUFFER_SIZE: int = 1 << 16
+    # The size of each chunk when scanning a log file for lines.
+    _CHUNK_SIZE: int = 1 << 22
+
+    def __init__(self, path: PATH, overwrite: bool = True, log_commands_in_build: bool = False, compress: bool = False,
+                 flush_interval: int = 100):
         """
         :param path: The path to the log file as a string or [`Path`](https://docs.python.org/3/library/pathlib.html).
         :param overwrite: If True and a log file already exists at `path`, overwrite the file.
         :param log_commands_in_build: If True, the build will log every message received and every command executed in the [Player log](https://docs.unity3d.com/Manual/LogFiles.html).
+        :param compress: If True, compress the log file with gzip.
+        :param flush_interval: Write the buffered log to disk every this many frames. If 1, the log is written every frame. If 0, the log is written only when the `terminate` command is sent, or when you call `flush()` or `close()`.
         """
 
         super().__init__()
         # If True, the build will log every message received and every command executed in the Player log.
         self._log_commands_in_build: bool = log_commands_in_build
-        # Get or create the playback file path.
-        if isinstance(path, str):
-            self._path: Path = Path(path)
-        else:
-            self._path: Path = path
-        if not self._path.parent.exists():
-            self._path.parent.mkdir(parents=True)
-        # Remove an existing log file.
-        if overwrite and self._path.exists():
-            self._path.unlink()
+        # If True, compress the log file.
+        self._compress: bool = compress
+        # Write the buffered log to disk every this many frames.
+        self._flush_interval: int = flush_interval
+        # The number of frames logged since the last flush.
+        self._num_unflushed_frames: int = 0
+        # The log file and the index file. These are opened when they are first needed.
+        self._file: Optional[BinaryIO] = None
+        self._index_file: Optional[BinaryIO] = None
+        # The offset of the next line in the uncompressed log.
+        self._offset: int = 0
+        self._set_path(path=path, overwrite=overwrite)
 
     def on_send(self, resp: List[bytes]) -> None:
         for i in range(len(resp) - 1):
@@ -62,9 +78,45 @@ class Logger(AddOn):
         return commands
 
     def before_send(self, commands: List[dict]) -> None:
+        if self._file is None:
+            self._open()
         # Log the commands.
-        with self._path.open("at", encoding="utf-8") as f:
-            f.write(dumps(commands) + "\n")
+        line = (dumps(commands) + "\n").encode("utf-8")
+        self._file.write(line)
+        self._index_file.write(np.array([self._offset], dtype="<u8").tobytes())
+        self._offset += len(line)
+        self._num_unflushed_frames += 1
+        # The build is about to quit, so write the log to disk now.
+        for command in commands:
+            if command["$type"] == "terminate":
+                self.flush()
+                return
+        # Periodically write the log to disk so that most of it is saved if the controller crashes.
+        if 0 < self._flush_interval <= self._num_unflushed_frames:
+            self.flush()
+
+    def flush(self) -> None:
+        """
+        Write the buffered log to disk.
+        """
+
+        if self._file is not None:
+            # Flush the log before the index so that the index never points beyond the end of the log.
+            self._file.flush()
+            self._index_file.flush()
+        self._num_unflushed_frames = 0
+
+    def close(self) -> None:
+        """
+        Write the buffered log to disk and close the log file. If more commands are sent after this, they will be appended to the log file.
+        """
+
+        if self._file is not None:
+            self.flush()
+            self._file.close()
+            self._index_file.close()
+            self._file = None
+            self._index_file = None
 
     def reset(self, path: PATH, overwrite: bool = True) -> None:
         """
@@ -75,13 +127,146 @@ class Logger(AddOn):
         """
 
         self.initialized = False
+        self.close()
+        self._set_path(path=path, overwrite=overwrite)
+
+    @staticmethod
+    def get_index_path(path: PATH) -> Path:
+        """
+        :param path: The path to a log file as a string or [`Path`](https://docs.python.org/3/library/pathlib.html).
+
+        :return: The path to the log file's index file.
+        """
+
+        if isinstance(path, str):
+            path = Path(path)
+        return path.parent.joinpath(path.name + ".index")
+
+    @staticmethod
+    def get_offsets(path: PATH) -> np.ndarray:
+        """
+        Get the offset of each line in a log file. If the index file is missing or incomplete, the unindexed part of the log file is scanned.
+
+        :param path: The path to a log file as a string or [`Path`](https://docs.python.org/3/library/pathlib.html).
+
+        :return: The offset of each line in the uncompressed log file as a numpy array.
+        """
+
+        if isinstance(path, str):
+            path = Path(path)
+        index_path = Logger.get_index_path(path)
+        if index_path.exists():
+            offsets = np.fromfile(str(index_path.resolve()), dtype="<u8").astype(np.int64)
+        else:
+            offsets = np.zeros(0, dtype=np.int64)
+        # Seeking in a compressed file requires decompressing it, so trust the index.
+        if len(offsets) > 0 and Logger.is_compressed(path):
+            return offsets
+        # Scan the log from the last indexed line.
+        if len(offsets) > 0:
+            start = int(offsets[-1])
+            offsets = offsets[:-1]
+        else:
+            start = 0
+        starts: List[np.ndarray] = [offsets, np.array([start], dtype=np.int64)]
+        num_lines = 0
+        with Logger.open_log(path) as f:
+            f.seek(start)
+            offset = start
+            while True:
+                chunk = f.read(Logger._CHUNK_SIZE)
+                if len(chunk) == 0:
+                    break
+                # The start of the next line is after each line break.
+                line_breaks = np.flatnonzero(np.frombuffer(chunk, dtype=np.uint8) == 10)
+                starts.append(line_breaks.astype(np.int64) + offset + 1)
+                num_lines += len(line_breaks)
+                offset += len(chunk)
+        # Ignore the last line if it is incomplete.
+        return np.concatenate(starts)[:len(offsets) + num_lines]
+
+    @staticmethod
+    def is_compressed(path: PATH) -> bool:
+        """
+        :param path: The path to a log file as a string or [`Path`](https://docs.python.org/3/library/pathlib.html).
+
+        :return: True if the log file is compressed with gzip.
+        """
+
+        if isinstance(path, str):
+            path = Path(path)
+        with path.open("rb") as f:
+            return f.read(2) == b"\x1f\x8b"
+
+    @staticmethod
+    def open_log(path: PATH) -> BinaryIO:
+        """
+        :param path: The path to a log file as a string or [`Path`](https://docs.python.org/3/library/pathlib.html).
+
+        :return: The log file opened for reading. If the log is compressed, the file is decompressed as it is read.
+        """
+
+        if isinstance(path, str):
+            path = Path(path)
+        if Logger.is_compressed(path):
+            return gzip.open(str(path.resolve()), "rb")
+        else:
+            return path.open("rb")
+
+    def _set_path(self, path: PATH, overwrite: bool) -> None:
+        """
+        Set the path to the log file.
+
+        :param path: The path to the log file as a string or [`Path`](https://docs.python.org/3/library/pathlib.html).
+        :param overwrite: If True and a log file already exists at `path`, overwrite the file.
+        """
+
         # Get or create the playback file path.
         if isinstance(path, str):
-            self._path = Path(path)
+            self._path: Path = Path(path)
         else:
-            self._path = path
+            self._path: Path = path
         if not self._path.parent.exists():
             self._path.parent.mkdir(parents=True)
-        # Delete an existing log.
-        if overwrite and self._path.exists():
-            self._path.unlink()
+        # Remove an existing log file.
+        if overwrite:
+            if self._path.exists():
+                self._path.unlink()
+            index_path = Logger.get_index_path(self._path)
+            if index_path.exists():
+                index_path.unlink()
+
+    def _open(self) -> None:
+        """
+        Open the log file and the index file.
+        """
+
+        index_path = Logger.get_index_path(self._path)
+        # Append to an existing log.
+        if self._path.exists() and self._path.stat().st_size > 0:
+            # Make sure that the index includes every line of the existing log.
+            if Logger.is_compressed(self._path) != self._compress:
+                raise Exception(f"Can't append to {self._path.resolve()} because it is "
+                                f"{'' if self._compress else 'not '}compressed.")
+            offsets = Logger.get_offsets(self._path)
+            offsets.astype("<u8").tofile(str(index_path.resolve()))
+            # Get the size of the uncompressed log.
+            if self._compress:
+                self._offset = 0
+                with Logger.open_log(self._path) as f:
+                    while True:
+                        chunk = f.read(Logger._CHUNK_SIZE)
+                        if len(chunk) == 0:
+                            break
+                        self._offset += len(chunk)
+            else:
+                self._offset = self._path.stat().st_size
+        else:
+            self._offset = 0
+            if index_path.exists():
+                index_path.unlink()
+        if self._compress:
+            self._file = gzip.open(str(self._path.resolve()), "ab")
+        else:
+            self._file = self._path.open("ab", buffering=Logger._BUFFER_SIZE)
+        self._index_file = index_path.open("ab", buffering=Logger._BUFFER_SIZE)
@@ -1,7 +1,8 @@
 from typing import List, Dict
 from tdw.tdw_utils import TDWUtils
 from tdw.add_ons.add_on import AddOn
-from tdw.output_data import OutputData, StaticRigidbodies, Bounds, StaticRobot
+from tdw.output_data import StaticRigidbodies, Bounds, StaticRobot
+from tdw.response import Response
 
 
 class NavMesh(AddOn):
@@ -55,39 +56,39 @@ class NavMesh(AddOn):
         kinematics: Dict[int, bool] = dict()
         boxes: Dict[int, bool] = dict()
         robots: List[int] = list()
-        for i in range(len(resp) - 1):
-            r_id = OutputData.get_data_type_id(resp[i])
-            # Use bounds data to sort objects by position and area.
-            if r_id == "boun":
-                bounds = Bounds(resp[i])
-                for j in range(bounds.get_num()):
-                    bottom = bounds.get_bottom(j)[1]
-                    object_id = bounds.get_id(j)
-                    # Objects below the floor, objects that are too high up, or excluded objects.
-                    if bottom <= -0.1 or bottom > self._max_y or object_id in self._exclude_objects:
-                        continue
-                    # Get the area.
-                    extents = TDWUtils.get_bounds_extents(bounds, j)
-                    area = extents[0] * extents[2]
-                    # Ignore small objects.
-                    if area < self._exclude_area:
-                        continue
-                    # Remember the area.
-                    areas[object_id] = area
-                    # Get the roundness
-                    if extents[0] < extents[2]:
-                        roundness = extents[0] / extents[2]
-                    else:
-                        roundness = extents[2] / extents[0]
-                    boxes[object_id] = roundness < self._roundness_threshold
-            # Use static rigidbodies data to sort objects by kinematic state.
-            elif r_id == "srig":
-                static_rigidbodies = StaticRigidbodies(resp[i])
-                for j in range(static_rigidbodies.get_num()):
-                    kinematics[static_rigidbodies.get_id(j)] = static_rigidbodies.get_kinematic(j)
-            # Ignore all robots.
-            elif r_id == "srob":
-                robots.append(StaticRobot(resp[i]).get_id())
+        resp = Response.get_response(resp)
+        # Use bounds data to sort objects by position and area.
+        bounds: Bounds
+        for bounds in resp.get_output_data("boun"):
+            for j in range(bounds.get_num()):
+                bottom = bounds.get_bottom(j)[1]
+                object_id = bounds.get_id(j)
+                # Objects below the floor, objects that are too high up, or excluded objects.
+                if bottom <= -0.1 or bottom > self._max_y or object_id in self._exclude_objects:
+                    continue
+                # Get the area.
+                extents = TDWUtils.get_bounds_extents(bounds, j)
+                area = extents[0] * extents[2]
+                # Ignore small objects.
+                if area < self._exclude_area:
+                    continue
+                # Remember the area.
+                areas[object_id] = area
+                # Get the roundness
+                if extents[0] < extents[2]:
+                    roundness = extents[0] / extents[2]
+                else:
+                    roundness = extents[2] / extents[0]
+                boxes[object_id] = roundness < self._roundness_threshold
+        # Use static rigidbodies data to sort objects by kinematic state.
+        static_rigidbodies: StaticRigidbodies
+        for static_rigidbodies in resp.get_output_data("srig"):
+            for j in range(static_rigidbodies.get_num()):
+                kinematics[static_rigidbodies.get_id(j)] = static_rigidbodies.get_kinematic(j)
+        # Ignore all robots.
+        static_robot: StaticRobot
+        for static_robot in resp.get_output_data("srob"):
+            robots.append(static_robot.get_id())
         for object_id in areas:
             if object_id not in kinematics:
                 continue
@@ -1,7 +1,9 @@
-from typing import Dict, List
+from pathlib import Path
+from typing import Dict, List, Union, Callable, Iterator, Optional, Tuple, TypeVar, Mapping
 import numpy as np
-from tdw.output_data import OutputData, Transforms, Rigidbodies, Bounds, SegmentationColors, Categories, \
-    StaticRigidbodies
+from tdw.type_aliases import PATH
+from tdw.output_data import Transforms, Rigidbodies, Bounds, SegmentationColors, Categories, StaticRigidbodies
+from tdw.response import Response
 from tdw.add_ons.add_on import AddOn
 from tdw.object_data.object_static import ObjectStatic
 from tdw.object_data.transform import Transform
@@ -46,6 +48,52 @@ class _StaticRigidbody:
         self.bounciness: float = bounciness
 
 
+T = TypeVar("T")
+
+
+class _ObjectDataView(Mapping[int, T]):
+    """
+    A read-only dictionary of per-object data. Key = The object ID. Values are created on demand from rows of the `ObjectManager` arrays.
+    """
+
+    def __init__(self, object_indices: Dict[int, int], get_value: Callable[[int], T]):
+        """
+        :param object_indices: The row index of each object ID.
+        :param get_value: A function that returns a value, given a row index.
+        """
+
+        self._object_indices: Dict[int, int] = object_indices
+        self._get_value: Callable[[int], T] = get_value
+        # The IDs of the objects that had this type of data on this frame.
+        self._ids: np.ndarray = np.zeros(0, dtype=np.int32)
+        # A set of `self._ids`. This is created only if needed.
+        self._id_set: Optional[set] = None
+
+    def set_ids(self, ids: np.ndarray) -> None:
+        """
+        :param ids: The IDs of the objects that had this type of data on this frame.
+        """
+
+        self._ids = ids
+        self._id_set = None
+
+    def __getitem__(self, key: int) -> T:
+        if key not in self:
+            raise KeyError(key)
+        return self._get_value(self._object_indices[key])
+
+    def __contains__(self, key) -> bool:
+        if self._id_set is None:
+            self._id_set = set(self._ids.tolist())
+        return key in self._id_set
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self._ids.tolist())
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+
 class ObjectManager(AddOn):
     """
     A simple manager class for objects in the scene. This add-on can cache static object data (name, ID, etc.) and record dynamic data (position, velocity, etc.) per frame.
@@ -97,14 +145,72 @@ class ObjectManager(AddOn):
         c.communicate([])
     c.communicate({"$type": "terminate"})
     ```
+
+    ## Array mode
+
+    By default, the object manager creates a new [`Transform`](../object_data/transform.md), [`Rigidbody`](../object_data/rigidbody.md), and [`Bound`](../object_data/bound.md) object per object per frame. If there are many objects in the scene, this can be slow.
+
+    If `arrays=True` in the constructor, the object manager instead copies the dynamic data of every object into numpy arrays, for example `positions`, which are allocated once and updated in-place every frame. Each object has a row in each array. `object_indices` is the row index of each object and `object_ids` is the object ID of each row. An object's row doesn't change unless an object is destroyed.
+
+    ```python
+    from tdw.add_ons.object_manager import ObjectManager
+
+    om = ObjectManager(arrays=True)
+    # ... add the object manager to a controller, add objects, call communicate(commands) ...
+    # Get the position of every object.
+    print(om.positions)
+    # Get the position of object 0.
+    print(om.positions[om.object_indices[0]])
+    ```
+
+    In array mode, `transforms`, `rigidbodies`, and `bounds` are read-only dictionaries whose values are created on demand. Their numpy arrays are views of the rows of the arrays and will change on the next frame; if you want to keep the data, copy it.
+
+    If `transforms=True`, objects that no longer have transform data (because they were destroyed) are removed from the arrays. If `transforms=False`, destroyed objects remain in the arrays until `reset()` is called.
+
+    ## History
+
+    If `history` is greater than 0 in the constructor (this requires `arrays=True`), the object manager also records the positions, rotations, velocities, and angular velocities of each object on the last `history` frames. The history is stored in preallocated ring buffers.
+
+    ```python
+    from tdw.add_ons.object_manager import ObjectManager
+
+    om = ObjectManager(transforms=True, rigidbodies=True, arrays=True, history=500)
+    # ... add the object manager to a controller, add objects, call communicate(commands) ...
+    # The positions of objects 0 and 1 on the last 10 frames. Shape: (10, 2, 3)
+    positions = om.get_history(data="positions", object_ids=[0, 1], num_frames=10)
+    # The accelerations of objects 0 and 1 on the last 10 frames.
+    accelerations = om.get_accelerations(dt=0.01, object_ids=[0, 1], num_frames=10)
+    # Save the history at the end of the trial.
+    om.save_history("trial.npz")
+    om.clear_history()
+    ```
+
+    If an object didn't exist on a frame, or if there wasn't any transform or rigidbody data for the object on that frame, its history data on that frame is NaN. For example, if `rigidbodies=False`, the velocities are always NaN. If the trial is longer than `history` frames, only the last `history` frames are kept.
+
+    If an object is destroyed, its history is kept until `save_history(path)` or `clear_history()` is called, or until every frame of its history has been overwritten.
     """
-    def __init__(self, transforms: bool = True, rigidbodies: bool = False, bounds: bool = False):
+
+    # The initial number of rows in each array.
+    _INITIAL_CAPACITY: int = 16
+    # The number of values per object per type of history data.
+    _HISTORY_SHAPES: Dict[str, int] = {"positions": 3,
+                                       "rotations": 4,
+                                       "velocities": 3,
+                                       "angular_velocities": 3}
+
+    def __init__(self, transforms: bool = True, rigidbodies: bool = False, bounds: bool = False, arrays: bool = False,
+                 history: int = 0):
         """
         :param transforms: If True, record the [transform data](../object_data/transform.md) of each object in the scene.
         :param rigidbodies: If True, record the [rigidbody data](../object_data/rigidbody.md) of each rigidbody object in the scene.
         :param bounds: If True, record the [bounds data](../object_data/bound.md) of each object in the scene.
+        :param arrays: If True, record the dynamic data of each object in numpy arrays rather than creating new objects per frame. See above.
+        :param history: The number of frames of history per object. If 0, history isn't recorded. If greater than 0, `arrays` must be True. See above.
         """
 
+        if history > 0 and not arrays:
+            raise Exception("ObjectManager history requires arrays=True.")
+
         super().__init__()
         self._cached_static_data: bool = False
         self._send_transforms: str = "always" if transforms else "never"
@@ -130,6 +236,88 @@ class ObjectManager(AddOn):
         The [bounds data](../object_data/bound.md) for each object on the scene on this frame. Key = The object ID. If `bounds=False` in the constructor, this dictionary will be empty.
         """
         self.bounds: Dict[int, Bound] = dict()
+        self._arrays: bool = arrays
+        """:field
+        If `arrays=True` in the constructor, this is the row index of each object in the arrays. Key = The object ID.
+        """
+        self.object_indices: Dict[int, int] = dict()
+        """:field
+        If `arrays=True` in the constructor, this is the object ID of each row.
+        """
+        self.object_ids: np.ndarray = np.zeros(0, dtype=np.int32)
+        """:field
+        If `arrays=True` in the constructor and `transforms=True`, this is the position of each object as an `(N, 3)` array.
+        """
+        self.positions: np.ndarray = np.zeros((0, 3), dtype=np.float32)
+        """:field
+        If `arrays=True` in the constructor and `transforms=True`, this is the rotation quaternion of each object as an `(N, 4)` array.
+        """
+        self.rotations: np.ndarray = np.zeros((0, 4), dtype=np.float32)
+        """:field
+        If `arrays=True` in the constructor and `transforms=True`, this is the forward directional vector of each object as an `(N, 3)` array.
+        """
+        self.forwards: np.ndarray = np.zeros((0, 3), dtype=np.float32)
+        """:field
+        If `arrays=True` in the constructor and `rigidbodies=True`, this is the velocity of each object as an `(N, 3)` array.
+        """
+        self.velocities: np.ndarray = np.zeros((0, 3), dtype=np.float32)
+        """:field
+        If `arrays=True` in the constructor and `rigidbodies=True`, this is the angular velocity of each object as an `(N, 3)` array.
+        """
+        self.angular_velocities: np.ndarray = np.zeros((0, 3), dtype=np.float32)
+        """:field
+        If `arrays=True` in the constructor and `rigidbodies=True`, this is whether each object is sleeping as an `(N,)` boolean array.
+        """
+        self.sleeping: np.ndarray = np.zeros(0, dtype=bool)
+        """:field
+        If `arrays=True` in the constructor, this is the bounds of each object as an `(N, 7, 3)` array. The points are in the order: front, back, left, right, top, bottom, center. If `bounds=False` in the constructor, this is only set on the first frame.
+        """
+        self.bounds_positions: np.ndarray = np.zeros((0, 7, 3), dtype=np.float32)
+        # The number of objects in the arrays.
+        self._num_objects: int = 0
+        # The preallocated arrays. The public arrays are views of the first `self._num_objects` rows.
+        self._array_data: Dict[str, np.ndarray] = dict()
+        # The rows of the most recent IDs per type of output data. Key = The output data ID.
+        # Value = Tuple: The object IDs, the rows.
+        self._rows: Dict[str, Tuple[np.ndarray, Union[slice, np.ndarray]]] = dict()
+        # The number of frames of history.
+        self._history_length: int = history
+        # The history ring buffers. Key = The type of data. Value = An array of shape `(history, capacity, n)`.
+        self._history: Dict[str, np.ndarray] = dict()
+        # The object ID of each column of the history ring buffers. This includes objects that were removed from the arrays.
+        self._history_ids: List[int] = list()
+        # The column of each object in the history ring buffers. Key = The object ID.
+        self._history_indices: Dict[int, int] = dict()
+        # The column in the history ring buffers of each row of the arrays. If this is a slice, the columns are the same as the rows.
+        self._history_columns: Union[slice, np.ndarray] = slice(0, 0)
+        # Objects that were removed from the arrays but still have history. Key = The object ID. Value = The number of frames until every frame of its history is NaN.
+        self._removed_history: Dict[int, int] = dict()
+        # The frame number of each frame in the ring buffers.
+        self._history_frames: np.ndarray = np.full(history, -1, dtype=np.int64)
+        # The index in the ring buffers of the next frame.
+        self._history_index: int = 0
+        # The number of frames recorded, up to `history`.
+        self._num_history_frames: int = 0
+        if self._arrays:
+            self._allocate_arrays(capacity=ObjectManager._INITIAL_CAPACITY)
+            if self._history_length > 0:
+                self._allocate_history(capacity=ObjectManager._INITIAL_CAPACITY)
+            self.transforms = _ObjectDataView(object_indices=self.object_indices,
+                                              get_value=lambda row: Transform(position=self.positions[row],
+                                                                              rotation=self.rotations[row],
+                                                                              forward=self.forwards[row]))
+            self.rigidbodies = _ObjectDataView(object_indices=self.object_indices,
+                                               get_value=lambda row: Rigidbody(velocity=self.velocities[row],
+                                                                               angular_velocity=self.angular_velocities[row],
+                                                                               sleeping=bool(self.sleeping[row])))
+            self.bounds = _ObjectDataView(object_indices=self.object_indices,
+                                          get_value=lambda row: Bound(front=self.bounds_positions[row][0],
+                                                                      back=self.bounds_positions[row][1],
+                                                                      left=self.bounds_positions[row][2],
+                                                                      right=self.bounds_positions[row][3],
+                                                                      top=self.bounds_positions[row][4],
+                                                                      bottom=self.bounds_positions[row][5],
+                                                                      center=self.bounds_positions[row][6]))
 
     def get_initialization_commands(self) -> List[dict]:
         return [{"$type": "send_segmentation_colors"},
@@ -143,6 +331,7 @@ class ObjectManager(AddOn):
                  "frequency": self._send_transforms}]
 
     def on_send(self, resp: List[bytes]) -> None:
+        resp = Response.get_response(resp)
         # Cache static data.
         if not self._cached_static_data:
             self._cached_static_data = True
@@ -152,34 +341,32 @@ class ObjectManager(AddOn):
             static_rigidbodies: Dict[int, _StaticRigidbody] = dict()
             sizes: Dict[int, np.ndarray] = dict()
             categories: Dict[int, str] = dict()
-            for i in range(len(resp) - 1):
-                r_id = OutputData.get_data_type_id(resp[i])
-                # Get the name and the segmentation color.
-                if r_id == "segm":
-                    segm = SegmentationColors(resp[i])
-                    for j in range(segm.get_num()):
-                        object_id = segm.get_object_id(j)
-                        segmentation_colors[object_id] = np.array(segm.get_object_color(j))
-                        names[object_id] = segm.get_object_name(j).lower()
-                        categories[object_id] = segm.get_object_category(j)
-                elif r_id == "boun":
-                    boun = Bounds(resp[i])
-                    for j in range(boun.get_num()):
-                        sizes[boun.get_id(j)] = np.array([float(np.abs(boun.get_right(j)[0] - boun.get_left(j)[0])),
-                                                          float(np.abs(boun.get_top(j)[1] - boun.get_bottom(j)[1])),
-                                                          float(np.abs(boun.get_front(j)[2] - boun.get_back(j)[2]))])
-                elif r_id == "srig":
-                    srig = StaticRigidbodies(resp[i])
-                    for j in range(srig.get_num()):
-                        static_rigidbodies[srig.get_id(j)] = _StaticRigidbody(mass=srig.get_mass(j),
-                                                                              kinematic=srig.get_kinematic(j),
-                                                                              dynamic_friction=srig.get_dynamic_friction(j),
-                                                                              static_friction=srig.get_static_friction(j),
-                                                                              bounciness=srig.get_bounciness(j))
-                elif r_id == "cate":
-                    cate = Categories(resp[i])
-                    for j in range(cate.get_num_categories()):
-                        self.categories[cate.get_category_name(j)] = np.array(cate.get_category_color(j))
+            # Get the name and the segmentation color.
+            segm: SegmentationColors
+            for segm in resp.get_output_data("segm"):
+                for j in range(segm.get_num()):
+                    object_id = segm.get_object_id(j)
+                    segmentation_colors[object_id] = np.array(segm.get_object_color(j))
+                    names[object_id] = segm.get_object_name(j).lower()
+                    categories[object_id] = segm.get_object_category(j)
+            boun: Bounds
+            for boun in resp.get_output_data("boun"):
+                for j in range(boun.get_num()):
+                    sizes[boun.get_id(j)] = np.array([float(np.abs(boun.get_right(j)[0] - boun.get_left(j)[0])),
+                                                      float(np.abs(boun.get_top(j)[1] - boun.get_bottom(j)[1])),
+                                                      float(np.abs(boun.get_front(j)[2] - boun.get_back(j)[2]))])
+            srig: StaticRigidbodies
+            for srig in resp.get_output_data("srig"):
+                for j in range(srig.get_num()):
+                    static_rigidbodies[srig.get_id(j)] = _StaticRigidbody(mass=srig.get_mass(j),
+                                                                          kinematic=srig.get_kinematic(j),
+                                                                          dynamic_friction=srig.get_dynamic_friction(j),
+                                                                          static_friction=srig.get_static_friction(j),
+                                                                          bounciness=srig.get_bounciness(j))
+            cate: Categories
+            for cate in resp.get_output_data("cate"):
+                for j in range(cate.get_num_categories()):
+                    self.categories[cate.get_category_name(j)] = np.array(cate.get_category_color(j))
             # Cache the sorted data.
             for object_id in segmentation_colors:
                 self.objects_static[object_id] = ObjectStatic(object_id=object_id,
@@ -193,33 +380,34 @@ class ObjectManager(AddOn):
                                                               size=sizes[object_id],
                                                               category=categories[object_id])
         # Set dynamic data.
+        if self._arrays:
+            self._set_arrays(resp=resp)
+            return
         self.transforms.clear()
         self.rigidbodies.clear()
         self.bounds.clear()
-        for i in range(len(resp) - 1):
-            r_id = OutputData.get_data_type_id(resp[i])
-            if r_id == "tran":
-                tran = Transforms(resp[i])
-                for j in range(tran.get_num()):
-                    self.transforms[tran.get_id(j)] = Transform(position=tran.get_position(j),
-                                                                rotation=tran.get_rotation(j),
-                                                                forward=tran.get_forward(j))
-            elif r_id == "rigi":
-                rigi = Rigidbodies(resp[i])
-                for j in range(rigi.get_num()):
-                    self.rigidbodies[rigi.get_id(j)] = Rigidbody(velocity=rigi.get_velocity(j),
-                                                                 angular_velocity=rigi.get_angular_velocity(j),
-                                                                 sleeping=rigi.get_sleeping(j))
-            elif r_id == "boun":
-                boun = Bounds(resp[i])
-                for j in range(boun.get_num()):
-                    self.bounds[boun.get_id(j)] = Bound(front=boun.get_front(j),
-                                                        back=boun.get_back(j),
-                                                        left=boun.get_left(j),
-                                                        right=boun.get_right(j),
-                                                        top=boun.get_top(j),
-                                                        bottom=boun.get_bottom(j),
-                                                        center=boun.get_center(j))
+        tran: Transforms
+        for tran in resp.get_output_data("tran"):
+            for j in range(tran.get_num()):
+                self.transforms[tran.get_id(j)] = Transform(position=tran.get_position(j),
+                                                            rotation=tran.get_rotation(j),
+                                                            forward=tran.get_forward(j))
+        rigi: Rigidbodies
+        for rigi in resp.get_output_data("rigi"):
+            for j in range(rigi.get_num()):
+                self.rigidbodies[rigi.get_id(j)] = Rigidbody(velocity=rigi.get_velocity(j),
+                                                             angular_velocity=rigi.get_angular_velocity(j),
+                                                             sleeping=rigi.get_sleeping(j))
+        boun: Bounds
+        for boun in resp.get_output_data("boun"):
+            for j in range(boun.get_num()):
+                self.bounds[boun.get_id(j)] = Bound(front=boun.get_front(j),
+                                                    back=boun.get_back(j),
+                                                    left=boun.get_left(j),
+                                                    right=boun.get_right(j),
+                                                    top=boun.get_top(j),
+                                                    bottom=boun.get_bottom(j),
+                                                    center=boun.get_center(j))
 
     def reset(self) -> None:
         """
@@ -230,3 +418,347 @@ class ObjectManager(AddOn):
         self.objects_static.clear()
         self.categories.clear()
         self.initialized = False
+        if self._arrays:
+            self._set_num_objects(ids=np.zeros(0, dtype=np.int32))
+            for view in [self.transforms, self.rigidbodies, self.bounds]:
+                view.set_ids(np.zeros(0, dtype=np.int32))
+            if self._history_length > 0:
+                self.clear_history()
+
+    def _set_arrays(self, resp: Response) -> None:
+        """
+        Copy the dynamic data of each object into the arrays.
+
+        :param resp: The response from the build.
+        """
+
+        trans: List[Transforms] = resp.get_output_data("tran")
+        tran_rows: Optional[Union[slice, np.ndarray]] = None
+        rigi_rows: Optional[Union[slice, np.ndarray]] = None
+        if len(trans) > 0:
+            ids = ObjectManager._concatenate([tran.get_ids() for tran in trans])
+            # Remove objects that don't have transforms anymore.
+            if self._send_transforms == "always" and not ("tran" in self._rows and np.array_equal(self._rows["tran"][0], ids)):
+                exists = np.isin(self.object_ids, ids)
+                if not np.all(exists):
+                    self._set_num_objects(ids=self.object_ids[exists])
+            rows = self._get_rows(r_id="tran", ids=ids)
+            tran_rows = rows
+            self._array_data["positions"][rows] = ObjectManager._concatenate([tran.get_positions() for tran in trans])
+            self._array_data["rotations"][rows] = ObjectManager._concatenate([tran.get_rotations() for tran in trans])
+            self._array_data["forwards"][rows] = ObjectManager._concatenate([tran.get_forwards() for tran in trans])
+            self.transforms.set_ids(ids)
+        else:
+            self.transforms.set_ids(np.zeros(0, dtype=np.int32))
+        rigis: List[Rigidbodies] = resp.get_output_data("rigi")
+        if len(rigis) > 0:
+            ids = ObjectManager._concatenate([rigi.get_ids() for rigi in rigis])
+            rows = self._get_rows(r_id="rigi", ids=ids)
+            rigi_rows = rows
+            self._array_data["velocities"][rows] = ObjectManager._concatenate([rigi.get_velocities() for rigi in rigis])
+            self._array_data["angular_velocities"][rows] = ObjectManager._concatenate([rigi.get_angular_velocities() for rigi in rigis])
+            self._array_data["sleeping"][rows] = ObjectManager._concatenate([rigi.get_sleeping_states() for rigi in rigis])
+            self.rigidbodies.set_ids(ids)
+        else:
+            self.rigidbodies.set_ids(np.zeros(0, dtype=np.int32))
+        bouns: List[Bounds] = resp.get_output_data("boun")
+        if len(bouns) > 0:
+            ids = ObjectManager._concatenate([boun.get_ids() for boun in bouns])
+            rows = self._get_rows(r_id="boun", ids=ids)
+            # Reorder the points from front, back, right, left to front, back, left, right.
+            self._array_data["bounds_positions"][rows] = ObjectManager._concatenate([boun.get_bounds_positions() for boun in bouns])[:, [0, 1, 3, 2, 4, 5, 6]]
+            self.bounds.set_ids(ids)
+        else:
+            self.bounds.set_ids(np.zeros(0, dtype=np.int32))
+        # Record this frame.
+        if self._history_length > 0 and (len(trans) > 0 or len(rigis) > 0):
+            self._record_history(frame=resp.get_frame(), tran_rows=tran_rows, rigi_rows=rigi_rows)
+
+    def get_history(self, data: str, object_ids: List[int] = None, num_frames: int = None) -> np.ndarray:
+        """
+        This requires `history` to be greater than 0 in the constructor.
+
+        :param data: The type of data: `"positions"`, `"rotations"`, `"velocities"`, or `"angular_velocities"`.
+        :param object_ids: The object IDs. This can include objects that were destroyed but still have history. If None, get the history of every object in the order of `object_ids`.
+        :param num_frames: The number of frames. If None, get every recorded frame.
+
+        :return: The history of the objects as an array of shape `(num_frames, num_objects, n)`, from the oldest frame to the newest frame.
+        """
+
+        slots = self._get_history_slots(num_frames=num_frames)
+        if object_ids is None:
+            if isinstance(self._history_columns, slice):
+                return self._history[data][slots, :self._num_objects]
+            else:
+                return self._history[data][np.ix_(slots, self._history_columns)]
+        else:
+            return self._history[data][np.ix_(slots, [self._history_indices[object_id] for object_id in object_ids])]
+
+    def get_history_frames(self, num_frames: int = None) -> np.ndarray:
+        """
+        This requires `history` to be greater than 0 in the constructor.
+
+        :param num_frames: The number of frames. If None, get every recorded frame.
+
+        :return: The frame number of each frame of history, from the oldest frame to the newest frame.
+        """
+
+        return self._history_frames[self._get_history_slots(num_frames=num_frames)]
+
+    def get_accelerations(self, dt: float, object_ids: List[int] = None, num_frames: int = None) -> np.ndarray:
+        """
+        Get the accelerations of objects from their history with finite differences. If `rigidbodies=True` in the constructor, this uses the velocities. Otherwise, this uses the positions.
+
+        This requires `history` to be greater than 0 in the constructor and at least 2 frames of history (3 if `rigidbodies=False`).
+
+        :param dt: The time elapsed per frame in seconds. This is the physics time step multiplied by the number of physics steps per frame (see: `set_time_step` and `step_physics`).
+        :param object_ids: The object IDs. This can include objects that were destroyed but still have history. If None, get the accelerations of every object in the order of `object_ids`.
+        :param num_frames: The number of frames. If None, use every recorded frame.
+
+        :return: The acceleration of each object on each frame as an array of shape `(num_frames, num_objects, 3)`, from the oldest frame to the newest frame.
+        """
+
+        if self._send_rigidbodies == "always":
+            velocities = self.get_history(data="velocities", object_ids=object_ids, num_frames=num_frames)
+        else:
+            velocities = np.gradient(self.get_history(data="positions", object_ids=object_ids, num_frames=num_frames),
+                                     dt, axis=0)
+        return np.gradient(velocities, dt, axis=0)
+
+    def save_history(self, path: PATH) -> None:
+        """
+        Save the history of every object as a single uncompressed .npz file. This includes objects that were destroyed since the last time the history was saved or cleared. After this, the history of destroyed objects is discarded.
+
+        The file contains: `frames` (the frame numbers), `object_ids`, `positions`, `rotations`, `velocities`, and `angular_velocities`. Each history array has shape `(num_frames, num_objects, n)`, from the oldest frame to the newest frame.
+
+        This requires `history` to be greater than 0 in the constructor.
+
+        :param path: The path to the .npz file.
+        """
+
+        if isinstance(path, str):
+            path = Path(path)
+        if not path.parent.exists():
+            path.parent.mkdir(parents=True)
+        slots = self._get_history_slots(num_frames=None)
+        num_columns = len(self._history_ids)
+        np.savez(str(path.resolve()),
+                 frames=self.get_history_frames(),
+                 object_ids=np.array(self._history_ids, dtype=np.int32),
+                 **{k: self._history[k][slots, :num_columns] for k in self._history})
+        self._remove_history(object_ids=list(self._removed_history.keys()))
+
+    def clear_history(self) -> None:
+        """
+        Clear the history, for example at the start of a new trial. This also discards the history of destroyed objects.
+        """
+
+        self._remove_history(object_ids=list(self._removed_history.keys()))
+        for k in self._history:
+            self._history[k].fill(np.nan)
+        self._history_frames.fill(-1)
+        self._history_index = 0
+        self._num_history_frames = 0
+
+    def _get_history_slots(self, num_frames: Optional[int]) -> np.ndarray:
+        """
+        :param num_frames: The number of frames. If None, get every recorded frame.
+
+        :return: The indices of the frames in the ring buffers, from the oldest frame to the newest frame.
+        """
+
+        if self._history_length == 0:
+            raise Exception("This ObjectManager doesn't record history. Set history to a value greater than 0.")
+        if num_frames is None or num_frames > self._num_history_frames:
+            num_frames = self._num_history_frames
+        return (self._history_index - num_frames + np.arange(num_frames)) % self._history_length
+
+    def _get_rows(self, r_id: str, ids: np.ndarray) -> Union[slice, np.ndarray]:
+        """
+        Get the rows of objects in the arrays. Add rows for new objects.
+
+        :param r_id: The output data ID.
+        :param ids: The object IDs.
+
+        :return: The row of each object. If the IDs are exactly the same as the rows, this is a slice.
+        """
+
+        # The IDs are usually the same as they were on the previous frame.
+        if r_id in self._rows and np.array_equal(self._rows[r_id][0], ids):
+            return self._rows[r_id][1]
+        # Add new objects.
+        new_ids = [object_id for object_id in ids.tolist() if object_id not in self.object_indices]
+        if len(new_ids) > 0:
+            self._set_num_objects(ids=np.concatenate([self.object_ids, np.array(new_ids, dtype=np.int32)]))
+        if np.array_equal(self.object_ids, ids):
+            rows = slice(0, self._num_objects)
+        else:
+            rows = np.array([self.object_indices[object_id] for object_id in ids.tolist()], dtype=np.int64)
+        self._rows[r_id] = (ids.copy(), rows)
+        return rows
+
+    def _set_num_objects(self, ids: np.ndarray) -> None:
+        """
+        Set the objects in the arrays. Existing objects keep their data. Rows are only reordered if an object is removed.
+
+        :param ids: The object IDs of each row.
+        """
+
+        rows = np.array([self.object_indices.get(object_id, -1) for object_id in ids.tolist()], dtype=np.int64)
+        capacity = len(self._array_data["object_ids"])
+        while capacity < len(ids):
+            capacity *= 2
+        # This is an append. Existing rows don't need to be moved.
+        if len(ids) >= self._num_objects and np.array_equal(rows[:self._num_objects], np.arange(self._num_objects)):
+            if capacity > len(self._array_data["object_ids"]):
+                self._allocate_arrays(capacity=capacity)
+        # Objects were removed. Copy the remaining rows into new arrays.
+        else:
+            exists = rows >= 0
+            for k in self._array_data:
+                a = np.zeros((capacity,) + self._array_data[k].shape[1:], dtype=self._array_data[k].dtype)
+                a[:len(ids)][exists] = self._array_data[k][rows[exists]]
+                self._array_data[k] = a
+        self._num_objects = len(ids)
+        self._array_data["object_ids"][:self._num_objects] = ids
+        self.object_indices.clear()
+        self.object_indices.update({object_id: row for row, object_id in enumerate(ids.tolist())})
+        self._rows.clear()
+        # Set the public views.
+        for k in self._array_data:
+            setattr(self, k, self._array_data[k][:self._num_objects])
+        if self._history_length > 0:
+            self._set_history_objects(ids=ids)
+
+    def _allocate_arrays(self, capacity: int) -> None:
+        """
+        Allocate new arrays. Existing data is copied to the new arrays.
+
+        :param capacity: The number of rows.
+        """
+
+        shapes = {"object_ids": ((), np.int32),
+                  "positions": ((3,), np.float32),
+                  "rotations": ((4,), np.float32),
+                  "forwards": ((3,), np.float32),
+                  "velocities": ((3,), np.float32),
+                  "angular_velocities": ((3,), np.float32),
+                  "sleeping": ((), bool),
+                  "bounds_positions": ((7, 3), np.float32)}
+        for k in shapes:
+            shape, dtype = shapes[k]
+            a = np.zeros((capacity,) + shape, dtype=dtype)
+            if k in self._array_data:
+                a[:self._num_objects] = self._array_data[k][:self._num_objects]
+            self._array_data[k] = a
+
+    def _record_history(self, frame: int, tran_rows: Optional[Union[slice, np.ndarray]],
+                        rigi_rows: Optional[Union[slice, np.ndarray]]) -> None:
+        """
+        Record this frame in the history ring buffers.
+
+        :param frame: The frame number.
+        :param tran_rows: The rows of the objects that have transform data on this frame. If None, there isn't any transform data.
+        :param rigi_rows: The rows of the objects that have rigidbody data on this frame. If None, there isn't any rigidbody data.
+        """
+
+        for keys, rows in [(["positions", "rotations"], tran_rows), (["velocities", "angular_velocities"], rigi_rows)]:
+            if rows is not None and not isinstance(self._history_columns, slice):
+                columns = self._history_columns[rows]
+            else:
+                columns = rows
+            for k in keys:
+                # Objects without data on this frame, including destroyed objects, are NaN.
+                self._history[k][self._history_index].fill(np.nan)
+                if rows is not None:
+                    self._history[k][self._history_index, columns] = self._array_data[k][rows]
+        self._history_frames[self._history_index] = frame
+        self._history_index = (self._history_index + 1) % self._history_length
+        self._num_history_frames = min(self._num_history_frames + 1, self._history_length)
+        # Discard the history of destroyed objects once every frame of their history is NaN.
+        if len(self._removed_history) > 0:
+            for object_id in self._removed_history:
+                self._removed_history[object_id] -= 1
+            self._remove_history(object_ids=[object_id for object_id in self._removed_history if self._removed_history[object_id] <= 0])
+
+    def _set_history_objects(self, ids: np.ndarray) -> None:
+        """
+        Set the objects in the arrays. Objects that aren't in the history ring buffers get new columns. Objects that were removed keep their columns.
+
+        :param ids: The object IDs of each row of the arrays.
+        """
+
+        ids_list: List[int] = ids.tolist()
+        for object_id in ids_list:
+            if object_id in self._removed_history:
+                del self._removed_history[object_id]
+        current = set(ids_list)
+        for object_id in self._history_ids:
+            if object_id not in current and object_id not in self._removed_history:
+                self._removed_history[object_id] = self._history_length
+        new_ids = [object_id for object_id in ids_list if object_id not in self._history_indices]
+        if len(new_ids) > 0:
+            num_columns = len(self._history_ids)
+            capacity = self._history["positions"].shape[1]
+            if num_columns + len(new_ids) > capacity:
+                while capacity < num_columns + len(new_ids):
+                    capacity *= 2
+                self._allocate_history(capacity=capacity)
+            # New objects don't have any history.
+            for k in self._history:
+                self._history[k][:, num_columns:num_columns + len(new_ids)] = np.nan
+            for object_id in new_ids:
+                self._history_indices[object_id] = len(self._history_ids)
+                self._history_ids.append(object_id)
+        columns = np.array([self._history_indices[object_id] for object_id in ids_list], dtype=np.int64)
+        if np.array_equal(columns, np.arange(len(ids_list))):
+            self._history_columns = slice(0, len(ids_list))
+        else:
+            self._history_columns = columns
+
+    def _remove_history(self, object_ids: List[int]) -> None:
+        """
+        Discard the history of objects that were removed from the arrays.
+
+        :param object_ids: The object IDs.
+        """
+
+        if len(object_ids) == 0:
+            return
+        for object_id in object_ids:
+            del self._removed_history[object_id]
+        removed = set(object_ids)
+        columns = np.array([self._history_indices[object_id] for object_id in self._history_ids if object_id not in removed], dtype=np.int64)
+        for k in self._history:
+            self._history[k][:, :len(columns)] = self._history[k][:, columns]
+            self._history[k][:, len(columns):len(self._history_ids)] = np.nan
+        self._history_ids = [object_id for object_id in self._history_ids if object_id not in removed]
+        self._history_indices.clear()
+        self._history_indices.update({object_id: column for column, object_id in enumerate(self._history_ids)})
+        self._set_history_objects(ids=self.object_ids)
+
+    def _allocate_history(self, capacity: int) -> None:
+        """
+        Allocate new history ring buffers. Existing history is copied to the new ring buffers.
+
+        :param capacity: The number of columns.
+        """
+
+        for k in ObjectManager._HISTORY_SHAPES:
+            a = np.full((self._history_length, capacity, ObjectManager._HISTORY_SHAPES[k]), np.nan, dtype=np.float32)
+            if k in self._history:
+                a[:, :len(self._history_ids)] = self._history[k][:, :len(self._history_ids)]
+            self._history[k] = a
+
+    @staticmethod
+    def _concatenate(arrays: List[np.ndarray]) -> np.ndarray:
+        """
+        :param arrays: A list of arrays. This is almost always just one array.
+
+        :return: The concatenated array.
+        """
+
+        if len(arrays) == 1:
+            return arrays[0]
+        else:
+            return np.concatenate(arrays)
@@ -1,29 +1,83 @@
 from base64 import b64encode, b64decode
 from json import loads, dumps
-from typing import List, Union
+from typing import List, Union, Optional, BinaryIO
 from pathlib import Path
+import numpy as np
 from tdw.add_ons.writer import Writer
+from tdw.output_data import OutputData
+from tdw.output_data_reader import OutputDataReader
+from tdw.type_aliases import PATH
 
 
 class OutputDataWriter(Writer[List[bytes]]):
     """
     Save raw output byte data to disk per frame. This data is encoded into base64 strings and saved as text files.
+
+    ## Binary mode
+
+    If `binary` is True, each frame is instead appended to a single binary log file (`output_data.bin`) and the offset of each frame is appended to an index file (`output_data.index`). This is much faster than encoding and saving text files, and the files are smaller. Frames can be read in any order using [`OutputDataReader`](../output_data_reader.md) or `read(frame_number)`.
+
+    Types of output data that aren't needed can be ignored. For example, to not log images:
+
+    ```python
+    from tdw.add_ons.output_data_writer import OutputDataWriter
+
+    writer = OutputDataWriter(output_directory="D:/output_data", binary=True, ignore=["imag"])
+    ```
+
+    The files are written with a buffered file handle; call `flush()` or `close()` to ensure that every frame is on disk. In binary mode, `reset()` doesn't restart the log.
     """
 
+    def __init__(self, output_directory: PATH, zero_padding: int = 8, binary: bool = False, ignore: List[str] = None):
+        """
+        :param output_directory: The root output directory as a string or [`Path`](https://docs.python.org/3/library/pathlib.html). If this doesn't exist, it will be created.
+        :param zero_padding: How many zeros to append to the file name. By default, the name of the file of the first frame will be `00000000.txt`. Ignored if `binary == True`.
+        :param binary: If True, append frames to a binary log file rather than saving them as text files. See above.
+        :param ignore: If not None, don't save these types of output data, for example `["imag"]`.
+        """
+
+        super().__init__(output_directory=output_directory, zero_padding=zero_padding)
+        self._binary: bool = binary
+        self._ignore: List[str] = list() if ignore is None else ignore
+        # The binary log file and index file. These are opened when they are first needed.
+        self._data_file: Optional[BinaryIO] = None
+        self._index_file: Optional[BinaryIO] = None
+        # The offset of the next frame in the binary log file.
+        self._offset: int = 0
+        # Reads the binary log file.
+        self._reader: Optional[OutputDataReader] = None
+
     def on_send(self, resp: List[bytes]) -> None:
-        # Encode `resp` to base64 and save it to a file named after the frame number.
-        self._get_path(self._frame_count).write_text(dumps([b64encode(r).decode("ascii") for r in resp]))
+        # Remove ignored output data. The last element is the frame number.
+        if len(self._ignore) > 0:
+            resp = [r for r in resp[:-1] if OutputData.get_data_type_id(r) not in self._ignore] + [resp[-1]]
+        if self._binary:
+            self._write_binary(resp=resp)
+        else:
+            # Encode `resp` to base64 and save it to a file named after the frame number.
+            self._get_path(self._frame_count).write_text(dumps([b64encode(r).decode("ascii") for r in resp]))
         self._frame_count += 1
 
     def read(self, path: Union[str, Path, int]) -> List[bytes]:
         """
         Read saved ouput data.
 
-        :param path: The path to the frame file. This can be a string or [`Path`](https://docs.python.org/3/library/pathlib.html) file path or an integer. If this is an integer, it represents the frame number; the file is assumed to be in `self.output_directory`.
+        :param path: The path to the frame file. This can be a string or [`Path`](https://docs.python.org/3/library/pathlib.html) file path or an integer. If this is an integer, it represents the frame number; the file is assumed to be in `self.output_directory`. In binary mode, this must be the frame number; negative values are counted from the end of the log.
 
         :return: A list of bytes that was saved as base64 data, equivalent to the return value of a `c.communicate(commands)` call (i.e. `resp` as it usually appears in our example controllers).
         """
 
+        if self._binary:
+            if not isinstance(path, int):
+                raise Exception(f"In binary mode, the path must be a frame number: {path}")
+            self.flush()
+            # Re-open the reader if the log has grown. Each frame has one 8-byte offset in the index file.
+            if self._reader is None or (self._index_file is not None and
+                                        len(self._reader) != self._index_file.tell() // 8):
+                if self._reader is not None:
+                    self._reader.close()
+                self._reader = OutputDataReader(path=self.output_directory)
+            return self._reader.get_frame(path)
         if isinstance(path, str):
             text = Path(path).read_text()
         elif isinstance(path, Path):
@@ -34,6 +88,50 @@ class OutputDataWriter(Writer[List[bytes]]):
             raise Exception(path)
         return [b64decode(r) for r in loads(text)]
 
+    def flush(self) -> None:
+        """
+        Write every buffered frame to disk. This only affects binary mode.
+        """
+
+        if self._data_file is not None:
+            # Flush the log before the index so that the index never points beyond the end of the log.
+            self._data_file.flush()
+            self._index_file.flush()
+
+    def close(self) -> None:
+        """
+        Write every buffered frame to disk and close the files. This only affects binary mode. If more frames are written after this, the log will be overwritten.
+        """
+
+        if self._data_file is not None:
+            self.flush()
+            self._data_file.close()
+            self._index_file.close()
+            self._data_file = None
+            self._index_file = None
+        if self._reader is not None:
+            self._reader.close()
+            self._reader = None
+
+    def _write_binary(self, resp: List[bytes]) -> None:
+        """
+        Append a frame to the binary log file.
+
+        :param resp: The response from the build.
+        """
+
+        if self._data_file is None:
+            self._data_file = self.output_directory.joinpath(OutputDataReader.DATA_FILENAME).open("wb")
+            self._index_file = self.output_directory.joinpath(OutputDataReader.INDEX_FILENAME).open("wb")
+            self._offset = 0
+        # The header is the number of buffers followed by the size of each buffer.
+        header = np.array([len(resp)] + [len(r) for r in resp], dtype="<u4").tobytes()
+        self._data_file.write(header)
+        for r in resp:
+            self._data_file.write(r)
+        self._index_file.write(np.array([self._offset], dtype="<u8").tobytes())
+        self._offset += len(header) + sum([len(r) for r in resp])
+
     def _get_path(self, frame_number: int) -> Path:
         """
         :param frame_number: The frame number.
@@ -0,0 +1,250 @@
+import os
+import json
+from time import perf_counter
+from pathlib import Path
+from typing import List, Dict, Tuple, Optional
+import numpy as np
+from tdw.add_ons.add_on import AddOn
+from tdw.type_aliases import PATH
+from tdw.response import Response
+
+
+class Profiler(AddOn):
+    """
+    Profile each `communicate(commands)` call, step by step:
+
+    - `collect_commands`: Gathering commands from each add-on.
+    - `before_send: AddOnName`: Each add-on's `before_send(commands)`.
+    - `json.dumps`: Serializing the commands.
+    - `send`: Sending the commands to the build.
+    - `wait`: Waiting for the build to respond. If this is most of the time per frame, the build is the bottleneck.
+    - `receive`: Receiving the output data.
+    - `index_response`: Indexing the output data as a `Response`.
+    - `on_send: AddOnName`: Each add-on's `on_send(resp)`.
+
+    The profiler also counts the number of bytes of each type of output data per frame.
+
+    To time each step, add the profiler's `on_step` function to the controller's `timing_hooks`. To count bytes, add the profiler to the controller's `add_ons`.
+
+    ```python
+    from tdw.controller import Controller
+    from tdw.add_ons.profiler import Profiler
+    from tdw.add_ons.object_manager import ObjectManager
+
+    c = Controller()
+    profiler = Profiler()
+    c.add_ons.extend([profiler, ObjectManager()])
+    c.timing_hooks.append(profiler.on_step)
+    profiler.start()
+    for i in range(1000):
+        c.communicate([])
+    profiler.stop()
+    print(profiler.get_report())
+    profiler.save_chrome_trace("trace.json")
+    c.communicate({"$type": "terminate"})
+    ```
+
+    Open the trace file in [Perfetto](https://ui.perfetto.dev) or at `chrome://tracing` in Chrome.
+
+    Each add-on is timed separately. If there are multiple add-ons of the same type, the first is named after its type, for example `on_send: ObjectManager`, and the others are numbered in the order in which the profiler first timed them, for example `on_send: ObjectManager (2)`.
+
+    `AsyncController` calls the timing hooks after each step of its `communicate(commands)` call that runs in the main thread: `collect_commands`, `before_send: AddOnName`, `json.dumps`, `send`, `receive` (which includes waiting for the build and any other coroutines that run in the meantime), `index_response`, `on_send: AddOnName` for each add-on in `add_ons`, `wait_for_pipeline` (waiting for the pipelined add-ons to catch up), and `communicate`. The `on_send(resp)` calls of the pipelined add-ons overlap with the other steps in a background thread and aren't timed. Add the profiler to `add_ons`, not `pipelined_add_ons`.
+    """
+
+    def __init__(self):
+        """
+        (no parameters)
+        """
+
+        super().__init__()
+        self.initialized = True
+        """:field
+        If True, the profiler is currently profiling `communicate(commands)` calls.
+        """
+        self.profiling: bool = False
+        """:field
+        The time elapsed in seconds per step per `communicate(commands)` call. Key = The name of the step.
+        """
+        self.times: Dict[str, List[float]] = dict()
+        """:field
+        The total time elapsed in seconds per `communicate(commands)` call.
+        """
+        self.frame_times: List[float] = list()
+        """:field
+        The number of bytes of output data per type per `communicate(commands)` call. Key = The output data identifier, for example `"tran"`. If a type of output data wasn't received on a frame, that frame isn't included in the list.
+        """
+        self.bytes: Dict[str, List[int]] = dict()
+        # Trace events: The name of the step, the start time, and the end time.
+        self._events: List[Tuple[str, float, float]] = list()
+        # Bytes per type of output data per frame for the trace: The time and the number of bytes per type.
+        self._byte_events: List[Tuple[float, Dict[str, int]]] = list()
+        # The time at the start of profiling.
+        self._t0: float = 0
+        # The name of each add-on in the profiler data. Key = The add-on. Value = The name.
+        self._add_on_names: Dict[AddOn, str] = dict()
+        # The number of named add-ons per type. Key = The name of the type.
+        self._num_add_ons: Dict[str, int] = dict()
+
+    def get_initialization_commands(self) -> List[dict]:
+        return []
+
+    def on_send(self, resp: List[bytes]) -> None:
+        if not self.profiling:
+            return
+        resp = Response.get_response(resp)
+        frame_bytes: Dict[str, int] = dict()
+        for r_id in resp.get_data_type_ids():
+            num_bytes = sum([len(b) for b in resp.get_bytes(r_id)])
+            frame_bytes[r_id] = num_bytes
+            if r_id in self.bytes:
+                self.bytes[r_id].append(num_bytes)
+            else:
+                self.bytes[r_id] = [num_bytes]
+        self._byte_events.append((perf_counter(), frame_bytes))
+
+    def start(self) -> None:
+        """
+        Start profiling each `communicate(commands)` call. Clears all existing profiler data.
+        """
+
+        self.times.clear()
+        self.frame_times.clear()
+        self.bytes.clear()
+        self._events.clear()
+        self._byte_events.clear()
+        self._add_on_names.clear()
+        self._num_add_ons.clear()
+        self._t0 = perf_counter()
+        self.profiling = True
+
+    def stop(self) -> None:
+        """
+        Stop profiling.
+        """
+
+        self.profiling = False
+
+    def on_step(self, step: str, t0: float, t1: float, add_on: Optional[AddOn] = None) -> None:
+        """
+        Record the time elapsed during a step of `communicate(commands)`. Add this function to the controller's `timing_hooks`. If the profiler isn't profiling, this doesn't do anything.
+
+        :param step: The name of the step. If this is `"communicate"`, the step is the entire `communicate(commands)` call.
+        :param t0: The `perf_counter()` time at the start of the step.
+        :param t1: The `perf_counter()` time at the end of the step.
+        :param add_on: If not None, this step was a call to this add-on.
+        """
+
+        if not self.profiling:
+            return
+        if step == "communicate":
+            self.frame_times.append(t1 - t0)
+            self._events.append((step, t0, t1))
+            return
+        if add_on is not None:
+            step = f"{step}: {self._get_add_on_name(add_on=add_on)}"
+        if step in self.times:
+            self.times[step].append(t1 - t0)
+        else:
+            self.times[step] = [t1 - t0]
+        self._events.append((step, t0, t1))
+
+    def get_percentiles(self, percentiles: List[float] = None) -> Dict[str, np.ndarray]:
+        """
+        :param percentiles: The percentiles. If None, defaults to `[50, 90, 99, 100]`.
+
+        :return: The percentile times in milliseconds per step. Key = The name of the step, or `"communicate"` for the entire `communicate(commands)` call. Value = A numpy array of times, one per percentile.
+        """
+
+        if percentiles is None:
+            percentiles = [50, 90, 99, 100]
+        result: Dict[str, np.ndarray] = dict()
+        if len(self.frame_times) > 0:
+            result["communicate"] = np.percentile(np.array(self.frame_times) * 1000, percentiles)
+        for phase in self.times:
+            result[phase] = np.percentile(np.array(self.times[phase]) * 1000, percentiles)
+        return result
+
+    def get_histogram(self, phase: str, bins: int = 20) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        :param phase: The name of the step, or `"communicate"` for the entire `communicate(commands)` call.
+        :param bins: The number of bins.
+
+        :return: Tuple: The number of frames per bin, the bin edges in milliseconds. See: `numpy.histogram`.
+        """
+
+        if phase == "communicate":
+            times = self.frame_times
+        else:
+            times = self.times[phase]
+        return np.histogram(np.array(times) * 1000, bins=bins)
+
+    def get_report(self, percentiles: List[float] = None) -> str:
+        """
+        :param percentiles: The percentiles. If None, defaults to `[50, 90, 99, 100]`.
+
+        :return: A markdown table of percentile times in milliseconds and the total share of time per step, followed by a table of the mean and maximum bytes per type of output data per frame.
+        """
+
+        if percentiles is None:
+            percentiles = [50, 90, 99, 100]
+        total = sum(self.frame_times)
+        report = "| Step | Calls | " + " | ".join([f"p{p} (ms)" for p in percentiles]) + " | Total (%) |\n"
+        report += "| --- | --- | " + " | ".join(["---" for _ in percentiles]) + " | --- |\n"
+        for phase, values in self.get_percentiles(percentiles=percentiles).items():
+            if phase == "communicate":
+                times = self.frame_times
+            else:
+                times = self.times[phase]
+            share = 100 * sum(times) / total if total > 0 else 0
+            report += f"| {phase} | {len(times)} | " + " | ".join([f"{v:.3f}" for v in values]) + f" | {share:.1f} |\n"
+        report += "\n| Output data | Frames | Mean (bytes) | Max (bytes) |\n| --- | --- | --- | --- |\n"
+        for r_id in self.bytes:
+            report += f"| {r_id} | {len(self.bytes[r_id])} | {round(float(np.mean(self.bytes[r_id])))} | " \
+                      f"{max(self.bytes[r_id])} |\n"
+        return report
+
+    def _get_add_on_name(self, add_on: AddOn) -> str:
+        """
+        :param add_on: The add-on.
+
+        :return: The name of the add-on in the profiler data: The name of its type and, if this isn't the first add-on of this type, a number.
+        """
+
+        if add_on not in self._add_on_names:
+            name = add_on.__class__.__name__
+            if name in self._num_add_ons:
+                self._num_add_ons[name] += 1
+                self._add_on_names[add_on] = f"{name} ({self._num_add_ons[name]})"
+            else:
+                self._num_add_ons[name] = 1
+                self._add_on_names[add_on] = name
+        return self._add_on_names[add_on]
+
+    def save_chrome_trace(self, path: PATH) -> None:
+        """
+        Save the profiler data as a Chrome trace .json file. Open the file in [Perfetto](https://ui.perfetto.dev) or at `chrome://tracing` in Chrome.
+
+        :param path: The path to the .json file.
+        """
+
+        if isinstance(path, str):
+            path = Path(path)
+        if not path.parent.exists():
+            path.parent.mkdir(parents=True)
+        pid = os.getpid()
+        events = list()
+        for name, t0, t1 in self._events:
+            events.append({"name": name,
+                           "cat": "add_on" if ": " in name else "controller",
+                           "ph": "X",
+                           "ts": (t0 - self._t0) * 1e6,
+                           "dur": (t1 - t0) * 1e6,
+                           "pid": pid,
+                           "tid": 0})
+        for t, frame_bytes in self._byte_events:
+            events.append({"name": "bytes",
+                           "ph": "C",
+                           "ts": (t - self._t0) * 1e6,
+                           "pid": pid,
+                           "args": frame_bytes})
+        path.write_text(json.dumps({"traceEvents": events, "displayTimeUnit": "ms"}))
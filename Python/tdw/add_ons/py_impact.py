@@ -1,22 +1,25 @@
 from time import time
+from zlib import crc32
 from os import urandom
 import base64
 import math
 import json
 from pathlib import Path
+from bisect import bisect_right
 from pkg_resources import resource_filename
 from typing import Dict, Optional, Union, List, Tuple
 import numpy as np
-import scipy.signal as sg
+import scipy.fft as sp_fft
 from scipy.ndimage import gaussian_filter1d, uniform_filter1d
 from pydub import AudioSegment
 from tdw.tdw_utils import TDWUtils
 from tdw.librarian import ModelRecord
-from tdw.output_data import OutputData, Rigidbodies, StaticRobot, SegmentationColors, StaticRigidbodies, \
+from tdw.output_data import Rigidbodies, StaticRobot, SegmentationColors, StaticRigidbodies, \
     RobotJointVelocities, StaticOculusTouch, AudioSourceDone, Bounds
 from tdw.physics_audio.audio_material import AudioMaterial
 from tdw.physics_audio.object_audio_static import ObjectAudioStatic, DEFAULT_OBJECT_AUDIO_STATIC_DATA
 from tdw.physics_audio.modes import Modes
+from tdw.physics_audio.impulse_response_cache import ImpulseResponseCache
 from tdw.physics_audio.base64_sound import Base64Sound
 from tdw.physics_audio.collision_audio_info import CollisionAudioInfo
 from tdw.physics_audio.collision_audio_type import CollisionAudioType
@@ -24,8 +27,9 @@ from tdw.physics_audio.collision_audio_event import CollisionAudioEvent
 from tdw.physics_audio.scrape_model import ScrapeModel, DEFAULT_SCRAPE_MODELS
 from tdw.physics_audio.scrape_material import ScrapeMaterial
 from tdw.object_data.rigidbody import Rigidbody
-from tdw.audio_constants import SAMPLE_RATE, CHANNELS, SAMPLE_WIDTH
+from tdw.audio_constants import SAMPLE_RATE, CHANNELS
 from tdw.add_ons.collision_manager import CollisionManager
+from tdw.response import Response
 from tdw.librarian import MaterialLibrarian
 
 
@@ -58,6 +62,20 @@ class PyImpact(CollisionManager):
     c.communicate({"$type": "terminate"})
     ```
 
+    ## Impulse response cache
+
+    By default, PyImpact samples new modes for each pair of colliding objects and then randomly jitters the modes on every subsequent collision, which means that every sound must be synthesized from scratch. If `impulse_response_cache_size` is greater than 0, the modes and the jitter are instead sampled from a finite number of random seeds per material (`num_cache_seeds`). Objects with the same material, size, and resonance then share sounds, and the per-object mode sums and the impulse response of each pair of objects are stored in a least-recently-used [`ImpulseResponseCache`](../physics_audio/impulse_response_cache.md) of up to `impulse_response_cache_size` bytes:
+
+    ```python
+    from tdw.add_ons.py_impact import PyImpact
+
+    py_impact = PyImpact(impulse_response_cache_size=64 * 1024 * 1024)
+    # Add PyImpact to the controller and run the simulation here.
+    print(py_impact.impulse_response_cache.hits, py_impact.impulse_response_cache.misses)
+    ```
+
+    The cache isn't cleared when PyImpact is reset.
+
     When using PyImpact, please cite  [Traer,Cusimano and McDermott, A perceptually inspired generative model of rigid-body contact sounds, Digital Audio Effects, (DAFx), 2019](http://dafx2019.bcu.ac.uk/papers/DAFx2019_paper_57.pdf) and [Agarwal, Cusimano, Traer, and McDermott, Object-based synthesis of scraping and rolling sounds based on non-linear physical constraints, (DAFx), 2021](http://mcdermottlab.mit.edu/bib2php/pubs/makeAbs.php?loc=agarwal21).
 
     ```
@@ -85,7 +103,7 @@ class PyImpact(CollisionManager):
     """
 
     """:class_var
-    100ms of silence. Used for scrapes.
+    100ms of silence. PyImpact no longer uses this to generate scrape sounds.
     """
     SILENCE_100MS: AudioSegment = AudioSegment.silent(duration=100, frame_rate=SAMPLE_RATE)
     """:class_var
@@ -140,6 +158,12 @@ class PyImpact(CollisionManager):
     The mass of the floor.
     """
     FLOOR_MASS: int = 100
+    # The length of each scrape sound chunk in samples (100ms).
+    _SCRAPE_CHUNK_LENGTH: int = 4410
+    # The length of a scrape ring buffer in chunks (2 seconds plus the current chunk).
+    _SCRAPE_NUM_CHUNKS: int = 21
+    # The positions of each sample in a scrape chunk, used to interpolate the scrape surface.
+    _SCRAPE_CHUNK_POSITIONS: np.ndarray = np.linspace(0, 1, _SCRAPE_CHUNK_LENGTH)
     # Visual material librarian used for scrape surfaces.
     __VISUAL_MATERIAL_LIBRARIAN: MaterialLibrarian = MaterialLibrarian("materials_high.json")
 
@@ -147,7 +171,8 @@ class PyImpact(CollisionManager):
                  static_audio_data_overrides: Dict[int, ObjectAudioStatic] = None,
                  resonance_audio: bool = False, floor: AudioMaterial = AudioMaterial.wood_medium,
                  rng: np.random.RandomState = None, auto: bool = True, scrape: bool = True,
-                 scrape_objects: Dict[int, ScrapeModel] = None, min_time_between_impact_events: float = 0.25):
+                 scrape_objects: Dict[int, ScrapeModel] = None, min_time_between_impact_events: float = 0.25,
+                 impulse_response_cache_size: int = 0, num_cache_seeds: int = 8):
         """
         :param initial_amp: The initial amplitude, i.e. the "master volume". Must be > 0 and < 1.
         :param prevent_distortion: If True, clamp amp values to <= 0.99
@@ -160,6 +185,8 @@ class PyImpact(CollisionManager):
         :param scrape: If True, initialize certain objects as scrape surfaces: Change their visual material(s) and enable them for scrape audio. See: `tdw.physics_audio.scrape_model.DEFAULT_SCRAPE_MODELS`
         :param scrape_objects: If `scrape == True` and this is not None, this dictionary can be used to manually set scrape surfaces. Key = Object ID. Value = [`ScrapeModel`](../physics_audio/scrape_model.md).
         :param min_time_between_impact_events: The minimum time in seconds between two impact events that involve the same primary object.
+        :param impulse_response_cache_size: The maximum size of the impulse response cache in bytes. If 0, impulse responses aren't cached. See above.
+        :param num_cache_seeds: If `impulse_response_cache_size` is greater than 0, this is the number of random seeds per material that are used to sample modes and the number of random seeds that are used to jitter modes.
         """
 
         super().__init__()
@@ -248,8 +275,8 @@ class PyImpact(CollisionManager):
         # A dictionary of audio data. Key = Object ID; Value = `ObjectAudioStatic`.
         self._static_audio_data: Dict[int, ObjectAudioStatic] = dict()
 
-        # Summed scrape masters. Key = primary ID, secondary ID.
-        self._scrape_summed_masters: Dict[Tuple[int, int], AudioSegment] = dict()
+        # Summed scrape masters. Each master is a ring buffer of the next 2.1 seconds of scrape audio. Key = primary ID, secondary ID.
+        self._scrape_summed_masters: Dict[Tuple[int, int], np.ndarray] = dict()
         # Keeping a track of previous scrape indices.
         self._scrape_previous_indices: Dict[Tuple[int, int], int] = dict()
         # Starting velocity magnitude of scraping object; use in calculating changing band-pass filter.
@@ -262,6 +289,22 @@ class PyImpact(CollisionManager):
         # Ongoing impact audio events. Key = Audio source ID. Value = Time of event.
         self._impact_events: Dict[int, float] = dict()
         self._min_time_between_impact_events: float = min_time_between_impact_events
+        """:field
+        If not None, this is the simulated time of the current frame in seconds, which is used instead of the system time to set the minimum time between impact events. Set this before each `on_send()` call when sending recorded output data to PyImpact, for example in an [`OfflineAudioRenderer`](../physics_audio/offline_audio_renderer.md). If None, the system time is used.
+        """
+        self.frame_time: Optional[float] = None
+        """:field
+        The [impulse response cache](../physics_audio/impulse_response_cache.md), including hit and miss statistics. If `impulse_response_cache_size == 0`, the cache is always empty.
+        """
+        self.impulse_response_cache: ImpulseResponseCache = ImpulseResponseCache(max_bytes=impulse_response_cache_size)
+        self._num_cache_seeds: int = num_cache_seeds
+        # The cache keys of the modes of each pair of objects: material, mode seed, and decay time offset.
+        # Key = (secondary ID, primary ID). Value = The key of object 1 and the key of object 2.
+        self._cache_keys: Dict[Tuple[Optional[int], int], Tuple[tuple, tuple]] = dict()
+        # Modes sampled from seeded random number generators. Key = (material, seed).
+        self._seeded_modes: Dict[Tuple[str, int], Modes] = dict()
+        # Mode power jitter sampled from seeded random number generators. Key = (material, seed, jitter seed).
+        self._seeded_jitter: Dict[Tuple[str, int, int], np.ndarray] = dict()
 
     def get_initialization_commands(self) -> List[dict]:
         return [{"$type": "send_bounds"},
@@ -280,6 +323,7 @@ class PyImpact(CollisionManager):
                 {"$type": "send_static_oculus_touch"}]
 
     def on_send(self, resp: List[bytes]) -> None:
+        resp = Response.get_response(resp)
         super().on_send(resp=resp)
         # Cache static audio info.
         if not self._cached_audio_info:
@@ -288,16 +332,19 @@ class PyImpact(CollisionManager):
         # Don't automatically generate audio.
         if not self.auto:
             return
-        for i in range(len(resp) - 1):
-            r_id = OutputData.get_data_type_id(resp[i])
-            # Mark this audio source as done.
-            if r_id == "ausd":
-                audio_source_id = AudioSourceDone(resp[i]).get_id()
-                # The audio source might not be in this dictionary (for example if this was a scrape event).
-                if audio_source_id in self._impact_events:
-                    del self._impact_events[audio_source_id]
+        # Mark this audio source as done.
+        audio_source_done: AudioSourceDone
+        for audio_source_done in resp.get_output_data("ausd"):
+            audio_source_id = audio_source_done.get_id()
+            # The audio source might not be in this dictionary (for example if this was a scrape event).
+            if audio_source_id in self._impact_events:
+                del self._impact_events[audio_source_id]
         # Get collision events.
         self._get_collision_types(resp=resp)
+        # The commands per collision event. Impact sounds are synthesized together after every event has been evaluated.
+        commands: List[Optional[dict]] = list()
+        # Impact events: The index in `commands`, the primary ID, the secondary ID, the contact points, the amp, the mass, and the synthesis parameters.
+        impacts: List[Tuple[int, int, Optional[int], np.ndarray, float, float, Tuple[Modes, Modes, float, float, Optional[Tuple[tuple, tuple]]]]] = list()
         for object_id in self.collision_events:
             command = None
             # Generate an impact sound.
@@ -305,38 +352,43 @@ class PyImpact(CollisionManager):
                 # Generate an environment sound.
                 if self.collision_events[object_id].secondary_id is None:
                     audio = self._static_audio_data[object_id]
-                    command = self.get_impact_sound_command(velocity=self.collision_events[object_id].velocity,
-                                                            contact_points=self.collision_events[object_id].collision.points,
-                                                            contact_normals=self.collision_events[object_id].collision.normals,
-                                                            primary_id=object_id,
-                                                            primary_amp=audio.amp,
-                                                            primary_material=audio.material.name + "_" + str(audio.size),
-                                                            primary_mass=audio.mass,
-                                                            secondary_id=None,
-                                                            secondary_amp=PyImpact.FLOOR_AMP,
-                                                            secondary_material=self._get_floor_material_name(),
-                                                            secondary_mass=PyImpact.FLOOR_MASS,
-                                                            primary_resonance=audio.resonance,
-                                                            secondary_resonance=audio.resonance)
+                    primary_id = object_id
+                    secondary_id = None
+                    modes_1, modes_2, mass, amp, keys = self._get_impact_modes(velocity=self.collision_events[object_id].velocity,
+                                                                               contact_normals=self.collision_events[object_id].collision.normals,
+                                                                               primary_id=primary_id,
+                                                                               primary_amp=audio.amp,
+                                                                               primary_material=audio.material.name + "_" + str(audio.size),
+                                                                               primary_mass=audio.mass,
+                                                                               secondary_id=secondary_id,
+                                                                               secondary_amp=PyImpact.FLOOR_AMP,
+                                                                               secondary_material=self._get_floor_material_name(),
+                                                                               secondary_mass=PyImpact.FLOOR_MASS)
+                    primary_resonance = audio.resonance
+                    secondary_resonance = audio.resonance
                 # Generate an object sound.
                 else:
                     target_audio = self._static_audio_data[self.collision_events[object_id].primary_id]
                     other_audio = self._static_audio_data[self.collision_events[object_id].secondary_id]
-                    command = self.get_impact_sound_command(velocity=self.collision_events[object_id].velocity,
-                                                            contact_points=self.collision_events[object_id].collision.points,
-                                                            contact_normals=self.collision_events[object_id].collision.normals,
-                                                            primary_id=target_audio.object_id,
-                                                            primary_amp=target_audio.amp,
-                                                            primary_material=target_audio.material.name + "_" + str(
-                                                                target_audio.size),
-                                                            primary_mass=target_audio.mass,
-                                                            secondary_id=other_audio.object_id,
-                                                            secondary_amp=other_audio.amp,
-                                                            secondary_material=other_audio.material.name + "_" + str(
-                                                                other_audio.size),
-                                                            secondary_mass=other_audio.mass,
-                                                            primary_resonance=target_audio.resonance,
-                                                            secondary_resonance=other_audio.resonance)
+                    primary_id = target_audio.object_id
+                    secondary_id = other_audio.object_id
+                    modes_1, modes_2, mass, amp, keys = self._get_impact_modes(velocity=self.collision_events[object_id].velocity,
+                                                                               contact_normals=self.collision_events[object_id].collision.normals,
+                                                                               primary_id=primary_id,
+                                                                               primary_amp=target_audio.amp,
+                                                                               primary_material=target_audio.material.name + "_" + str(
+                                                                                   target_audio.size),
+                                                                               primary_mass=target_audio.mass,
+                                                                               secondary_id=secondary_id,
+                                                                               secondary_amp=other_audio.amp,
+                                                                               secondary_material=other_audio.material.name + "_" + str(
+                                                                                   other_audio.size),
+                                                                               secondary_mass=other_audio.mass)
+                    primary_resonance = target_audio.resonance
+                    secondary_resonance = other_audio.resonance
+                impacts.append((len(commands), primary_id, secondary_id,
+                                self.collision_events[object_id].collision.points, amp, mass,
+                                (modes_1, modes_2, primary_resonance, secondary_resonance, keys)))
             # Generate a scrape sound.
             elif self.collision_events[object_id].collision_type == CollisionAudioType.scrape and self.collision_events[object_id].secondary_id in self._scrape_objects:
                 scrape_surface_id = self.collision_events[object_id].secondary_id
@@ -358,7 +410,19 @@ class PyImpact(CollisionManager):
                                                             primary_resonance=target_audio.resonance,
                                                             secondary_resonance=other_audio.resonance,
                                                             scrape_material=self._scrape_objects[scrape_surface_id].scrape_material)
-            # Append impact sound commands.
+            commands.append(command)
+        # Synthesize every impact sound on this frame.
+        hs = self._get_impulse_responses([impact[6] for impact in impacts])
+        for (index, primary_id, secondary_id, contact_points, amp, mass, _), h in zip(impacts, hs):
+            sound = PyImpact._convolve_impact_force(h=h, mass=mass)
+            commands[index] = self._get_impact_sound_command(sound=self._get_impact_base64_sound(sound=sound,
+                                                                                                 amp=amp,
+                                                                                                 primary_id=primary_id,
+                                                                                                 secondary_id=secondary_id),
+                                                             primary_id=primary_id,
+                                                             contact_points=contact_points)
+        # Append impact sound commands.
+        for command in commands:
             if command is not None:
                 self.commands.append(command)
 
@@ -371,7 +435,7 @@ class PyImpact(CollisionManager):
         # Setting to "4" for now, for general debugging purposes.
         return f"{self.floor.name}_{PyImpact.FLOOR_SIZE}"
 
-    def _get_collision_types(self, resp: List[bytes]) -> None:
+    def _get_collision_types(self, resp: Response) -> None:
         """
         Get all collision types on this frame. Update previous area data.
 
@@ -385,22 +449,20 @@ class PyImpact(CollisionManager):
         # Clear the collision events.
         self.collision_events.clear()
         rigidbody_data: Dict[int, Rigidbody] = dict()
-        for i in range(len(resp) - 1):
-            r_id = OutputData.get_data_type_id(resp[i])
-            # Get rigidbody data.
-            if r_id == "rigi":
-                rigidbodies = Rigidbodies(resp[i])
-                for j in range(rigidbodies.get_num()):
-                    rigidbody_data[rigidbodies.get_id(j)] = Rigidbody(velocity=rigidbodies.get_velocity(j),
-                                                                      angular_velocity=rigidbodies.get_angular_velocity(j),
-                                                                      sleeping=rigidbodies.get_sleeping(j))
-            # Get robot joint velocity data.
-            elif r_id == "rojv":
-                robot_joint_velocities = RobotJointVelocities(resp[i])
-                for j in range(robot_joint_velocities.get_num_joints()):
-                    rigidbody_data[robot_joint_velocities.get_joint_id(j)] = Rigidbody(velocity=robot_joint_velocities.get_joint_velocity(j),
-                                                                                       angular_velocity=robot_joint_velocities.get_joint_angular_velocity(j),
-                                                                                       sleeping=robot_joint_velocities.get_joint_sleeping(j))
+        # Get rigidbody data.
+        rigidbodies: Rigidbodies
+        for rigidbodies in resp.get_output_data("rigi"):
+            for j in range(rigidbodies.get_num()):
+                rigidbody_data[rigidbodies.get_id(j)] = Rigidbody(velocity=rigidbodies.get_velocity(j),
+                                                                  angular_velocity=rigidbodies.get_angular_velocity(j),
+                                                                  sleeping=rigidbodies.get_sleeping(j))
+        # Get robot joint velocity data.
+        robot_joint_velocities: RobotJointVelocities
+        for robot_joint_velocities in resp.get_output_data("rojv"):
+            for j in range(robot_joint_velocities.get_num_joints()):
+                rigidbody_data[robot_joint_velocities.get_joint_id(j)] = Rigidbody(velocity=robot_joint_velocities.get_joint_velocity(j),
+                                                                                   angular_velocity=robot_joint_velocities.get_joint_angular_velocity(j),
+                                                                                   sleeping=robot_joint_velocities.get_joint_sleeping(j))
         # Get collision data.
         for object_ids in self.obj_collisions:
             collider_id = object_ids.int1
@@ -441,12 +503,15 @@ class PyImpact(CollisionManager):
                 event: CollisionAudioEvent = max(events, key=lambda x: x.magnitude)
                 self.collision_events[event.primary_id] = event
 
-    def _get_object_modes(self, material: Union[str, AudioMaterial]) -> Modes:
+    def _get_object_modes(self, material: Union[str, AudioMaterial], rng: np.random.RandomState = None) -> Modes:
         """
         :param material: The audio material.
+        :param rng: The random number generator. If None, use `self.rng`.
 
         :return: The audio modes.
         """
+        if rng is None:
+            rng = self.rng
         data = self.material_data[material] if isinstance(material, str) else self.material_data[material.name]
         # Load the mode properties.
         f = -1
@@ -455,11 +520,11 @@ class PyImpact(CollisionManager):
         for jm in range(0, 10):
             jf = 0
             while jf < 20:
-                jf = data["cf"][jm] + self.rng.normal(0, data["cf"][jm] / 10)
-            jp = data["op"][jm] + self.rng.normal(0, 10)
+                jf = data["cf"][jm] + rng.normal(0, data["cf"][jm] / 10)
+            jp = data["op"][jm] + rng.normal(0, 10)
             jt = 0
             while jt < 0.001:
-                jt = data["rt"][jm] + self.rng.normal(0, data["rt"][jm] / 10)
+                jt = data["rt"][jm] + rng.normal(0, data["rt"][jm] / 10)
             if jm == 0:
                 f = jf
                 p = jp
@@ -493,6 +558,72 @@ class PyImpact(CollisionManager):
         :return Sound data as a Base64Sound object.
         """
 
+        modes_1, modes_2, mass, amp, keys = self._get_impact_modes(velocity=velocity, contact_normals=contact_normals,
+                                                                   primary_id=primary_id, primary_material=primary_material,
+                                                                   primary_amp=primary_amp, primary_mass=primary_mass,
+                                                                   secondary_id=secondary_id,
+                                                                   secondary_material=secondary_material,
+                                                                   secondary_amp=secondary_amp, secondary_mass=secondary_mass)
+        h = self._get_impulse_responses([(modes_1, modes_2, primary_resonance, secondary_resonance, keys)])[0]
+        sound = PyImpact._convolve_impact_force(h=h, mass=mass)
+        return self._get_impact_base64_sound(sound=sound, amp=amp, primary_id=primary_id, secondary_id=secondary_id)
+
+    def get_impact_sound_command(self, velocity: np.ndarray, contact_points: List[np.ndarray],
+                                 contact_normals: List[np.ndarray], primary_id: int,
+                                 primary_material: str, primary_amp: float, primary_mass: float,
+                                 secondary_id: Optional[int], secondary_material: str, secondary_amp: float,
+                                 secondary_mass: float, primary_resonance: float, secondary_resonance: float) -> Optional[dict]:
+        """
+        Create an impact sound, and return a valid command to play audio data in TDW.
+        "target" should usually be the smaller object, which will play the sound.
+        "other" should be the larger (stationary) object.
+
+        :param primary_id: The object ID for the primary (target) object.
+        :param primary_material: The material label for the primary (target) object.
+        :param secondary_id: The object ID for the secondary (other) object.
+        :param secondary_material: The material label for the secondary (other) object.
+        :param primary_amp: Sound amplitude of primary (target) object.
+        :param secondary_amp: Sound amplitude of the secondary (other) object.
+        :param primary_resonance: The resonance of the primary (target) object.
+        :param secondary_resonance: The resonance of the secondary (other) object.
+        :param velocity: The velocity.
+        :param contact_points: The collision contact points.
+        :param contact_normals: The collision contact normals.
+        :param primary_mass: The mass of the primary (target) object.
+        :param secondary_mass: The mass of the secondary (target) object.
+
+        :return A `play_audio_data` or `play_point_source_data` command that can be sent to the build via `Controller.communicate()`.
+        """
+
+        sound = self.get_impact_sound(velocity=velocity, contact_normals=contact_normals, primary_id=primary_id,
+                                      primary_material=primary_material, primary_amp=primary_amp,
+                                      primary_mass=primary_mass, secondary_id=secondary_id,
+                                      secondary_material=secondary_material, secondary_amp=secondary_amp,
+                                      secondary_mass=secondary_mass, primary_resonance=primary_resonance, secondary_resonance=secondary_resonance)
+        return self._get_impact_sound_command(sound=sound, primary_id=primary_id, contact_points=contact_points)
+
+    def _get_impact_modes(self, velocity: np.ndarray, contact_normals: List[np.ndarray], primary_id: int,
+                          primary_material: str, primary_amp: float, primary_mass: float,
+                          secondary_id: Optional[int], secondary_material: str, secondary_amp: float,
+                          secondary_mass: float) -> Tuple[Modes, Modes, float, float, Optional[Tuple[tuple, tuple]]]:
+        """
+        Get the modes of two colliding objects. The modes are sampled on the first collision between the objects and jittered on subsequent collisions.
+        If the impulse response cache is enabled, the modes and the jitter are sampled from seeded random number generators.
+
+        :param primary_id: The object ID for the primary (target) object.
+        :param primary_material: The material label for the primary (target) object.
+        :param secondary_id: The object ID for the secondary (other) object.
+        :param secondary_material: The material label for the secondary (other) object.
+        :param primary_amp: Sound amplitude of primary (target) object.
+        :param secondary_amp: Sound amplitude of the secondary (other) object.
+        :param velocity: The velocity.
+        :param contact_normals: The collision contact normals.
+        :param primary_mass: The mass of the primary (target) object.
+        :param secondary_mass: The mass of the secondary (target) object.
+
+        :return Tuple: The modes of object 1, the modes of object 2, the mass of the smaller object, the amplitude of the sound, and the cache keys of the modes (or None if the cache is disabled).
+        """
+
         # The sound amplitude of object 2 relative to that of object 1.
         amp2re1 = secondary_amp / primary_amp
 
@@ -500,9 +631,19 @@ class PyImpact(CollisionManager):
         if secondary_id not in self.object_modes:
             self.object_modes.update({secondary_id: {}})
         if primary_id not in self.object_modes[secondary_id]:
-            self.object_modes[secondary_id].update({primary_id: CollisionAudioInfo(self._get_object_modes(secondary_material),
-                                                                                   self._get_object_modes(
-                                                                                       primary_material),
+            # Sample the modes from a finite number of seeds so that they can be cached.
+            if self.impulse_response_cache.max_bytes > 0:
+                seed_1 = self.rng.randint(0, self._num_cache_seeds)
+                seed_2 = self.rng.randint(0, self._num_cache_seeds)
+                self._cache_keys[(secondary_id, primary_id)] = ((secondary_material, seed_1, 0.0),
+                                                                (primary_material, seed_2, 0.0))
+                modes_1 = self._get_seeded_modes(material=secondary_material, seed=seed_1)
+                modes_2 = self._get_seeded_modes(material=primary_material, seed=seed_2)
+            else:
+                modes_1 = self._get_object_modes(secondary_material)
+                modes_2 = self._get_object_modes(primary_material)
+            self.object_modes[secondary_id].update({primary_id: CollisionAudioInfo(modes_1,
+                                                                                   modes_2,
                                                                                    amp=primary_amp * self.initial_amp)})
         # Unpack useful parameters.
         speed = np.square(velocity)
@@ -523,34 +664,120 @@ class PyImpact(CollisionManager):
         # Re-scale the amplitude.
         if self.object_modes[secondary_id][primary_id].count == 0:
             # Sample the modes.
-            sound, modes_1, modes_2 = self._make_impact_audio(amp2re1, mass,
-                                                              mat1=primary_material,
-                                                              mat2=secondary_material,
-                                                              id1=primary_id,
-                                                              id2=secondary_id,
-                                                              primary_resonance=primary_resonance,
-                                                              secondary_resonance=secondary_resonance)
+            modes_1 = self.object_modes[secondary_id][primary_id].obj1_modes
+            modes_2 = self.object_modes[secondary_id][primary_id].obj2_modes
+            # Scale the two sounds as specified.
+            decay_time_offset = 20 * np.log10(amp2re1)
+            modes_2.decay_times = modes_2.decay_times + decay_time_offset
             # Save collision info - we will need for later collisions.
             amp = self.object_modes[secondary_id][primary_id].amp
             self.object_modes[secondary_id][primary_id].init_speed = normal_speed
-            self.object_modes[secondary_id][primary_id].obj1_modes = modes_1
-            self.object_modes[secondary_id][primary_id].obj2_modes = modes_2
-
+            if self.impulse_response_cache.max_bytes > 0:
+                key_1, key_2 = self._cache_keys[(secondary_id, primary_id)]
+                key_2 = (key_2[0], key_2[1], key_2[2] + float(decay_time_offset))
+                self._cache_keys[(secondary_id, primary_id)] = (key_1, key_2)
+                keys = (key_1 + (-1,), key_2 + (-1,))
+            else:
+                keys = None
         else:
             amp = self.object_modes[secondary_id][primary_id].amp * normal_speed / self.object_modes[secondary_id][primary_id].init_speed
             # Adjust modes here so that two successive impacts are not identical.
             modes_1 = self.object_modes[secondary_id][primary_id].obj1_modes
             modes_2 = self.object_modes[secondary_id][primary_id].obj2_modes
-            modes_1.powers = modes_1.powers + self.rng.normal(0, 2, len(modes_1.powers))
-            modes_2.powers = modes_2.powers + self.rng.normal(0, 2, len(modes_2.powers))
-            sound = PyImpact._synth_impact_modes(modes_1, modes_2, mass, primary_resonance, secondary_resonance)
-            self.object_modes[secondary_id][primary_id].obj1_modes = modes_1
-            self.object_modes[secondary_id][primary_id].obj2_modes = modes_2
+            # Jitter copies of the modes with one of a finite number of seeds so that they can be cached.
+            if self.impulse_response_cache.max_bytes > 0:
+                jitter_seed = self.rng.randint(0, self._num_cache_seeds)
+                key_1, key_2 = self._cache_keys[(secondary_id, primary_id)]
+                keys = (key_1 + (jitter_seed,), key_2 + (jitter_seed,))
+                modes_1 = Modes(frequencies=modes_1.frequencies,
+                                powers=modes_1.powers + self._get_seeded_jitter(material=key_1[0], seed=key_1[1],
+                                                                                jitter_seed=jitter_seed,
+                                                                                num_modes=len(modes_1.powers)),
+                                decay_times=modes_1.decay_times)
+                modes_2 = Modes(frequencies=modes_2.frequencies,
+                                powers=modes_2.powers + self._get_seeded_jitter(material=key_2[0], seed=key_2[1],
+                                                                                jitter_seed=jitter_seed,
+                                                                                num_modes=len(modes_2.powers)),
+                                decay_times=modes_2.decay_times)
+            else:
+                keys = None
+                modes_1.powers = modes_1.powers + self.rng.normal(0, 2, len(modes_1.powers))
+                modes_2.powers = modes_2.powers + self.rng.normal(0, 2, len(modes_2.powers))
 
         if self.logging:
             mode_props = dict()
             self._log_modes(self.object_modes[secondary_id][primary_id].count, mode_props, primary_id, secondary_id,
                             modes_1, modes_2, amp, primary_material, secondary_material)
+        return modes_1, modes_2, mass, amp, keys
+
+    def _get_impulse_responses(self, impacts: List[Tuple[Modes, Modes, float, float, Optional[Tuple[tuple, tuple]]]]) -> List[np.ndarray]:
+        """
+        Get the impulse responses of several pairs of objects. If the impulse response cache is enabled, cached impulse responses and mode sums are reused; every other mode sum is synthesized in a single call to `Modes.sum_modes_batch()`.
+
+        :param impacts: A list of impacts. Each element is a tuple: The modes of object 1, the modes of object 2, the resonance of object 1, the resonance of object 2, and the cache keys of the modes (or None).
+
+        :return A list of impulse responses.
+        """
+
+        if self.impulse_response_cache.max_bytes <= 0:
+            return Modes.sum_modes_batch(modes=[[impact[0], impact[1]] for impact in impacts],
+                                         resonances=[[impact[2], impact[3]] for impact in impacts])
+        hs: List[Optional[np.ndarray]] = [None for _ in range(len(impacts))]
+        # Cached mode sums. Key = The cache key of the modes and the resonance.
+        mode_sums: Dict[tuple, np.ndarray] = dict()
+        # Mode sums that need to be synthesized.
+        missing_mode_sums: Dict[tuple, Tuple[Modes, float]] = dict()
+        # Impulse responses that can't be cached.
+        uncached: List[int] = list()
+        for i, (modes_1, modes_2, resonance_1, resonance_2, keys) in enumerate(impacts):
+            if keys is None:
+                uncached.append(i)
+                continue
+            h = self.impulse_response_cache.get((keys[0] + (resonance_1,), keys[1] + (resonance_2,)))
+            if h is not None:
+                hs[i] = h
+                continue
+            for key, modes, resonance in zip([keys[0] + (resonance_1,), keys[1] + (resonance_2,)],
+                                             [modes_1, modes_2], [resonance_1, resonance_2]):
+                if key in mode_sums or key in missing_mode_sums:
+                    continue
+                mode_sum = self.impulse_response_cache.get(key)
+                if mode_sum is None:
+                    missing_mode_sums[key] = (modes, resonance)
+                else:
+                    mode_sums[key] = mode_sum
+        # Synthesize every missing mode sum and uncached impulse response at once.
+        missing_keys = list(missing_mode_sums.keys())
+        synthesized = Modes.sum_modes_batch(modes=[[missing_mode_sums[k][0]] for k in missing_keys] +
+                                                  [[impacts[i][0], impacts[i][1]] for i in uncached],
+                                            resonances=[[missing_mode_sums[k][1]] for k in missing_keys] +
+                                                       [[impacts[i][2], impacts[i][3]] for i in uncached])
+        for key, mode_sum in zip(missing_keys, synthesized[:len(missing_keys)]):
+            # Copy the mode sum so that the cache doesn't keep the synthesis buffer in memory.
+            mode_sums[key] = mode_sum.copy()
+            self.impulse_response_cache.put(key, mode_sums[key])
+        for i, h in zip(uncached, synthesized[len(missing_keys):]):
+            hs[i] = h
+        # Add the mode sums together.
+        for i, (modes_1, modes_2, resonance_1, resonance_2, keys) in enumerate(impacts):
+            if hs[i] is not None:
+                continue
+            key_1 = keys[0] + (resonance_1,)
+            key_2 = keys[1] + (resonance_2,)
+            hs[i] = Modes.mode_add(mode_sums[key_1], mode_sums[key_2])
+            self.impulse_response_cache.put((key_1, key_2), hs[i])
+        return hs
+
+    def _get_impact_base64_sound(self, sound: Optional[np.ndarray], amp: float, primary_id: int,
+                                 secondary_id: Optional[int]) -> Optional[Base64Sound]:
+        """
+        :param sound: The synthesized impact sound.
+        :param amp: The amplitude of the sound.
+        :param primary_id: The object ID for the primary (target) object.
+        :param secondary_id: The object ID for the secondary (other) object.
+
+        :return Sound data as a Base64Sound object.
+        """
 
         # On rare occasions, it is possible for PyImpact to fail to generate a sound.
         if sound is None:
@@ -566,44 +793,22 @@ class PyImpact(CollisionManager):
         sound = amp * sound / np.max(np.abs(sound))
         return Base64Sound(sound)
 
-    def get_impact_sound_command(self, velocity: np.ndarray, contact_points: List[np.ndarray],
-                                 contact_normals: List[np.ndarray], primary_id: int,
-                                 primary_material: str, primary_amp: float, primary_mass: float,
-                                 secondary_id: Optional[int], secondary_material: str, secondary_amp: float,
-                                 secondary_mass: float, primary_resonance: float, secondary_resonance: float) -> Optional[dict]:
+    def _get_impact_sound_command(self, sound: Optional[Base64Sound], primary_id: int,
+                                  contact_points: List[np.ndarray]) -> Optional[dict]:
         """
-        Create an impact sound, and return a valid command to play audio data in TDW.
-        "target" should usually be the smaller object, which will play the sound.
-        "other" should be the larger (stationary) object.
-
+        :param sound: The impact sound.
         :param primary_id: The object ID for the primary (target) object.
-        :param primary_material: The material label for the primary (target) object.
-        :param secondary_id: The object ID for the secondary (other) object.
-        :param secondary_material: The material label for the secondary (other) object.
-        :param primary_amp: Sound amplitude of primary (target) object.
-        :param secondary_amp: Sound amplitude of the secondary (other) object.
-        :param primary_resonance: The resonance of the primary (target) object.
-        :param secondary_resonance: The resonance of the secondary (other) object.
-        :param velocity: The velocity.
         :param contact_points: The collision contact points.
-        :param contact_normals: The collision contact normals.
-        :param primary_mass: The mass of the primary (target) object.
-        :param secondary_mass: The mass of the secondary (target) object.
 
-        :return A `play_audio_data` or `play_point_source_data` command that can be sent to the build via `Controller.communicate()`.
+        :return A `play_audio_data` or `play_point_source_data` command, or None if there is no sound or if the primary object played an impact sound too recently.
         """
 
-        sound = self.get_impact_sound(velocity=velocity, contact_normals=contact_normals, primary_id=primary_id,
-                                      primary_material=primary_material, primary_amp=primary_amp,
-                                      primary_mass=primary_mass, secondary_id=secondary_id,
-                                      secondary_material=secondary_material, secondary_amp=secondary_amp,
-                                      secondary_mass=secondary_mass, primary_resonance=primary_resonance, secondary_resonance=secondary_resonance)
         if sound is not None:
             if primary_id not in self._impact_events:
-                self._impact_events[primary_id] = time()
+                self._impact_events[primary_id] = self._get_time()
                 return self._get_audio_command(audio_source_id=primary_id, contact_points=contact_points, sound=sound)
             # Don't play too many impact events to avoid a droning effect.
-            elif time() - self._impact_events[primary_id] < self._min_time_between_impact_events:
+            elif self._get_time() - self._impact_events[primary_id] < self._min_time_between_impact_events:
                 return None
             else:
                 return self._get_audio_command(audio_source_id=primary_id, contact_points=contact_points, sound=sound)
@@ -611,38 +816,12 @@ class PyImpact(CollisionManager):
         else:
             return None
 
-    def _make_impact_audio(self, amp2re1: float, mass: float, id1: int, id2: int, primary_resonance: float,
-                           secondary_resonance: float, mat1: str = 'cardboard', mat2: str = 'cardboard') -> (np.array, Modes, Modes):
-        """
-        Generate an impact sound.
-
-        :param mat1: The material label for one of the colliding objects.
-        :param mat2: The material label for the other object.
-        :param amp2re1: The sound amplitude of object 2 relative to that of object 1.
-        :param mass: The mass of the smaller of the two colliding objects.
-        :param id1: The ID for the one of the colliding objects.
-        :param id2: The ID for the other object.
-        :param primary_resonance: The resonance of one of the colliding objects.
-        :param secondary_resonance: The resonance of the other object.
-
-        :return The sound, and the object modes.
-        """
-
-        # Unpack material names.
-        for jmat in AudioMaterial:
-            if mat1 == jmat:
-                tmp1 = jmat
-                mat1 = tmp1.name
-            if mat2 == jmat:
-                tmp2 = jmat
-                mat2 = tmp2.name
-        # Sample modes of object1.
-        modes_1 = self.object_modes[id2][id1].obj1_modes
-        modes_2 = self.object_modes[id2][id1].obj2_modes
-        # Scale the two sounds as specified.
-        modes_2.decay_times = modes_2.decay_times + 20 * np.log10(amp2re1)
-        snth = PyImpact._synth_impact_modes(modes_1, modes_2, mass, primary_resonance, secondary_resonance)
-        return snth, modes_1, modes_2
+    def _get_time(self) -> float:
+        """
+        :return: The current time in seconds. This is used to set the minimum time between impact events.
+        """
+
+        return time() if self.frame_time is None else self.frame_time
 
     def _get_impulse_response(self, velocity: np.ndarray, contact_normals: List[np.ndarray], primary_id: int,
                               primary_material: str, primary_amp: float, primary_mass: float,
@@ -667,16 +846,16 @@ class PyImpact(CollisionManager):
         :return The impulse response and the frequency.
         """
 
-        self.get_impact_sound(velocity=velocity, contact_normals=contact_normals, primary_id=primary_id,
-                              primary_material=primary_material, primary_amp=primary_amp, primary_mass=primary_mass,
-                              secondary_id=secondary_id, secondary_material=secondary_material,
-                              secondary_amp=secondary_amp, secondary_mass=secondary_mass, primary_resonance=primary_resonance, secondary_resonance=secondary_resonance)
-
-        modes_1 = self.object_modes[secondary_id][primary_id].obj1_modes
-        modes_2 = self.object_modes[secondary_id][primary_id].obj2_modes
-        h1 = modes_1.sum_modes(resonance=primary_resonance)
-        h2 = modes_2.sum_modes(resonance=secondary_resonance)
-        h = Modes.mode_add(h1, h2)
+        modes_1, modes_2, mass, amp, keys = self._get_impact_modes(velocity=velocity, contact_normals=contact_normals,
+                                                                   primary_id=primary_id, primary_material=primary_material,
+                                                                   primary_amp=primary_amp, primary_mass=primary_mass,
+                                                                   secondary_id=secondary_id,
+                                                                   secondary_material=secondary_material,
+                                                                   secondary_amp=secondary_amp, secondary_mass=secondary_mass)
+        h = self._get_impulse_responses([(modes_1, modes_2, primary_resonance, secondary_resonance, keys)])[0]
+        # Count the collisions. An impact sound can be generated if the impulse response isn't empty.
+        if len(h) > 0:
+            self.object_modes[secondary_id][primary_id].count_collisions()
         return h, min(modes_1.frequencies)
 
     def get_scrape_sound_command(self, velocity: np.ndarray, contact_points: np.ndarray,
@@ -755,16 +934,14 @@ class PyImpact(CollisionManager):
         if scrape_key not in self._scrape_previous_indices:
             self._scrape_previous_indices[scrape_key] = 0
 
-        # Initialize scrape variables; if this is an in=process scrape, these will be replaced bu te stored values.
-        summed_master = AudioSegment.silent(duration=2000, frame_rate=SAMPLE_RATE)
-        scrape_event_count = 0
-
         # Is this a new scrape?
         if scrape_key in self._scrape_summed_masters:
             summed_master = self._scrape_summed_masters[scrape_key]
             scrape_event_count = self._scrape_events_count[scrape_key]
         else:
-            # No -- add initialized values to dictionaries.
+            # Yes -- add a silent master. The samples are stored as floats but are always 16-bit integer values.
+            summed_master = np.zeros(PyImpact._SCRAPE_CHUNK_LENGTH * PyImpact._SCRAPE_NUM_CHUNKS)
+            scrape_event_count = 0
             self._scrape_summed_masters[scrape_key] = summed_master
             self._scrape_events_count[scrape_key] = scrape_event_count
 
@@ -793,30 +970,9 @@ class PyImpact(CollisionManager):
                                                                 secondary_mass=secondary_mass,
                                                                 primary_resonance=primary_resonance,
                                                                 secondary_resonance=secondary_resonance)
-        # Cache the scrape material.
-        # Don't do this when PyImpact is initialized because scrape surfaces are large files!
-        # We don't want them in memory all the time and they can be a bit slow to load.
-        if scrape_material not in self.scrape_surface_data:
-            scrape_surface = np.load(str(
-                Path(resource_filename(__name__, f"py_impact/scrape_surfaces/{scrape_material.name}.npy")).resolve()))
-            for i in range(2):
-                scrape_surface = np.append(scrape_surface, scrape_surface)
-            #   Load the surface texture as a 1D vector
-            #   Create surface texture of desired length
-            #   Calculate first and second derivatives by first principles
-            #   Apply non-linearity on the second derivative
-            #   Apply a variable Gaussian average
-            #   Calculate the horizontal and vertical forces
-            #   Convolve the force with the impulse response
-            scrape_surface = gaussian_filter1d(scrape_surface, 5)
-            dsdx = (scrape_surface[1:] - scrape_surface[0:-1]) / PyImpact.SCRAPE_M_PER_PIXEL
-            d2sdx2 = (dsdx[1:] - dsdx[0:-1]) / PyImpact.SCRAPE_M_PER_PIXEL
-            rough_ratio = (np.std(scrape_surface) / (3 * 10 ** -4)) ** 1
-            r_gain = 20 * np.log10(rough_ratio)
-            self.scrape_surface_data[scrape_material] = {"dsdx": dsdx,
-                                                         "d2sdx2": d2sdx2,
-                                                         "surface": scrape_surface,
-                                                         "r_gain": r_gain}
+        # Cache the scrape material. This is usually already done in `_cache_static_data()`.
+        self._cache_scrape_surface(scrape_material=scrape_material)
+        scrape_surface_data = self.scrape_surface_data[scrape_material]
         dist = mag / 10
         num_pts = int(np.floor(dist / PyImpact.SCRAPE_M_PER_PIXEL) + 1)
         # No scrape.
@@ -827,15 +983,14 @@ class PyImpact(CollisionManager):
         final_ind = self._scrape_previous_indices[scrape_key] + num_pts
 
         vect1 = np.linspace(0, 1, num_pts)
-        vect2 = np.linspace(0, 1, 4410)
 
-        if final_ind > len(self.scrape_surface_data[scrape_material]["surface"]) - 1:
+        if final_ind > len(scrape_surface_data["surface"]) - 1:
             self._scrape_previous_indices[scrape_key] = 0
             final_ind = num_pts
-        slope_int = np.interp(vect2, vect1, self.scrape_surface_data[scrape_material]["dsdx"][
-                                            self._scrape_previous_indices[scrape_key]:final_ind])
-        curve_int = np.interp(vect2, vect1, self.scrape_surface_data[scrape_material]["d2sdx2"][
-                                            self._scrape_previous_indices[scrape_key]:final_ind])
+        slope_int = np.interp(PyImpact._SCRAPE_CHUNK_POSITIONS, vect1,
+                              scrape_surface_data["dsdx"][self._scrape_previous_indices[scrape_key]:final_ind])
+        curve_int = np.interp(PyImpact._SCRAPE_CHUNK_POSITIONS, vect1,
+                              scrape_surface_data["d2sdx2"][self._scrape_previous_indices[scrape_key]:final_ind])
         self._scrape_previous_indices[scrape_key] = final_ind
 
         curve_int_tan = np.tanh(curve_int / (1000 * primary_mass))
@@ -845,42 +1000,40 @@ class PyImpact(CollisionManager):
         vert_force = d2_section
         hor_force = slope_int
 
-        t_force2 = vert_force / max(np.abs(vert_force))
+        t_force2 = vert_force / np.abs(vert_force).max()
         t_force1 = hor_force[:len(vert_force)]
 
-        conv1 = sg.fftconvolve(scraping_ir, t_force1)
-        conv2 = sg.fftconvolve(scraping_ir, t_force2)
-
-        # Again, we need this as an AudioSegment for overlaying with the previous frame's segment.
-        # Convert to 16-bit integers for Unity, normalizing to make sure to minimize loss of precision from truncating floating values.
-        normalized_noise_ints_conv1 = PyImpact._normalize_16bit_int(conv1)
-        noise_seg_conv1 = AudioSegment(normalized_noise_ints_conv1.tobytes(),
-                                       frame_rate=SAMPLE_RATE,
-                                       sample_width=SAMPLE_WIDTH,
-                                       channels=CHANNELS)
+        # Convolve both forces with the impulse response. The impulse response is transformed only once.
+        conv_length = len(scraping_ir) + len(vert_force) - 1
+        fft_length = sp_fft.next_fast_len(conv_length, True)
+        conv1, conv2 = sp_fft.irfft(sp_fft.rfft(scraping_ir, fft_length) * sp_fft.rfft(np.vstack([t_force1, t_force2]), fft_length, axis=1),
+                                    fft_length, axis=1)[:, :conv_length]
 
-        normalized_noise_ints_conv2 = PyImpact._normalize_16bit_int(conv2)
-        noise_seg_conv2 = AudioSegment(normalized_noise_ints_conv2.tobytes(),
-                                       frame_rate=SAMPLE_RATE,
-                                       sample_width=SAMPLE_WIDTH,
-                                       channels=CHANNELS)
+        # Convert to 16-bit integer values, normalizing to make sure to minimize loss of precision from truncating floating values.
+        noise_conv1 = np.trunc(PyImpact._normalize_floats(conv1) * 32767)
+        noise_conv2 = np.trunc(PyImpact._normalize_floats(conv2) * 32767)
 
-        # Gain-adjust the convolved segment using db value computed earlier.
-        noise_seg_conv1 = noise_seg_conv1.apply_gain(db1)
-        noise_seg_conv2 = noise_seg_conv2.apply_gain(db2)
+        # Gain-adjust the convolved sounds using db value computed earlier.
+        PyImpact._apply_16bit_gain(noise_conv1, db1)
+        PyImpact._apply_16bit_gain(noise_conv2, db2)
 
-        noise_seg_conv = noise_seg_conv1.overlay(noise_seg_conv2)
+        noise_conv = noise_conv1
+        PyImpact._add_16bit(noise_conv, noise_conv2)
         # Apply roughness gain.
-        noise_seg_conv = noise_seg_conv.apply_gain(self.scrape_surface_data[scrape_material]["r_gain"])
-
-        # Pad the end of master with 100ms of silence, the start of the current segment with (n * 100ms) of silence, and overlay.
-        summed_master = summed_master + PyImpact.SILENCE_100MS
-        summed_master = summed_master.overlay(noise_seg_conv, position=100 * scrape_event_count)
+        PyImpact._apply_16bit_gain(noise_conv, scrape_surface_data["r_gain"])
+
+        # Overlay the sound onto the master, starting at the current chunk and wrapping around the end of the ring buffer.
+        # Anything longer than the master is discarded.
+        start_idx = (scrape_event_count % PyImpact._SCRAPE_NUM_CHUNKS) * PyImpact._SCRAPE_CHUNK_LENGTH
+        length = min(len(noise_conv), len(summed_master))
+        end_idx = min(start_idx + length, len(summed_master))
+        PyImpact._add_16bit(summed_master[start_idx:end_idx], noise_conv[:end_idx - start_idx])
+        if end_idx - start_idx < length:
+            PyImpact._add_16bit(summed_master[:length - (end_idx - start_idx)], noise_conv[end_idx - start_idx:length])
         # Extract 100ms "chunk" of sound to send over to Unity.
-        start_idx = 100 * scrape_event_count
-        unity_chunk = summed_master[start_idx:start_idx + 100]
-        # Update stored summed waveform.
-        self._scrape_summed_masters[scrape_key] = summed_master
+        unity_chunk = summed_master[start_idx:start_idx + PyImpact._SCRAPE_CHUNK_LENGTH].astype(np.int16).tobytes()
+        # Clear the chunk. It is now the last 100ms of the master.
+        summed_master[start_idx:start_idx + PyImpact._SCRAPE_CHUNK_LENGTH] = 0
 
         # Update scrape event count.
         scrape_event_count += 1
@@ -888,28 +1041,22 @@ class PyImpact(CollisionManager):
         # Scrape data is handled differently than impact data, so we'll create a dummy object first.
         sound = Base64Sound(np.array([0]))
         # Set the audio data.
-        sound.wav_str = base64.b64encode(unity_chunk.raw_data).decode()
-        sound.length = len(unity_chunk.raw_data)
-        sound.bytes = unity_chunk.raw_data
+        sound.wav_str = base64.b64encode(unity_chunk).decode()
+        sound.length = len(unity_chunk)
+        sound.bytes = unity_chunk
         return sound
 
     @staticmethod
-    def _synth_impact_modes(modes1: Modes, modes2: Modes, mass: float, primary_resonance: float, secondary_resonance: float) -> np.ndarray:
+    def _convolve_impact_force(h: np.ndarray, mass: float) -> Optional[np.ndarray]:
         """
-        Generate an impact sound from specified modes for two objects, and the mass of the smaller object.
+        Generate an impact sound from an impulse response.
 
-        :param modes1: Modes of object 1. A numpy array with: column1=mode frequencies (Hz); column2=mode onset powers in dB; column3=mode RT60s in milliseconds;
-        :param modes2: Modes of object 2. Formatted as modes1/modes2.
+        :param h: The impulse response.
         :param mass: the mass of the smaller of the two colliding objects.
-        :param primary_resonance: The resonance of the object 1.
-        :param secondary_resonance: The resonance of the object 2.
 
-        :return The impact sound.
+        :return The impact sound, or None if the impulse response is empty.
         """
 
-        h1 = modes1.sum_modes(resonance=primary_resonance)
-        h2 = modes2.sum_modes(resonance=secondary_resonance)
-        h = Modes.mode_add(h1, h2)
         if len(h) == 0:
             return None
         # Convolve with force, with contact time scaled by the object mass.
@@ -919,10 +1066,42 @@ class PyImpact(CollisionManager):
         n_pts = int(np.ceil(max_t * 44100))
         tt = np.linspace(0, np.pi, n_pts)
         frc = np.sin(tt)
-        x = sg.fftconvolve(h, frc)
+        # The force is at most 2ms long, so direct convolution is faster than FFT convolution.
+        x = np.convolve(h, frc)
         x = x / abs(np.max(x))
         return x
 
+    def _get_seeded_modes(self, material: str, seed: int) -> Modes:
+        """
+        :param material: The material label.
+        :param seed: The seed.
+
+        :return: Modes that are always the same for this material and seed.
+        """
+
+        key = (material, seed)
+        if key not in self._seeded_modes:
+            self._seeded_modes[key] = self._get_object_modes(material, rng=np.random.RandomState([crc32(material.encode("utf-8")), seed]))
+        modes = self._seeded_modes[key]
+        # Return a new object because the decay times of the modes might be replaced.
+        return Modes(frequencies=modes.frequencies, powers=modes.powers, decay_times=modes.decay_times)
+
+    def _get_seeded_jitter(self, material: str, seed: int, jitter_seed: int, num_modes: int) -> np.ndarray:
+        """
+        :param material: The material label.
+        :param seed: The seed that was used to sample the modes.
+        :param jitter_seed: The jitter seed.
+        :param num_modes: The number of modes.
+
+        :return: Mode power jitter values that are always the same for this material and these seeds.
+        """
+
+        key = (material, seed, jitter_seed)
+        if key not in self._seeded_jitter:
+            rng = np.random.RandomState([crc32(material.encode("utf-8")), seed, jitter_seed])
+            self._seeded_jitter[key] = rng.normal(0, 2, num_modes)
+        return self._seeded_jitter[key]
+
     @staticmethod
     def get_size(model: Union[np.ndarray, ModelRecord]) -> int:
         """
@@ -977,6 +1156,7 @@ class PyImpact(CollisionManager):
                 self._static_audio_data_overrides[k] = static_audio_data_overrides[k]
         # Clear the object data.
         self.object_modes.clear()
+        self._cache_keys.clear()
         # Clear collision data.
         self.collision_events.clear()
         # Clear scrape data.
@@ -1021,7 +1201,7 @@ class PyImpact(CollisionManager):
         mode_props["modes_2.decay_times"] = modes_2.decay_times.tolist()
         self.mode_properties_log[str(id1) + "_" + str(id2) + "__" + str(count)] = mode_props
 
-    def _cache_static_data(self, resp: List[bytes]) -> None:
+    def _cache_static_data(self, resp: Response) -> None:
         """
         Cache static data.
 
@@ -1036,67 +1216,65 @@ class PyImpact(CollisionManager):
         object_bouncinesses: Dict[int, float] = dict()
         extents: Dict[int, np.ndarray] = dict()
         vr_nodes: List[ObjectAudioStatic] = list()
-        for i in range(len(resp) - 1):
-            r_id = OutputData.get_data_type_id(resp[i])
-            if r_id == "boun":
-                boun = Bounds(resp[i])
-                for j in range(boun.get_num()):
-                    extents[boun.get_id(j)] = TDWUtils.get_bounds_extents(bounds=boun, index=j)
-            if r_id == "segm":
-                segm = SegmentationColors(resp[i])
-                for j in range(segm.get_num()):
-                    object_id = segm.get_object_id(j)
-                    model_name = segm.get_object_name(j).lower()
-                    names[object_id] = model_name
-                    categories[object_id] = segm.get_object_category(j)
-                    # Enable a scrape surface.
-                    if self._scrape and (model_name in DEFAULT_SCRAPE_MODELS or object_id in self._scrape_objects):
-                        if object_id not in self._scrape_objects:
-                            self._scrape_objects[object_id] = DEFAULT_SCRAPE_MODELS[model_name]
-                        # Add the visual material.
-                        material_record = PyImpact.__VISUAL_MATERIAL_LIBRARIAN.get_record(
-                            name=self._scrape_objects[object_id].visual_material)
-                        self.commands.append({"$type": "add_material",
-                                              "name": material_record.name,
-                                              "url": material_record.get_url()})
-                        # Set the visual material.
-                        for sub_object in self._scrape_objects[object_id].sub_objects:
-                            self.commands.append({"$type": "set_visual_material",
-                                                  "material_index": sub_object.material_index,
-                                                  "material_name": material_record.name,
-                                                  "object_name": sub_object.name,
-                                                  "id": object_id})
-            elif r_id == "srob":
-                srob = StaticRobot(resp[i])
-                for j in range(srob.get_num_joints()):
-                    joint_id = srob.get_joint_id(j)
-                    robot_joints[joint_id] = {"name": srob.get_joint_name(j),
-                                              "mass": srob.get_joint_mass(j)}
-            elif r_id == "srig":
-                srig = StaticRigidbodies(resp[i])
-                for j in range(srig.get_num()):
-                    object_masses[srig.get_id(j)] = srig.get_mass(j)
-                    object_bouncinesses[srig.get_id(j)] = srig.get_bounciness(j)
-            # Add VR nodes.
-            elif r_id == "soct":
-                soct = StaticOculusTouch(resp[i])
-                if soct.get_human_hands():
-                    vr_material = PyImpact.VR_HUMAN_MATERIAL
-                    vr_bounciness = PyImpact.VR_HUMAN_BOUNCINESS
-                else:
-                    vr_material = PyImpact.ROBOT_JOINT_MATERIAL
-                    vr_bounciness = PyImpact.ROBOT_JOINT_BOUNCINESS
-                for vr_id, vr_name in zip([soct.get_body_id(), soct.get_left_hand_id(), soct.get_right_hand_id()],
-                                          ["vr_node_body", "vr_node_left_hand", "vr_node_right_hand"]):
-                    vr_nodes.append(ObjectAudioStatic(name=vr_name,
-                                                      mass=10,
-                                                      material=vr_material,
-                                                      bounciness=vr_bounciness,
-                                                      resonance=PyImpact.DEFAULT_RESONANCE,
-                                                      size=PyImpact.DEFAULT_SIZE,
-                                                      amp=PyImpact.DEFAULT_AMP,
-                                                      object_id=vr_id))
-                    self._excluded_objects.append(vr_id)
+        boun: Bounds
+        for boun in resp.get_output_data("boun"):
+            for j in range(boun.get_num()):
+                extents[boun.get_id(j)] = TDWUtils.get_bounds_extents(bounds=boun, index=j)
+        segm: SegmentationColors
+        for segm in resp.get_output_data("segm"):
+            for j in range(segm.get_num()):
+                object_id = segm.get_object_id(j)
+                model_name = segm.get_object_name(j).lower()
+                names[object_id] = model_name
+                categories[object_id] = segm.get_object_category(j)
+                # Enable a scrape surface.
+                if self._scrape and (model_name in DEFAULT_SCRAPE_MODELS or object_id in self._scrape_objects):
+                    if object_id not in self._scrape_objects:
+                        self._scrape_objects[object_id] = DEFAULT_SCRAPE_MODELS[model_name]
+                    # Add the visual material.
+                    material_record = PyImpact.__VISUAL_MATERIAL_LIBRARIAN.get_record(
+                        name=self._scrape_objects[object_id].visual_material)
+                    self.commands.append({"$type": "add_material",
+                                          "name": material_record.name,
+                                          "url": material_record.get_url()})
+                    # Set the visual material.
+                    for sub_object in self._scrape_objects[object_id].sub_objects:
+                        self.commands.append({"$type": "set_visual_material",
+                                              "material_index": sub_object.material_index,
+                                              "material_name": material_record.name,
+                                              "object_name": sub_object.name,
+                                              "id": object_id})
+        srob: StaticRobot
+        for srob in resp.get_output_data("srob"):
+            for j in range(srob.get_num_joints()):
+                joint_id = srob.get_joint_id(j)
+                robot_joints[joint_id] = {"name": srob.get_joint_name(j),
+                                          "mass": srob.get_joint_mass(j)}
+        srig: StaticRigidbodies
+        for srig in resp.get_output_data("srig"):
+            for j in range(srig.get_num()):
+                object_masses[srig.get_id(j)] = srig.get_mass(j)
+                object_bouncinesses[srig.get_id(j)] = srig.get_bounciness(j)
+        # Add VR nodes.
+        soct: StaticOculusTouch
+        for soct in resp.get_output_data("soct"):
+            if soct.get_human_hands():
+                vr_material = PyImpact.VR_HUMAN_MATERIAL
+                vr_bounciness = PyImpact.VR_HUMAN_BOUNCINESS
+            else:
+                vr_material = PyImpact.ROBOT_JOINT_MATERIAL
+                vr_bounciness = PyImpact.ROBOT_JOINT_BOUNCINESS
+            for vr_id, vr_name in zip([soct.get_body_id(), soct.get_left_hand_id(), soct.get_right_hand_id()],
+                                      ["vr_node_body", "vr_node_left_hand", "vr_node_right_hand"]):
+                vr_nodes.append(ObjectAudioStatic(name=vr_name,
+                                                  mass=10,
+                                                  material=vr_material,
+                                                  bounciness=vr_bounciness,
+                                                  resonance=PyImpact.DEFAULT_RESONANCE,
+                                                  size=PyImpact.DEFAULT_SIZE,
+                                                  amp=PyImpact.DEFAULT_AMP,
+                                                  object_id=vr_id))
+                self._excluded_objects.append(vr_id)
         need_to_derive: List[int] = list()
         for object_id in names:
             name = names[object_id]
@@ -1112,37 +1290,33 @@ class PyImpact(CollisionManager):
                 self._static_audio_data[object_id].object_id = object_id
             else:
                 need_to_derive.append(object_id)
-        current_values = self._static_audio_data.values()
+        current_values = list(self._static_audio_data.values())
+        # Index the objects by category.
+        category_objects: Dict[str, List[int]] = dict()
+        for object_id in categories:
+            if categories[object_id] in category_objects:
+                category_objects[categories[object_id]].append(object_id)
+            else:
+                category_objects[categories[object_id]] = [object_id]
+        # The values derived from comparable objects in the same category. These are the same for every object, so they're derived only once.
+        category_values: Optional[Tuple[float, AudioMaterial, float]] = None
+        # Objects with audio data, sorted by mass, and the order of each object in `object_masses`.
+        mass_ids: List[int] = sorted([m_id for m_id in object_masses if m_id in self._static_audio_data], key=lambda m_id: object_masses[m_id])
+        sorted_masses: List[float] = [object_masses[m_id] for m_id in mass_ids]
+        mass_orders: Dict[int, int] = {m_id: i for i, m_id in enumerate(object_masses)}
         derived_data: Dict[int, ObjectAudioStatic] = dict()
         for object_id in need_to_derive:
             # Fallback option: comparable objects in the same category.
-            objects_in_same_category = [o for o in categories if categories[o] == categories[object_id]]
+            objects_in_same_category = category_objects[categories[object_id]]
             if len(objects_in_same_category) > 0:
-                amps: List[float] = [a.amp for a in current_values]
-                materials: List[AudioMaterial] = [a.material for a in current_values]
-                resonances: List[float] = [a.resonance for a in current_values]
+                if category_values is None:
+                    category_values = PyImpact._get_derived_values(objects=current_values)
+                amp, material, resonance = category_values
             # Fallback option: Find objects with similar volume.
             else:
-                amps: List[float] = list()
-                materials: List[AudioMaterial] = list()
-                resonances: List[float] = list()
-                for m_id in object_masses:
-                    if m_id == object_id or m_id not in self._static_audio_data:
-                        continue
-                    if np.abs(object_masses[m_id] / object_masses[object_id]) < 1.5:
-                        amps.append(self._static_audio_data[m_id].amp)
-                        materials.append(self._static_audio_data[m_id].material)
-                        resonances.append(self._static_audio_data[m_id].resonance)
-            # Fallback option: Use default values.
-            if len(amps) == 0:
-                amp: float = PyImpact.DEFAULT_AMP
-                material: AudioMaterial = PyImpact.DEFAULT_MATERIAL
-                resonance: float = PyImpact.DEFAULT_RESONANCE
-            # Get averages or maximums of each value.
-            else:
-                amp: float = round(sum(amps) / len(amps), 3)
-                material: AudioMaterial = max(set(materials), key=materials.count)
-                resonance: float = round(sum(resonances) / len(resonances), 3)
+                similar_ids = PyImpact._get_similar_mass_ids(object_id=object_id, object_masses=object_masses, mass_ids=mass_ids,
+                                                             sorted_masses=sorted_masses, mass_orders=mass_orders)
+                amp, material, resonance = PyImpact._get_derived_values(objects=[self._static_audio_data[m_id] for m_id in similar_ids])
             derived_data[object_id] = ObjectAudioStatic(name=names[object_id],
                                                         mass=object_masses[object_id],
                                                         material=material,
@@ -1167,6 +1341,101 @@ class PyImpact(CollisionManager):
         # Add VR nodes.
         for vr_node in vr_nodes:
             self._static_audio_data[vr_node.object_id] = vr_node
+        # Cache the scrape surfaces that are in the scene.
+        for scrape_model in self._scrape_objects.values():
+            self._cache_scrape_surface(scrape_material=scrape_model.scrape_material)
+
+    @staticmethod
+    def _get_derived_values(objects: List[ObjectAudioStatic]) -> Tuple[float, AudioMaterial, float]:
+        """
+        :param objects: Comparable objects.
+
+        :return: Tuple: The average amp, the most common material, and the average resonance of the objects. If there are no objects, the default values.
+        """
+
+        # Fallback option: Use default values.
+        if len(objects) == 0:
+            return PyImpact.DEFAULT_AMP, PyImpact.DEFAULT_MATERIAL, PyImpact.DEFAULT_RESONANCE
+        # Get averages or maximums of each value.
+        else:
+            amps: List[float] = [a.amp for a in objects]
+            materials: List[AudioMaterial] = [a.material for a in objects]
+            resonances: List[float] = [a.resonance for a in objects]
+            return round(sum(amps) / len(amps), 3), max(set(materials), key=materials.count), round(sum(resonances) / len(resonances), 3)
+
+    @staticmethod
+    def _get_similar_mass_ids(object_id: int, object_masses: Dict[int, float], mass_ids: List[int],
+                              sorted_masses: List[float], mass_orders: Dict[int, int]) -> List[int]:
+        """
+        :param object_id: The object ID.
+        :param object_masses: The mass of each object. Key = The object ID.
+        :param mass_ids: The IDs of the objects that have audio data, sorted by mass.
+        :param sorted_masses: The mass of each object in `mass_ids`.
+        :param mass_orders: The index of each object in `object_masses`. Key = The object ID.
+
+        :return: The IDs of the objects in `mass_ids` other than `object_id` whose mass is less than 1.5 times the mass of the object, in the same order as `object_masses`.
+        """
+
+        # Only objects with less than 1.5 times this mass can be similar. The mass ratio is checked again below.
+        if len(mass_ids) > 0 and object_masses[object_id] > 0:
+            candidate_ids = mass_ids[:bisect_right(sorted_masses, object_masses[object_id] * 1.5 * (1 + 1e-9))]
+        else:
+            candidate_ids = mass_ids
+        return sorted([m_id for m_id in candidate_ids if m_id != object_id and np.abs(object_masses[m_id] / object_masses[object_id]) < 1.5],
+                      key=lambda m_id: mass_orders[m_id])
+
+    def _cache_scrape_surface(self, scrape_material: ScrapeMaterial) -> None:
+        """
+        Load a scrape surface and derive its slopes and curvatures, if this hasn't already been done.
+        Scrape surfaces are large files, so only the surfaces of scrape objects in the scene are loaded.
+
+        :param scrape_material: The [scrape material](../physics_audio/scrape_material.md).
+        """
+
+        if scrape_material in self.scrape_surface_data:
+            return
+        #   Load the surface texture as a 1D vector
+        #   Create surface texture of desired length
+        #   Calculate first and second derivatives by first principles
+        #   Apply non-linearity on the second derivative
+        #   Apply a variable Gaussian average
+        #   Calculate the horizontal and vertical forces
+        #   Convolve the force with the impulse response
+        scrape_surface = np.tile(np.load(str(Path(resource_filename(__name__, f"py_impact/scrape_surfaces/{scrape_material.name}.npy")).resolve())), 4)
+        scrape_surface = gaussian_filter1d(scrape_surface, 5)
+        dsdx = np.diff(scrape_surface) / PyImpact.SCRAPE_M_PER_PIXEL
+        d2sdx2 = np.diff(dsdx) / PyImpact.SCRAPE_M_PER_PIXEL
+        rough_ratio = (np.std(scrape_surface) / (3 * 10 ** -4)) ** 1
+        r_gain = 20 * np.log10(rough_ratio)
+        self.scrape_surface_data[scrape_material] = {"dsdx": dsdx,
+                                                     "d2sdx2": d2sdx2,
+                                                     "surface": scrape_surface,
+                                                     "r_gain": r_gain}
+
+    @staticmethod
+    def _apply_16bit_gain(arr: np.ndarray, db: float) -> None:
+        """
+        Apply a gain to 16-bit integer audio values in-place. The values are rounded down and clipped to the 16-bit range.
+
+        :param arr: The audio values as a numpy float array.
+        :param db: The gain in decibels.
+        """
+
+        np.multiply(arr, 10 ** (db / 20), out=arr)
+        np.floor(arr, out=arr)
+        np.clip(arr, -32768, 32767, out=arr)
+
+    @staticmethod
+    def _add_16bit(arr: np.ndarray, other: np.ndarray) -> None:
+        """
+        Add 16-bit integer audio values in-place. The sum is clipped to the 16-bit range.
+
+        :param arr: The audio values as a numpy float array. This will be modified.
+        :param other: The audio values to add as a numpy float array. Must be the same length as `arr`.
+        """
+
+        np.add(arr, other, out=arr)
+        np.clip(arr, -32768, 32767, out=arr)
 
     @staticmethod
     def _normalize_16bit_int(arr: np.ndarray) -> np.ndarray:
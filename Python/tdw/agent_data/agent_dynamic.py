@@ -6,7 +6,8 @@ import numpy as np
 from pathlib import Path
 from PIL import Image
 from tdw.tdw_utils import TDWUtils
-from tdw.output_data import OutputData, Images, CameraMatrices, Transforms
+from tdw.output_data import Images, CameraMatrices, Transforms
+from tdw.response import Response
 from tdw.object_data.transform import Transform
 from tdw.type_aliases import PATH
 
@@ -51,39 +52,38 @@ class AgentDynamic(ABC):
         The ID of the avatar.
         """
         self.avatar_id = str(agent_id)
-        for i in range(len(resp) - 1):
-            r_id = OutputData.get_data_type_id(resp[i])
-            # Get agent's transform data.
-            if r_id == "tran":
-                transforms = Transforms(resp[i])
-                for j in range(transforms.get_num()):
-                    if transforms.get_id(j) == agent_id:
-                        self.transform = Transform(position=transforms.get_position(j),
-                                                   rotation=transforms.get_rotation(j),
-                                                   forward=transforms.get_forward(j))
-            # Get the images captured by the avatar's camera.
-            elif r_id == "imag":
-                images = Images(resp[i])
-                # Get this agents's avatar and save the images.
-                if images.get_avatar_id() == self.avatar_id:
-                    self.got_images = True
-                    for j in range(images.get_num_passes()):
-                        image_data = images.get_image(j)
-                        pass_mask = images.get_pass_mask(j)
-                        if pass_mask == "_depth":
-                            image_data = TDWUtils.get_shaped_depth_pass(images=images, index=j)
-                        # Remove the underscore from the pass mask such as: _img -> img
-                        pass_name = pass_mask[1:]
-                        # Save the image data.
-                        self.images[pass_name] = image_data
-                        # Record the file extension.
-                        self.__image_extensions[pass_name] = images.get_extension(j)
-            # Get the camera matrices for the avatar's camera.
-            elif r_id == "cama":
-                camera_matrices = CameraMatrices(resp[i])
-                if camera_matrices.get_avatar_id() == self.avatar_id:
-                    self.projection_matrix = camera_matrices.get_projection_matrix()
-                    self.camera_matrix = camera_matrices.get_camera_matrix()
+        resp = Response.get_response(resp)
+        # Get agent's transform data.
+        transforms: Transforms
+        for transforms in resp.get_output_data("tran"):
+            for j in range(transforms.get_num()):
+                if transforms.get_id(j) == agent_id:
+                    self.transform = Transform(position=transforms.get_position(j),
+                                               rotation=transforms.get_rotation(j),
+                                               forward=transforms.get_forward(j))
+        # Get the images captured by the avatar's camera.
+        images: Images
+        for images in resp.get_output_data("imag"):
+            # Get this agents's avatar and save the images.
+            if images.get_avatar_id() == self.avatar_id:
+                self.got_images = True
+                for j in range(images.get_num_passes()):
+                    image_data = images.get_image(j)
+                    pass_mask = images.get_pass_mask(j)
+                    if pass_mask == "_depth":
+                        image_data = TDWUtils.get_shaped_depth_pass(images=images, index=j)
+                    # Remove the underscore from the pass mask such as: _img -> img
+                    pass_name = pass_mask[1:]
+                    # Save the image data.
+                    self.images[pass_name] = image_data
+                    # Record the file extension.
+                    self.__image_extensions[pass_name] = images.get_extension(j)
+        # Get the camera matrices for the avatar's camera.
+        camera_matrices: CameraMatrices
+        for camera_matrices in resp.get_output_data("cama"):
+            if camera_matrices.get_avatar_id() == self.avatar_id:
+                self.projection_matrix = camera_matrices.get_projection_matrix()
+                self.camera_matrix = camera_matrices.get_camera_matrix()
 
     @final
     def save_images(self, output_directory: PATH) -> None:
@@ -0,0 +1,221 @@
+import json
+import asyncio
+from time import perf_counter
+from threading import Lock
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Union, Deque
+import zmq.asyncio
+from tdw.controller import Controller
+from tdw.response import Response
+from tdw.add_ons.add_on import AddOn
+
+
+class AsyncController(Controller):
+    """
+    An asyncio controller. `communicate(commands)` is a coroutine, which means that other Python code can run while the controller waits for the build.
+
+    `AsyncController` has two lists of add-ons:
+
+    - `add_ons` works exactly like `Controller.add_ons`. Each add-on's `on_send(resp)` is called before `communicate(commands)` returns.
+    - `pipelined_add_ons` are add-ons that can tolerate one or more frames of latency, such as `ImageCapture` or `PyImpact`. Their `on_send(resp)` is called in a background thread *after* `communicate(commands)` returns, which means that the post-processing of frame N (for example, saving images to disk) overlaps with the build simulating frame N+1. The commands that a pipelined add-on sends in response to frame N are sent with the next call to `communicate(commands)` after it finishes processing frame N.
+
+    `pipeline_depth` is the maximum number of frames that the pipelined add-ons can lag behind the build. If the pipelined add-ons are this many frames behind, `communicate(commands)` waits for them to catch up. If `pipeline_depth == 0`, `communicate(commands)` waits for the pipelined add-ons every frame.
+
+    A pipelined add-on's `before_send(commands)` is called in the main thread, just like the `before_send(commands)` of the add-ons in `add_ons`. This means that it can be called while the add-on's `on_send(resp)` is still processing an earlier frame in the background thread.
+
+    If there are any `timing_hooks`, they are called after each step of `communicate(commands)` that runs in the main thread: `collect_commands`, `before_send` (once per add-on and pipelined add-on), `json.dumps`, `send`, `receive` (which includes waiting for the build and any other coroutines that run in the meantime), `index_response`, `on_send` (once per add-on in `add_ons`), `wait_for_pipeline` (waiting for the pipelined add-ons to catch up), and finally `communicate` for the entire call. The pipelined add-ons' `on_send(resp)` calls run in the background thread and aren't timed.
+
+    When `communicate(commands)` sends `{"$type": "terminate"}`, it waits for the pipelined add-ons to finish processing every frame and then shuts down the background thread.
+
+    ```python
+    import asyncio
+    from tdw.async_controller import AsyncController
+    from tdw.add_ons.third_person_camera import ThirdPersonCamera
+    from tdw.add_ons.image_capture import ImageCapture
+
+
+    async def main():
+        c = AsyncController(pipeline_depth=1)
+        camera = ThirdPersonCamera(position={"x": 2, "y": 1.6, "z": -0.6},
+                                   look_at={"x": 0, "y": 0, "z": 0},
+                                   avatar_id="a")
+        c.add_ons.append(camera)
+        c.pipelined_add_ons.append(ImageCapture(avatar_ids=["a"], path="images"))
+        await c.communicate(c.get_add_scene(scene_name="tdw_room"))
+        for i in range(100):
+            await c.communicate([])
+        # This waits for the pipelined add-ons to finish.
+        await c.communicate({"$type": "terminate"})
+
+    asyncio.run(main())
+    ```
+
+    Pipelined add-ons are always called in the same order, one frame at a time, in a single background thread. Don't read or modify a pipelined add-on's data in your controller while `communicate(commands)` might be processing it; call `await c.flush()` first.
+    """
+
+    def __init__(self, port: int = 1071, check_version: bool = True, launch_build: bool = True, zero_copy: bool = False,
+                 pipeline_depth: int = 1):
+        """
+        Create the network socket and bind the socket to the port.
+
+        :param port: The port number.
+        :param check_version: If true, the controller will check the version of the build and print the result.
+        :param launch_build: If True, automatically launch the build. If one doesn't exist, download and extract the correct version. Set this to False to use your own build, or (if you are a backend developer) to use Unity Editor.
+        :param zero_copy: If True, receive output data without copying it. Each element of the response will be a `memoryview` of a ZMQ frame rather than `bytes`.
+        :param pipeline_depth: The maximum number of frames that the pipelined add-ons can lag behind the build. Must be >= 0.
+        """
+
+        if pipeline_depth < 0:
+            raise Exception(f"Invalid pipeline depth: {pipeline_depth}")
+
+        """:field
+        A list of add-ons that can tolerate one or more frames of latency. Their `on_send(resp)` is called in a background thread.
+        """
+        self.pipelined_add_ons: List[AddOn] = list()
+        # The maximum number of frames that the pipelined add-ons can lag behind the build.
+        self._pipeline_depth: int = pipeline_depth
+        # Pipelined add-ons are called in a single thread so that they always process frames in order.
+        self._executor: ThreadPoolExecutor = ThreadPoolExecutor(max_workers=1)
+        # Frames that are still being processed by the pipelined add-ons.
+        self._pipeline: Deque[asyncio.Future] = deque()
+        # Commands from the pipelined add-ons. These are sent on the next `communicate(commands)` call.
+        self._pipelined_commands: List[dict] = list()
+        self._pipelined_commands_lock: Lock = Lock()
+        super().__init__(port=port, check_version=check_version, launch_build=launch_build, zero_copy=zero_copy)
+        # Share the underlying socket with an asyncio socket.
+        self._async_socket: zmq.asyncio.Socket = zmq.asyncio.Socket.from_socket(self.socket)
+
+    async def communicate(self, commands: Union[dict, List[dict]]) -> Response:
+        """
+        Send commands and receive output data in response. This is a coroutine.
+
+        :param commands: A list of JSON commands.
+
+        :return The output data from the build as a [`Response`](response.md), which is a list of byte arrays indexed by output data type.
+        """
+
+        t0 = perf_counter()
+        t = t0
+        # If there are timing hooks, time each step.
+        timed: bool = len(self.timing_hooks) > 0
+
+        if isinstance(commands, dict):
+            commands = [commands]
+
+        # Append commands from each add-on.
+        for m in self.add_ons:
+            if not m.initialized:
+                Controller._initialize_add_on(add_on=m, commands=commands)
+            else:
+                commands.extend(m.commands)
+                m.commands.clear()
+        # Initialize the pipelined add-ons. After this, their commands are collected by the background thread.
+        for m in self.pipelined_add_ons:
+            if not m.initialized:
+                Controller._initialize_add_on(add_on=m, commands=commands)
+        # Append the commands that the pipelined add-ons have finished generating.
+        with self._pipelined_commands_lock:
+            commands.extend(self._pipelined_commands)
+            self._pipelined_commands.clear()
+        if timed:
+            t = self._time_step(step="collect_commands", t0=t)
+        # Possibly do something with the commands about to be sent.
+        for m in self.add_ons:
+            m.before_send(commands)
+            if timed:
+                t = self._time_step(step="before_send", t0=t, add_on=m)
+        for m in self.pipelined_add_ons:
+            m.before_send(commands)
+            if timed:
+                t = self._time_step(step="before_send", t0=t, add_on=m)
+
+        # Serialize the message.
+        msg = [json.dumps(commands).encode('utf-8')]
+        if timed:
+            t = self._time_step(step="json.dumps", t0=t)
+        # Send the commands. While we wait for the build, the pipelined add-ons process the previous frame(s).
+        await self._async_socket.send_multipart(msg)
+        if timed:
+            t = self._time_step(step="send", t0=t)
+        # Receive output data.
+        resp = await self._receive_async()
+        if timed:
+            t = self._time_step(step="receive", t0=t)
+
+        # Re-send the commands if the build failed to receive them. See: `Controller.communicate(commands)`.
+        ftre: bool = Controller._is_ftre(resp)
+        num_ftre: int = 0
+        while ftre and num_ftre < 1000:
+            await self._async_socket.send_multipart(msg)
+            resp = await self._receive_async()
+            num_ftre += 1
+            ftre = Controller._is_ftre(resp)
+        # Index the output data and check for errors.
+        resp = self._get_response(resp=resp, ftre=ftre)
+        if timed:
+            t = self._time_step(step="index_response", t0=t)
+
+        # Get commands per module for the next frame.
+        for m in self.add_ons:
+            m.on_send(resp=resp)
+            if timed:
+                t = self._time_step(step="on_send", t0=t, add_on=m)
+
+        # Process this frame with the pipelined add-ons in the background.
+        if len(self.pipelined_add_ons) > 0:
+            self._pipeline.append(asyncio.get_running_loop().run_in_executor(self._executor,
+                                                                             self._pipelined_on_send,
+                                                                             resp,
+                                                                             self.pipelined_add_ons[:]))
+            # Wait for the pipelined add-ons to catch up.
+            while len(self._pipeline) > self._pipeline_depth:
+                await self._pipeline.popleft()
+        # Wait for the pipelined add-ons to finish and stop the background thread.
+        if any(command["$type"] == "terminate" for command in commands):
+            await self.flush()
+            self._executor.shutdown(wait=True)
+        if timed:
+            if len(self.pipelined_add_ons) > 0:
+                self._time_step(step="wait_for_pipeline", t0=t)
+            self._time_step(step="communicate", t0=t0)
+
+        # Return the output data from the build.
+        return resp
+
+    async def flush(self) -> None:
+        """
+        Wait for the pipelined add-ons to finish processing every frame. This is a coroutine.
+
+        Call this before reading data from a pipelined add-on. `communicate(commands)` calls this automatically after sending `{"$type": "terminate"}`.
+        """
+
+        while len(self._pipeline) > 0:
+            await self._pipeline.popleft()
+
+    async def _receive_async(self) -> list:
+        """
+        Receive output data from the build. This is a coroutine.
+
+        :return: The response from the build. If `zero_copy == True` in the constructor, each element is a memoryview of a ZMQ frame.
+        """
+
+        if self._zero_copy:
+            return [frame.buffer for frame in await self._async_socket.recv_multipart(copy=False)]
+        else:
+            return await self._async_socket.recv_multipart()
+
+    def _pipelined_on_send(self, resp: Response, add_ons: List[AddOn]) -> None:
+        """
+        Call `on_send(resp)` for each pipelined add-on. This is called in a background thread.
+
+        :param resp: The response from the build.
+        :param add_ons: The pipelined add-ons.
+        """
+
+        for m in add_ons:
+            m.on_send(resp=resp)
+            # Send the add-on's commands on the next frame.
+            with self._pipelined_commands_lock:
+                self._pipelined_commands.extend(m.commands)
+                m.commands.clear()
@@ -0,0 +1,298 @@
+from io import BytesIO
+from json import loads
+from base64 import b64decode
+from pathlib import Path
+from threading import Thread
+from typing import List, Union, Optional
+import numpy as np
+from PIL import Image
+import zmq
+from tdw.flatbuffers.builder import Builder
+from tdw.flatbuffers import number_types
+from tdw.FBOutput import Transforms as Trans
+from tdw.FBOutput import Images as Imags
+from tdw.FBOutput import ImagePass
+from tdw.FBOutput import PassMask
+from tdw.FBOutput import Collision as Col
+from tdw.FBOutput import Vector3
+from tdw.FBOutput import ContactPoint
+from tdw.version import __version__
+from tdw.output_data_reader import OutputDataReader
+
+
+class FakeBuild:
+    """
+    A stand-in for the build that doesn't render or simulate anything. Use this to benchmark or profile the Python side of TDW (command serialization, add-ons, output data deserialization) without a GPU.
+
+    The fake build connects to a controller, performs the same handshake as the build, and then responds to every `communicate(commands)` call with either:
+
+    - Frames recorded by [`OutputDataWriter`](../add_ons/output_data_writer.md), which are replayed in a loop.
+    - Synthesized `Transforms`, `Images`, and `Collision` output data of a configurable size.
+
+    The output data is generated once and then sent every frame, so the fake build responds almost instantly.
+
+    ```python
+    from tdw.controller import Controller
+    from tdw.backend.fake_build import FakeBuild
+
+    build = FakeBuild(port=1071, num_objects=100, avatar_ids=["a"], image_size=256, passes=["_img", "_id"])
+    build.start()
+    c = Controller(port=1071, check_version=False, launch_build=False)
+    for i in range(1000):
+        resp = c.communicate([])
+    c.communicate({"$type": "terminate"})
+    ```
+    """
+
+    # The pass masks per pass name.
+    PASS_MASKS = {"_img": PassMask.PassMask._img,
+                  "_id": PassMask.PassMask._id,
+                  "_category": PassMask.PassMask._category,
+                  "_mask": PassMask.PassMask._mask,
+                  "_depth": PassMask.PassMask._depth,
+                  "_normals": PassMask.PassMask._normals,
+                  "_flow": PassMask.PassMask._flow,
+                  "_depth_simple": PassMask.PassMask._depth_simple,
+                  "_albedo": PassMask.PassMask._albedo}
+
+    def __init__(self, port: int = 1071, output_data_directory: Union[str, Path] = None, num_objects: int = 0,
+                 avatar_ids: List[str] = None, image_size: int = 256, passes: List[str] = None, png: bool = False,
+                 num_collisions: int = 0, num_contacts: int = 1, unity_version: str = "fake"):
+        """
+        :param port: The socket port.
+        :param output_data_directory: The path to a directory of frames saved by `OutputDataWriter` (either as text files or, if `binary=True`, as a binary log). If not None, the fake build replays these frames and ignores the other output data parameters.
+        :param num_objects: The number of objects in the synthesized `Transforms` output data. If 0, there is no `Transforms` output data.
+        :param avatar_ids: The ID of each avatar. There will be one synthesized `Images` output data object per avatar. If None, there is no `Images` output data.
+        :param image_size: The width and height of each synthesized image.
+        :param passes: The image passes, for example `["_img", "_id", "_depth"]`. If None, defaults to `["_img"]`.
+        :param png: If True, `_img` passes are encoded as .png files. If False, `_img` passes are encoded as .jpg files.
+        :param num_collisions: The number of synthesized `Collision` output data objects per frame.
+        :param num_contacts: The number of contact points per `Collision`.
+        :param unity_version: The Unity Engine version that will be sent in `Version` output data.
+        """
+
+        self._port: int = port
+        self._unity_version: str = unity_version
+        """:field
+        The output data that is sent per frame, not including the frame number.
+        """
+        self.frames: List[List[bytes]] = list()
+        if output_data_directory is not None:
+            if isinstance(output_data_directory, str):
+                output_data_directory = Path(output_data_directory)
+            # Read a binary log.
+            if output_data_directory.joinpath(OutputDataReader.DATA_FILENAME).exists():
+                reader = OutputDataReader(path=output_data_directory)
+                for i in range(len(reader)):
+                    # Remove the frame number. The fake build sends its own frame number.
+                    self.frames.append(reader.get_frame(i)[:-1])
+                reader.close()
+            else:
+                for path in sorted(output_data_directory.glob("*.txt")):
+                    # Remove the frame number. The fake build sends its own frame number.
+                    self.frames.append([b64decode(r) for r in loads(path.read_text())][:-1])
+            if len(self.frames) == 0:
+                raise Exception(f"No output data found in: {output_data_directory}")
+        else:
+            frame: List[bytes] = list()
+            if num_objects > 0:
+                frame.append(FakeBuild.get_transforms(num_objects=num_objects))
+            if avatar_ids is not None:
+                if passes is None:
+                    passes = ["_img"]
+                for avatar_id in avatar_ids:
+                    frame.append(FakeBuild.get_images(avatar_id=avatar_id, width=image_size, height=image_size,
+                                                      passes=passes, png=png))
+            for i in range(num_collisions):
+                frame.append(FakeBuild.get_collision(collider_id=i, collidee_id=i + 1, num_contacts=num_contacts))
+            self.frames.append(frame)
+        """:field
+        The current frame number.
+        """
+        self.frame: int = 0
+        self._thread: Optional[Thread] = None
+
+    def start(self) -> None:
+        """
+        Start the fake build in a background thread. Call this before creating the controller.
+        """
+
+        self._thread = Thread(target=self.run, daemon=True)
+        self._thread.start()
+
+    def join(self) -> None:
+        """
+        Wait for the fake build's background thread to end. The fake build ends when it receives a `terminate` command.
+        """
+
+        if self._thread is not None:
+            self._thread.join()
+
+    def run(self) -> None:
+        """
+        Connect to the controller and respond to commands until the fake build receives a `terminate` command. This blocks the current thread; see `start()`.
+        """
+
+        context = zmq.Context()
+        # noinspection PyUnresolvedReferences
+        socket = context.socket(zmq.REQ)
+        socket.connect(f"tcp://localhost:{self._port}")
+        # The controller waits for this message before sending any commands.
+        socket.send(b"0")
+        version = FakeBuild.get_version(tdw_version=__version__, unity_version=self._unity_version)
+        done = False
+        while not done:
+            commands = loads(socket.recv_multipart()[0])
+            resp = self.frames[self.frame % len(self.frames)][:]
+            for command in commands:
+                command_type = command["$type"]
+                if command_type == "send_version":
+                    resp.append(version)
+                elif command_type == "terminate":
+                    done = True
+            self.frame += 1
+            resp.append(self.frame.to_bytes(4, byteorder="big"))
+            socket.send_multipart(resp)
+        socket.close()
+        context.term()
+
+    @staticmethod
+    def get_transforms(num_objects: int) -> bytes:
+        """
+        :param num_objects: The number of objects.
+
+        :return: Serialized `Transforms` output data with random positions, rotations, and forwards.
+        """
+
+        builder = Builder(0)
+        forwards = FakeBuild._create_vector(builder, np.random.random(num_objects * 3).astype(np.float32))
+        rotations = FakeBuild._create_vector(builder, np.random.random(num_objects * 4).astype(np.float32))
+        positions = FakeBuild._create_vector(builder, np.random.random(num_objects * 3).astype(np.float32))
+        ids = FakeBuild._create_vector(builder, np.arange(num_objects, dtype=np.int32))
+        Trans.TransformsStart(builder)
+        Trans.TransformsAddIds(builder, ids)
+        Trans.TransformsAddPositions(builder, positions)
+        Trans.TransformsAddRotations(builder, rotations)
+        Trans.TransformsAddForwards(builder, forwards)
+        return FakeBuild._finish(builder, Trans.TransformsEnd(builder), "tran")
+
+    @staticmethod
+    def get_images(avatar_id: str, width: int, height: int, passes: List[str], png: bool = False) -> bytes:
+        """
+        :param avatar_id: The ID of the avatar.
+        :param width: The width of each image.
+        :param height: The height of each image.
+        :param passes: The image passes, for example `["_img", "_id", "_depth"]`.
+        :param png: If True, the `_img` pass is encoded as a .png file. If False, the `_img` pass is encoded as a .jpg file.
+
+        :return: Serialized `Images` output data with random noise images.
+        """
+
+        builder = Builder(0)
+        image_passes = list()
+        for pass_mask in passes:
+            pixels = np.random.randint(0, 256, size=(height, width, 3), dtype=np.uint8)
+            # Depth passes are raw RGB arrays.
+            if pass_mask == "_depth" or pass_mask == "_depth_simple":
+                image = pixels.tobytes()
+                extension = 1
+            # The `_img` pass is a .jpg unless `png == True`. Every other pass is a .png.
+            else:
+                extension = 1 if png or pass_mask != "_img" else 0
+                with BytesIO() as output:
+                    Image.fromarray(pixels).save(output, format="PNG" if extension == 1 else "JPEG")
+                    image = output.getvalue()
+            image_vector = builder.CreateByteVector(image)
+            ImagePass.ImagePassStart(builder)
+            ImagePass.ImagePassAddPassMask(builder, FakeBuild.PASS_MASKS[pass_mask])
+            ImagePass.ImagePassAddImage(builder, image_vector)
+            ImagePass.ImagePassAddExtension(builder, extension)
+            image_passes.append(ImagePass.ImagePassEnd(builder))
+        Imags.ImagesStartPassesVector(builder, len(image_passes))
+        for image_pass in reversed(image_passes):
+            builder.PrependUOffsetTRelative(image_pass)
+        passes_vector = builder.EndVector(len(image_passes))
+        avatar_id_string = builder.CreateString(avatar_id)
+        sensor_name_string = builder.CreateString("SensorContainer")
+        Imags.ImagesStart(builder)
+        Imags.ImagesAddAvatarId(builder, avatar_id_string)
+        Imags.ImagesAddSensorName(builder, sensor_name_string)
+        Imags.ImagesAddWidth(builder, width)
+        Imags.ImagesAddHeight(builder, height)
+        Imags.ImagesAddPasses(builder, passes_vector)
+        return FakeBuild._finish(builder, Imags.ImagesEnd(builder), "imag")
+
+    @staticmethod
+    def get_collision(collider_id: int, collidee_id: int, num_contacts: int = 1, state: str = "enter") -> bytes:
+        """
+        :param collider_id: The ID of the collider object.
+        :param collidee_id: The ID of the collidee object.
+        :param num_contacts: The number of contact points.
+        :param state: The state of the collision: `"enter"`, `"stay"`, or `"exit"`.
+
+        :return: Serialized `Collision` output data with random contact points.
+        """
+
+        builder = Builder(0)
+        Col.CollisionStartContactsVector(builder, num_contacts)
+        for contact in np.random.random((num_contacts, 6)):
+            ContactPoint.CreateContactPoint(builder, *[float(v) for v in contact])
+        contacts = builder.EndVector(num_contacts)
+        Col.CollisionStart(builder)
+        Col.CollisionAddColliderId(builder, collider_id)
+        Col.CollisionAddCollideeId(builder, collidee_id)
+        Col.CollisionAddRelativeVelocity(builder, Vector3.CreateVector3(builder, 0, -1, 0))
+        Col.CollisionAddImpulse(builder, Vector3.CreateVector3(builder, 0, 1, 0))
+        Col.CollisionAddState(builder, {"enter": 1, "stay": 2, "exit": 3}[state])
+        Col.CollisionAddContacts(builder, contacts)
+        return FakeBuild._finish(builder, Col.CollisionEnd(builder), "coll")
+
+    @staticmethod
+    def get_version(tdw_version: str, unity_version: str, standalone: bool = True) -> bytes:
+        """
+        :param tdw_version: The TDW version.
+        :param unity_version: The Unity Engine version.
+        :param standalone: If True, this is a standalone build (as opposed to the Unity Editor).
+
+        :return: Serialized `Version` output data.
+        """
+
+        tdw_version_bytes = tdw_version.encode("utf-8")
+        return b"\x00\x00\x00\x00vers" + bytes([1 if standalone else 0, len(tdw_version_bytes)]) + \
+            tdw_version_bytes + unity_version.encode("utf-8")
+
+    @staticmethod
+    def _create_vector(builder: Builder, array: np.ndarray) -> int:
+        """
+        Write a numpy array as a vector of scalars. This is much faster than prepending each element.
+
+        :param builder: The flatbuffer builder.
+        :param array: A 1D numpy array.
+
+        :return: The offset of the vector.
+        """
+
+        data = array.tobytes()
+        builder.StartVector(array.itemsize, len(array), array.itemsize)
+        builder.head = builder.Head() - len(data)
+        builder.Bytes[builder.Head():builder.Head() + len(data)] = data
+        return builder.EndVector(len(array))
+
+    @staticmethod
+    def _finish(builder: Builder, root: int, identifier: str) -> bytes:
+        """
+        Finish a flatbuffer with a 4-character file identifier, which is how the build tags each type of output data.
+
+        :param builder: The flatbuffer builder.
+        :param root: The offset of the root table.
+        :param identifier: The 4-character output data identifier, for example `"tran"`.
+
+        :return: The serialized output data.
+        """
+
+        builder.Prep(builder.minalign, 2 * number_types.UOffsetTFlags.bytewidth)
+        for c in reversed(identifier.encode("utf-8")):
+            builder.Place(c, number_types.Uint8Flags)
+        builder.PrependUOffsetTRelative(root)
+        builder.finished = True
+        return bytes(builder.Output())
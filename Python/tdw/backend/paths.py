@@ -5,6 +5,7 @@ from tdw.backend.platforms import SYSTEM_TO_EXECUTABLE
 
 ASSET_BUNDLE_VERIFIER_OUTPUT_DIR = Path.home().joinpath("tdw_asset_bundle_verifier")
 EXAMPLE_CONTROLLER_OUTPUT_PATH = Path.home().joinpath("tdw_example_controller_output")
+LIBRARIAN_CACHE_DIR = Path.home().joinpath("tdw_librarian_cache")
 
 if system() == "Windows":
     PLAYER_LOG_PATH = Path.home().joinpath("AppData/LocalLow/MIT/TDW/Player.log")
@@ -1,14 +1,16 @@
 import zmq
 import json
 import os
+from time import perf_counter
 from subprocess import Popen
-from typing import List, Union, Tuple, Dict
+from typing import List, Union, Tuple, Dict, Optional, Callable
 from argparse import ArgumentParser
 from tdw.librarian import ModelLibrarian, SceneLibrarian, MaterialLibrarian, HDRISkyboxLibrarian, \
     HumanoidAnimationLibrarian, HumanoidLibrarian, HumanoidAnimationRecord, RobotLibrarian, VisualEffectLibrarian, \
     DroneLibrarian, VehicleLibrarian
 from tdw.backend.paths import EDITOR_LOG_PATH, PLAYER_LOG_PATH, BUILD_PATH
 from tdw.output_data import OutputData, Version, QuitSignal
+from tdw.response import Response
 from tdw.version import __version__
 from tdw.backend.update import Update
 from tdw.add_ons.add_on import AddOn
@@ -44,18 +46,16 @@ class Controller:
     DRONE_LIBRARIANS: Dict[str, DroneLibrarian] = dict()
     VEHICLE_LIBRARIANS: Dict[str, VehicleLibrarian] = dict()
 
-    def __init__(self, port: int = 1071, check_version: bool = True, launch_build: bool = True):
+    def __init__(self, port: int = 1071, check_version: bool = True, launch_build: bool = True, zero_copy: bool = False):
         """
         Create the network socket and bind the socket to the port.
 
         :param port: The port number.
         :param check_version: If true, the controller will check the version of the build and print the result.
         :param launch_build: If True, automatically launch the build. If one doesn't exist, download and extract the correct version. Set this to False to use your own build, or (if you are a backend developer) to use Unity Editor.
+        :param zero_copy: If True, receive output data without copying it. Each element of the response will be a `memoryview` of a ZMQ frame rather than `bytes`. This is faster for large output data such as `Images`. Output data objects and the numpy arrays that they return will be views of the ZMQ frames rather than copies; call `copy()` if you need to modify them or keep them.
         """
 
-        # A list of modules that will add commands on `communicate()`.
-        self.add_ons: List[AddOn] = list()
-
         # Check for updates. Download a new build if there is one.
         if check_version:
             can_launch_build = Update.check_for_update(download_build=launch_build)
@@ -68,19 +68,37 @@ class Controller:
         # Launch the build.
         if launch_build and can_launch_build:
             Controller.launch_build(port=port)
+        self._connect(port=port, zero_copy=zero_copy)
+        # Compare the version of the tdw module to the build version.
+        if check_version and launch_build:
+            self._check_build_version()
+
+    def _connect(self, port: int, zero_copy: bool, timeout: int = -1) -> None:
+        """
+        Create the network socket, bind the socket to the port, wait for the build to connect, and send the initial commands.
+
+        :param port: The port number.
+        :param zero_copy: If True, receive output data without copying it.
+        :param timeout: If the build doesn't respond within this many milliseconds, raise `zmq.Again`. If -1, wait forever.
+        """
+
+        # A list of modules that will add commands on `communicate()`.
+        self.add_ons: List[AddOn] = list()
+        """:field
+        Functions that are called after each step of `communicate(commands)`, for example [`Profiler.on_step`](add_ons/profiler.md). Each function has four parameters: The name of the step, the `perf_counter()` time at the start of the step, the `perf_counter()` time at the end of the step, and the add-on that was called during the step or None. If this list is empty, `communicate(commands)` doesn't time its steps.
+        """
+        self.timing_hooks: List[Callable[[str, float, float, Optional[AddOn]], None]] = list()
+        # If True, receive output data without copying it.
+        self._zero_copy: bool = zero_copy
         context = zmq.Context()
         # noinspection PyUnresolvedReferences
         self.socket = context.socket(zmq.REP)
+        self.socket.setsockopt(zmq.RCVTIMEO, timeout)
         self.socket.bind('tcp://*:' + str(port))
 
         self.socket.recv()
 
-        # Set error handling to default values (the build will try to quit on errors and exceptions).
-        # Request the version to log it and remember here if the Editor is being used.
-        resp = self.communicate([{"$type": "set_error_handling"},
-                                 {"$type": "send_version"},
-                                 {"$type": "load_scene",
-                                  "scene_name": "ProcGenScene"}])
+        resp = self._handshake()
         self._is_standalone: bool = False
         self._tdw_version: str = ""
         self._unity_version: str = ""
@@ -91,19 +109,48 @@ class Controller:
                 self._unity_version = v.get_unity_version()
                 self._is_standalone = v.get_standalone()
                 break
-        # Compare the version of the tdw module to the build version.
-        if check_version and launch_build:
-            self._check_build_version()
 
-    def communicate(self, commands: Union[dict, List[dict]]) -> list:
+    def _handshake(self) -> Response:
+        """
+        Send the initial commands to the build and receive output data in response. Unlike `communicate(commands)`, this doesn't call any add-ons, and it is always synchronous, even in subclasses in which `communicate(commands)` is a coroutine.
+
+        :return The output data from the build.
+        """
+
+        # Set error handling to default values (the build will try to quit on errors and exceptions).
+        # Request the version to log it and remember here if the Editor is being used.
+        msg = [json.dumps([{"$type": "set_error_handling"},
+                           {"$type": "send_version"},
+                           {"$type": "load_scene",
+                            "scene_name": "ProcGenScene"}]).encode('utf-8')]
+        self.socket.send_multipart(msg)
+        resp = self._receive()
+        # Re-send the commands if the build failed to receive them. See: `communicate(commands)`.
+        ftre: bool = Controller._is_ftre(resp)
+        num_ftre: int = 0
+        while ftre and num_ftre < 1000:
+            self.socket.send_multipart(msg)
+            resp = self._receive()
+            num_ftre += 1
+            ftre = Controller._is_ftre(resp)
+        return self._get_response(resp=resp, ftre=ftre)
+
+    def communicate(self, commands: Union[dict, List[dict]]) -> Response:
         """
         Send commands and receive output data in response.
 
+        If there are any `timing_hooks`, they are called after each step: `collect_commands`, `before_send` (once per add-on), `json.dumps`, `send`, `wait`, `receive`, `index_response`, `on_send` (once per add-on), and finally `communicate` for the entire call.
+
         :param commands: A list of JSON commands.
 
-        :return The output data from the build.
+        :return The output data from the build as a [`Response`](response.md), which is a list of byte arrays indexed by output data type.
         """
 
+        t0 = perf_counter()
+        t = t0
+        # If there are timing hooks, time each step.
+        timed: bool = len(self.timing_hooks) > 0
+
         if isinstance(commands, dict):
             commands = [commands]
 
@@ -111,29 +158,34 @@ class Controller:
         for m in self.add_ons:
             # Initialize an add-on.
             if not m.initialized:
-                # Insert initialization commands at the start of the list (this is rarely used).
-                early_initialization_commands = m.get_early_initialization_commands()
-                early_initialization_commands.reverse()
-                for early_command in early_initialization_commands:
-                    commands.insert(0, early_command)
-                # Append initialization commands to the end of the list.
-                commands.extend(m.get_initialization_commands())
-                # Mark the add-on as initialized.
-                m.initialized = True
+                Controller._initialize_add_on(add_on=m, commands=commands)
             # Append the add-on's commands.
             else:
                 commands.extend(m.commands)
                 m.commands.clear()
+        if timed:
+            t = self._time_step(step="collect_commands", t0=t)
         # Possibly do something with the commands about to be sent.
         for m in self.add_ons:
             m.before_send(commands)
+            if timed:
+                t = self._time_step(step="before_send", t0=t, add_on=m)
 
         # Serialize the message.
         msg = [json.dumps(commands).encode('utf-8')]
+        if timed:
+            t = self._time_step(step="json.dumps", t0=t)
         # Send the commands.
         self.socket.send_multipart(msg)
+        if timed:
+            t = self._time_step(step="send", t0=t)
+            # Wait for the build.
+            self.socket.poll(timeout=self.socket.getsockopt(zmq.RCVTIMEO))
+            t = self._time_step(step="wait", t0=t)
         # Receive output data.
-        resp = self.socket.recv_multipart()
+        resp = self._receive()
+        if timed:
+            t = self._time_step(step="receive", t0=t)
 
         # Occasionally, the build's socket will stop receiving messages.
         # If that happens, it will close the socket, create a new socket, and send a dummy output data object.
@@ -141,34 +193,25 @@ class Controller:
         # If the controller receives the dummy object, it should re-send its commands.
         # The dummy object is always in an array: [ftre, 0]
         # This way, the controller can easily differentiate it from a response that just has the frame count.
-        ftre: bool = True
+        ftre: bool = Controller._is_ftre(resp)
         num_ftre: int = 0
         while ftre and num_ftre < 1000:
-            ftre = False
-            for i in range(len(resp) - 1):
-                if resp[i][4:8] == b'ftre':
-                    ftre = True
-                    self.socket.send_multipart(msg)
-                    resp = self.socket.recv_multipart()
-                    num_ftre += 1
-                    break
-        # Tried too many times.
-        if ftre:
-            print("Quitting now because the controller tried too many times to resend commands to the build. "
-                  "Check the build log for more info.")
-            self._print_build_log()
-
-        # Check if we've received a quit signal. If we have, check if there was an error.
-        for i in range(len(resp) - 1):
-            if resp[i][4:8] == b'quit':
-                if not QuitSignal(resp[i]).get_ok():
-                    print("The build quit due to an error. Check the build log for more info.")
-                    self._print_build_log()
-                break
+            self.socket.send_multipart(msg)
+            resp = self._receive()
+            num_ftre += 1
+            ftre = Controller._is_ftre(resp)
+        # Index the output data and check for errors.
+        resp = self._get_response(resp=resp, ftre=ftre)
+        if timed:
+            t = self._time_step(step="index_response", t0=t)
 
         # Get commands per module for the next frame.
         for m in self.add_ons:
             m.on_send(resp=resp)
+            if timed:
+                t = self._time_step(step="on_send", t0=t, add_on=m)
+        if timed:
+            self._time_step(step="communicate", t0=t0)
 
         # Return the output data from the build.
         return resp
@@ -561,11 +604,13 @@ class Controller:
         return int.from_bytes(frame, byteorder='big')
 
     @staticmethod
-    def launch_build(port: int = 1071) -> None:
+    def launch_build(port: int = 1071) -> Popen:
         """
         Launch the build. If a build doesn't exist at the expected location, download one to that location.
 
         :param port: The socket port.
+
+        :return: The build process.
         """
 
         parser = ArgumentParser(allow_abbrev=False)
@@ -577,7 +622,7 @@ class Controller:
             build_call.append("-flip_images")
         if args.force_glcore42:
             build_call.append("-force-glcore42")
-        Popen(build_call)
+        return Popen(build_call)
 
     def _check_build_version(self, version: str = __version__, build_version: str = None) -> None:
         """
@@ -594,6 +639,42 @@ class Controller:
         print(f"Build version {self._tdw_version}\nUnity Engine {self._unity_version}\n"
               f"Python tdw module version {version}")
 
+    def _receive(self) -> list:
+        """
+        Receive output data from the build.
+
+        :return: The response from the build. If `zero_copy == True` in the constructor, each element is a memoryview of a ZMQ frame.
+        """
+
+        if self._zero_copy:
+            return [frame.buffer for frame in self.socket.recv_multipart(copy=False)]
+        else:
+            return self.socket.recv_multipart()
+
+    def _get_response(self, resp: list, ftre: bool) -> Response:
+        """
+        :param resp: The raw response from the build.
+        :param ftre: If True, the controller tried too many times to resend commands to the build.
+
+        :return: The indexed response. Each add-on will share the same deserialized output data.
+        """
+
+        # Tried too many times.
+        if ftre:
+            print("Quitting now because the controller tried too many times to resend commands to the build. "
+                  "Check the build log for more info.")
+            self._print_build_log()
+
+        # Index the output data. Each add-on will share the same deserialized output data.
+        resp = Response(resp)
+
+        # Check if we've received a quit signal. If we have, check if there was an error.
+        quit_signal: QuitSignal = resp.get_first("quit")
+        if quit_signal is not None and not quit_signal.get_ok():
+            print("The build quit due to an error. Check the build log for more info.")
+            self._print_build_log()
+        return resp
+
     def _print_build_log(self) -> None:
         """
         Print a message indicating where the build log is located.
@@ -608,6 +689,54 @@ class Controller:
         print(f"If the build is on a remote Linux server, the log path is probably"
               f" ~/.config/unity3d/MIT/TDW/Player.log (where ~ is your home directory)")
 
+    @staticmethod
+    def _initialize_add_on(add_on: AddOn, commands: List[dict]) -> None:
+        """
+        Add an add-on's initialization commands to a list of commands and mark the add-on as initialized.
+
+        :param add_on: The add-on.
+        :param commands: The commands that are about to be sent to the build.
+        """
+
+        # Insert initialization commands at the start of the list (this is rarely used).
+        early_initialization_commands = add_on.get_early_initialization_commands()
+        early_initialization_commands.reverse()
+        for early_command in early_initialization_commands:
+            commands.insert(0, early_command)
+        # Append initialization commands to the end of the list.
+        commands.extend(add_on.get_initialization_commands())
+        # Mark the add-on as initialized.
+        add_on.initialized = True
+
+    def _time_step(self, step: str, t0: float, add_on: Optional[AddOn] = None) -> float:
+        """
+        Call each timing hook after a step of `communicate(commands)`.
+
+        :param step: The name of the step.
+        :param t0: The `perf_counter()` time at the start of the step.
+        :param add_on: If not None, this step was a call to this add-on.
+
+        :return: The `perf_counter()` time after calling the timing hooks. Use this as the start time of the next step so that the hooks' overhead isn't included.
+        """
+
+        t1 = perf_counter()
+        for hook in self.timing_hooks:
+            hook(step, t0, t1, add_on)
+        return perf_counter()
+
+    @staticmethod
+    def _is_ftre(resp: list) -> bool:
+        """
+        :param resp: The raw response from the build.
+
+        :return: True if the response includes a dummy FailedToReceive (`ftre`) object, meaning that the controller should re-send its commands.
+        """
+
+        for i in range(len(resp) - 1):
+            if resp[i][4:8] == b'ftre':
+                return True
+        return False
+
     @staticmethod
     def _get_container_shape_command(command_name: str, object_id: int, position: Dict[str, float],
                                      tag: ContainerTag) -> dict:
@@ -0,0 +1,258 @@
+from subprocess import Popen
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Union, Callable, Optional
+import zmq
+from tdw.controller import Controller
+from tdw.response import Response
+from tdw.remote_build_launcher import RemoteBuildLauncher
+from tdw.backend.update import Update
+from tdw.add_ons.add_on import AddOn
+
+
+class _PooledController(Controller):
+    """
+    A controller in a `ControllerPool`. The pool checks for updates and launches the builds, so this controller only connects to its build.
+    """
+
+    def __init__(self, port: int, zero_copy: bool, timeout: int):
+        """
+        :param port: The port number.
+        :param zero_copy: If True, receive output data without copying it.
+        :param timeout: If the build doesn't respond within this many milliseconds, raise `zmq.Again`. If -1, wait forever.
+        """
+
+        try:
+            self._connect(port=port, zero_copy=zero_copy, timeout=timeout)
+        except zmq.Again:
+            self.socket.close(linger=0)
+            self.socket.context.term()
+            raise
+
+
+class ControllerPool:
+    """
+    A pool of controllers, each connected to its own build. Every build is stepped concurrently with a single call to `communicate(commands)`.
+
+    ```python
+    from tdw.controller_pool import ControllerPool
+    from tdw.add_ons.object_manager import ObjectManager
+
+    pool = ControllerPool(num_controllers=4,
+                          add_ons=lambda index: [ObjectManager()],
+                          initialization_commands=lambda index: [{"$type": "load_scene", "scene_name": "ProcGenScene"},
+                                                                 {"$type": "create_empty_environment"}])
+    for i in range(100):
+        resps = pool.communicate([[] for _ in range(pool.num_controllers)])
+        for index in range(pool.num_controllers):
+            if pool.restarted[index]:
+                print(f"Build {index} crashed and was restarted.")
+    pool.close()
+    ```
+
+    If a build crashes, the pool can automatically launch a new build, create a new controller, and re-send the initialization commands. A build has crashed if:
+
+    - The build sent a `QuitSignal` but the commands didn't include `terminate`.
+    - The controller tried too many times to resend commands to the build (see: `ftre` in `Controller.communicate(commands)`).
+    - The build didn't respond within `timeout` milliseconds.
+
+    If a new build doesn't connect within `timeout` milliseconds, `communicate(commands)` raises `zmq.Again`.
+
+    Each controller's socket is stepped in its own thread. Sending and receiving data doesn't hold the Python global interpreter lock, so the builds simulate in parallel.
+    """
+
+    def __init__(self, num_controllers: int, ports: List[int] = None, check_version: bool = True,
+                 launch_build: bool = True, zero_copy: bool = False,
+                 add_ons: Callable[[int], List[AddOn]] = None,
+                 initialization_commands: Callable[[int], List[dict]] = None, restart: bool = True,
+                 timeout: int = -1):
+        """
+        Launch the builds (or attach to existing builds) and create the controllers.
+
+        :param num_controllers: The number of controllers and builds.
+        :param ports: The socket port of each build. If None, each build is launched on a free port. If `launch_build == False`, this must be set. This list isn't modified.
+        :param check_version: If True, check for a build update once and then check the version of the first build.
+        :param launch_build: If True, automatically launch each build. Set this to False to attach to your own builds.
+        :param zero_copy: If True, receive output data without copying it. See: `Controller`.
+        :param add_ons: A function that returns a new list of add-ons for the build at this index. This is called whenever a build is launched or restarted. If None, the controllers don't have add-ons.
+        :param initialization_commands: A function that returns a list of commands for the build at this index. These commands are sent whenever a build is launched or restarted. If None, no commands are sent.
+        :param restart: If True, automatically restart a build if it crashes. This can only be True if `launch_build == True`.
+        :param timeout: If a build doesn't respond within this many milliseconds, it has crashed. This includes the initial connection to the build. If -1, wait forever.
+        """
+
+        if ports is None:
+            if not launch_build:
+                raise Exception("Set the ports of the builds or set launch_build to True.")
+            ports = [RemoteBuildLauncher.find_free_port() for _ in range(num_controllers)]
+        elif len(ports) != num_controllers:
+            raise Exception(f"Expected {num_controllers} ports but got {len(ports)}.")
+        else:
+            # Copy the list because restarted builds get new ports.
+            ports = ports[:]
+        """:field
+        The number of controllers and builds.
+        """
+        self.num_controllers: int = num_controllers
+        """:field
+        The socket port of each build. If a build is restarted, it will be on a new port.
+        """
+        self.ports: List[int] = ports
+        """:field
+        The controllers. If a build was killed and not restarted, its controller is None.
+        """
+        self.controllers: List[Optional[Controller]] = [None for _ in range(num_controllers)]
+        """:field
+        If True, the build at this index crashed and was restarted during the most recent `communicate(commands)` call.
+        """
+        self.restarted: List[bool] = [False for _ in range(num_controllers)]
+        """:field
+        The total number of times that each build has been restarted.
+        """
+        self.num_restarts: List[int] = [0 for _ in range(num_controllers)]
+        self._launch_build: bool = launch_build
+        self._zero_copy: bool = zero_copy
+        self._add_ons: Optional[Callable[[int], List[AddOn]]] = add_ons
+        self._initialization_commands: Optional[Callable[[int], List[dict]]] = initialization_commands
+        self._timeout: int = timeout
+        # If True, the build at this index has been sent a terminate command.
+        self._terminated: List[bool] = [False for _ in range(num_controllers)]
+        # The build processes. This is None if the pool didn't launch the build.
+        self._processes: List[Optional[Popen]] = [None for _ in range(num_controllers)]
+        # Download a new build only once rather than once per controller.
+        if check_version and launch_build:
+            self._launch_build = Update.check_for_update(download_build=True)
+            if not self._launch_build:
+                print("You need to launch your own builds.")
+        # Builds can only be restarted if the pool launches them.
+        self._restart: bool = restart and self._launch_build
+        # Step each controller in its own thread.
+        self._executor: ThreadPoolExecutor = ThreadPoolExecutor(max_workers=num_controllers)
+        list(self._executor.map(self._start, range(num_controllers)))
+        # Compare the version of the tdw module to the build version.
+        if check_version and launch_build:
+            self.controllers[0]._check_build_version()
+
+    def communicate(self, commands: List[Union[dict, List[dict]]]) -> List[Response]:
+        """
+        Send commands to each build and receive output data in response. The builds are stepped concurrently.
+
+        If a build crashed and `restart == True`, the response for that build is the response to the initialization commands of the new build, and `self.restarted[index]` is True.
+
+        :param commands: A list of lists of commands, one per controller. The commands are sent to the controller at the same index.
+
+        :return: A list of responses, one per controller.
+        """
+
+        if len(commands) != self.num_controllers:
+            raise Exception(f"Expected {self.num_controllers} lists of commands but got {len(commands)}.")
+        return list(self._executor.map(self._communicate, range(self.num_controllers), commands))
+
+    def close(self) -> None:
+        """
+        Terminate each build and stop the thread pool.
+        """
+
+        list(self._executor.map(self._terminate, range(self.num_controllers)))
+        self._executor.shutdown()
+
+    def _start(self, index: int) -> Response:
+        """
+        Launch a build if needed, create its controller, add the add-ons, and send the initialization commands.
+
+        :param index: The index of the controller.
+
+        :return: The response to the initialization commands.
+        """
+
+        if self._launch_build:
+            self._processes[index] = Controller.launch_build(port=self.ports[index])
+        try:
+            controller = _PooledController(port=self.ports[index], zero_copy=self._zero_copy, timeout=self._timeout)
+        except zmq.Again:
+            print(f"Build {index} on port {self.ports[index]} didn't connect.")
+            self._kill_process(index)
+            raise
+        if self._add_ons is not None:
+            controller.add_ons.extend(self._add_ons(index))
+        self.controllers[index] = controller
+        self._terminated[index] = False
+        if self._initialization_commands is None:
+            commands = []
+        else:
+            commands = self._initialization_commands(index)
+        return controller.communicate(commands)
+
+    def _communicate(self, index: int, commands: Union[dict, List[dict]]) -> Response:
+        """
+        Send commands to a build. Restart the build if it crashed.
+
+        :param index: The index of the controller.
+        :param commands: The commands.
+
+        :return: The response from the build.
+        """
+
+        if isinstance(commands, dict):
+            commands = [commands]
+        # Check this before the add-ons append their commands.
+        terminate = any(command["$type"] == "terminate" for command in commands)
+        self.restarted[index] = False
+        try:
+            resp = self.controllers[index].communicate(commands)
+            crashed = Controller._is_ftre(resp) or (resp.has("quit") and not terminate)
+        except zmq.Again:
+            print(f"Build {index} on port {self.ports[index]} didn't respond.")
+            if not self._restart:
+                raise
+            resp = None
+            crashed = True
+        if not crashed or not self._restart:
+            self._terminated[index] = terminate
+            return resp
+        # Kill the old build, launch a new build on a new port, and re-initialize it.
+        self._kill(index)
+        self.ports[index] = RemoteBuildLauncher.find_free_port()
+        self.restarted[index] = True
+        self.num_restarts[index] += 1
+        print(f"Restarting build {index} on port {self.ports[index]}.")
+        return self._start(index)
+
+    def _terminate(self, index: int) -> None:
+        """
+        Terminate a build.
+
+        :param index: The index of the controller.
+        """
+
+        if not self._terminated[index] and self.controllers[index] is not None:
+            try:
+                self.controllers[index].communicate({"$type": "terminate"})
+            except zmq.Again:
+                pass
+            self._terminated[index] = True
+        self._kill(index)
+
+    def _kill(self, index: int) -> None:
+        """
+        Close a controller's socket and kill its build process if it is still running.
+
+        :param index: The index of the controller.
+        """
+
+        if self.controllers[index] is not None:
+            socket = self.controllers[index].socket
+            socket.close(linger=0)
+            socket.context.term()
+            self.controllers[index] = None
+        self._kill_process(index)
+
+    def _kill_process(self, index: int) -> None:
+        """
+        Kill a build process if it is still running.
+
+        :param index: The index of the controller.
+        """
+
+        process = self._processes[index]
+        if process is not None and process.poll() is None:
+            process.kill()
+        self._processes[index] = None
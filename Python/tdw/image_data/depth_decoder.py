@@ -0,0 +1,116 @@
+from typing import Dict, Tuple, Optional
+import numpy as np
+from tdw.output_data import Images
+
+
+class DepthDecoder:
+    """
+    Decode `_depth` and `_depth_simple` passes to depth values. This returns the same values as `TDWUtils.get_depth_values()`, but is faster:
+
+    - The per-channel constants are calculated once per near and far clipping plane rather than per image.
+    - The image is decoded directly into float32 values rather than via float64 arrays, and can be decoded into an existing array.
+    - The image is flipped via a view rather than a copy.
+
+    ```python
+    from tdw.controller import Controller
+    from tdw.add_ons.third_person_camera import ThirdPersonCamera
+    from tdw.add_ons.image_capture import ImageCapture
+    from tdw.image_data.depth_decoder import DepthDecoder
+
+    c = Controller()
+    camera = ThirdPersonCamera(position={"x": 0, "y": 1.5, "z": -2}, avatar_id="a")
+    capture = ImageCapture(path="images", avatar_ids=["a"], pass_masks=["_depth"])
+    c.add_ons.extend([camera, capture])
+    c.communicate({"$type": "create_empty_environment"})
+    decoder = DepthDecoder()
+    depth = None
+    for i in range(100):
+        c.communicate([])
+        # Decode into the same array every frame.
+        depth = decoder.decode(images=capture.images["a"], index=0, out=depth)
+    c.communicate({"$type": "terminate"})
+    ```
+
+    A `DepthDecoder` reuses internal buffers and shouldn't be used by more than one thread at a time.
+    """
+
+    def __init__(self, near_plane: float = 0.1, far_plane: float = 100):
+        """
+        :param near_plane: The near clipping plane. See command `set_camera_clipping_planes`. The default value is the default value of the near clipping plane.
+        :param far_plane: The far clipping plane. See command `set_camera_clipping_planes`. The default value is the default value of the far clipping plane.
+        """
+
+        """:field
+        The near clipping plane.
+        """
+        self.near_plane: float = near_plane
+        """:field
+        The far clipping plane.
+        """
+        self.far_plane: float = far_plane
+        # The per-channel constants. Key = Tuple: The pass, the near clipping plane, the far clipping plane.
+        self._constants: Dict[Tuple[str, float, float], np.ndarray] = dict()
+        # Temporary arrays per image size. Key = Tuple: The height, the width.
+        self._buffers: Dict[Tuple[int, int], np.ndarray] = dict()
+
+    def decode(self, images: Images, index: int, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        :param images: The `Images` output data.
+        :param index: The index in `images` of the `_depth` or `_depth_simple` pass.
+        :param out: If not None, decode the depth values into this `(height, width)` float32 array.
+
+        :return: The depth values in meters as a `(height, width)` float32 array.
+        """
+
+        return self.decode_array(image=images.get_image(index),
+                                 depth_pass=images.get_pass_mask(index),
+                                 width=images.get_width(),
+                                 height=images.get_height(),
+                                 out=out)
+
+    def decode_array(self, image: np.ndarray, depth_pass: str = "_depth", width: int = 256, height: int = 256,
+                     out: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        :param image: The image pass as a numpy array. See: `Images.get_image(index)`.
+        :param depth_pass: The type of depth pass. Options: `"_depth"`, `"_depth_simple"`.
+        :param width: The width of the screen in pixels. See output data `Images.get_width()`.
+        :param height: The height of the screen in pixels. See output data `Images.get_height()`.
+        :param out: If not None, decode the depth values into this `(height, width)` float32 array.
+
+        :return: The depth values in meters as a `(height, width)` float32 array.
+        """
+
+        constants = self._get_constants(depth_pass=depth_pass)
+        # Flip the image vertically. This is a view, not a copy.
+        image = np.reshape(image, (height, width, 3))[::-1]
+        if out is None:
+            out = np.empty((height, width), dtype=np.float32)
+        np.multiply(image[:, :, 0], constants[0], out=out, dtype=np.float32)
+        if depth_pass == "_depth":
+            key = (height, width)
+            if key not in self._buffers:
+                self._buffers[key] = np.empty((height, width), dtype=np.float32)
+            buffer = self._buffers[key]
+            for channel in [1, 2]:
+                np.multiply(image[:, :, channel], constants[channel], out=buffer, dtype=np.float32)
+                np.add(out, buffer, out=out)
+        return out
+
+    def _get_constants(self, depth_pass: str) -> np.ndarray:
+        """
+        :param depth_pass: The type of depth pass. Options: `"_depth"`, `"_depth_simple"`.
+
+        :return: The value of each color channel in meters.
+        """
+
+        key = (depth_pass, self.near_plane, self.far_plane)
+        if key not in self._constants:
+            # This is equivalent to `TDWUtils.get_depth_values()`.
+            scale = (self.far_plane - self.near_plane) / 256.0
+            if depth_pass == "_depth":
+                self._constants[key] = np.array([scale, scale / 256.0, scale / (256.0 ** 2)], dtype=np.float32)
+            elif depth_pass == "_depth_simple":
+                self._constants[key] = np.array([scale / 256.0, 0, 0], dtype=np.float32)
+            else:
+                raise Exception(f"Invalid depth pass: {depth_pass}")
+        return self._constants[key]
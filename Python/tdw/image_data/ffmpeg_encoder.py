@@ -0,0 +1,47 @@
+from subprocess import Popen, PIPE, DEVNULL
+from typing import List
+from tdw.image_data.video_encoder import VideoEncoder
+from tdw.type_aliases import PATH
+
+
+class FfmpegEncoder(VideoEncoder):
+    """
+    Pipe images to an [ffmpeg](https://ffmpeg.org/) subprocess, which encodes them as a video. The images aren't decoded in Python; the jpg or png file data is written directly to ffmpeg's stdin.
+
+    ffmpeg must be installed and in the system path.
+
+    ```python
+    from tdw.image_data.ffmpeg_encoder import FfmpegEncoder
+
+    encoder = FfmpegEncoder(path="video.mp4", framerate=30)
+    for image in images:
+        encoder.write(image)
+    encoder.close()
+    ```
+    """
+
+    def __init__(self, path: PATH, framerate: int = 30, ffmpeg: str = "ffmpeg", output_args: List[str] = None):
+        """
+        :param path: The path to the video file. The container format is derived from the file extension.
+        :param framerate: The framerate of the video.
+        :param ffmpeg: The path to the ffmpeg executable.
+        :param output_args: ffmpeg output arguments. If None, the video is encoded as H.264 with `["-c:v", "libx264", "-pix_fmt", "yuv420p", "-vf", "pad=ceil(iw/2)*2:ceil(ih/2)*2"]`.
+        """
+
+        super().__init__(path=path, framerate=framerate)
+        if output_args is None:
+            # yuv420p requires an even width and height.
+            output_args = ["-c:v", "libx264", "-pix_fmt", "yuv420p", "-vf", "pad=ceil(iw/2)*2:ceil(ih/2)*2"]
+        self._process: Popen = Popen([ffmpeg, "-y", "-loglevel", "error",
+                                      "-f", "image2pipe", "-framerate", str(framerate), "-i", "-"] +
+                                     output_args + [str(self.path.resolve())],
+                                     stdin=PIPE, stdout=DEVNULL)
+
+    def write(self, image: bytes) -> None:
+        self._process.stdin.write(image)
+
+    def close(self) -> None:
+        self._process.stdin.close()
+        return_code = self._process.wait()
+        if return_code != 0:
+            raise Exception(f"ffmpeg exited with code {return_code} while writing {self.path.resolve()}")
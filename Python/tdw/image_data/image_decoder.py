@@ -0,0 +1,128 @@
+import io
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+import numpy as np
+from PIL import Image
+from tdw.output_data import Images
+from tdw.tdw_utils import TDWUtils
+
+
+class ImageDecoder:
+    """
+    Decode the image passes of multiple avatars into a single numpy array. Images are decoded in parallel in worker threads (PIL doesn't hold the Python global interpreter lock while it decodes images).
+
+    The array can be allocated once and reused every frame. PIL always decodes an image into its own buffer, so each decoded image is then copied into its slice of the array.
+
+    ```python
+    from tdw.controller import Controller
+    from tdw.add_ons.third_person_camera import ThirdPersonCamera
+    from tdw.add_ons.image_capture import ImageCapture
+    from tdw.image_data.image_decoder import ImageDecoder
+
+    c = Controller()
+    cameras = [ThirdPersonCamera(position={"x": 0, "y": 1.5, "z": -2}, avatar_id="a"),
+               ThirdPersonCamera(position={"x": 2, "y": 1.5, "z": 0}, avatar_id="b")]
+    capture = ImageCapture(path="images", avatar_ids=["a", "b"], pass_masks=["_img", "_id"])
+    # Don't save images to disk.
+    capture.set(avatar_ids=["a", "b"], pass_masks=["_img", "_id"], save=False)
+    c.add_ons.extend(cameras)
+    c.add_ons.append(capture)
+    c.communicate({"$type": "create_empty_environment"})
+    decoder = ImageDecoder(num_workers=4)
+    images = [capture.images["a"], capture.images["b"]]
+    # Allocate the array once. Shape: (2, 2, 256, 256, 3)
+    observations = decoder.get_array(images=images)
+    for i in range(100):
+        c.communicate([])
+        images = [capture.images["a"], capture.images["b"]]
+        decoder.decode(images=images, array=observations)
+    decoder.close()
+    c.communicate({"$type": "terminate"})
+    ```
+
+    The `_depth` and `_depth_simple` passes are reshaped in the same way as `TDWUtils.get_shaped_depth_pass(images, index)`. To convert them to depth values, see `TDWUtils.get_depth_values()`.
+    """
+
+    def __init__(self, num_workers: int = 4):
+        """
+        :param num_workers: The number of worker threads.
+        """
+
+        self._executor: ThreadPoolExecutor = ThreadPoolExecutor(max_workers=num_workers)
+
+    @staticmethod
+    def get_array(images: List[Images], pass_masks: List[str] = None) -> np.ndarray:
+        """
+        :param images: The `Images` output data, one per avatar. Each avatar must capture images of the same size.
+        :param pass_masks: The pass masks, for example `["_img", "_id"]`. If None, use every pass of the first avatar's images.
+
+        :return: A new uint8 numpy array of zeros with shape `(avatars, passes, height, width, 3)`.
+        """
+
+        if pass_masks is None:
+            pass_masks = [images[0].get_pass_mask(i) for i in range(images[0].get_num_passes())]
+        return np.zeros((len(images), len(pass_masks), images[0].get_height(), images[0].get_width(), 3),
+                        dtype=np.uint8)
+
+    def decode(self, images: List[Images], array: Optional[np.ndarray] = None,
+               pass_masks: List[str] = None) -> np.ndarray:
+        """
+        Decode each image pass of each avatar and copy the pixels into the array.
+
+        :param images: The `Images` output data, one per avatar. Each avatar must capture images of the same size.
+        :param array: A uint8 numpy array with shape `(avatars, passes, height, width, 3)`. The images are decoded into this array. If None, a new array is created. See: `get_array(images, pass_masks)`.
+        :param pass_masks: The pass masks, for example `["_img", "_id"]`. If None, use every pass of the first avatar's images.
+
+        :return: The array of decoded images with shape `(avatars, passes, height, width, 3)`.
+        """
+
+        if pass_masks is None:
+            pass_masks = [images[0].get_pass_mask(i) for i in range(images[0].get_num_passes())]
+        if array is None:
+            array = ImageDecoder.get_array(images=images, pass_masks=pass_masks)
+        elif array.shape[:2] != (len(images), len(pass_masks)):
+            raise Exception(f"Expected an array with shape ({len(images)}, {len(pass_masks)}, height, width, 3) but "
+                            f"got: {array.shape}")
+        # Get the index of each pass for each avatar.
+        tasks = list()
+        for i in range(len(images)):
+            if images[i].get_height() != array.shape[2] or images[i].get_width() != array.shape[3]:
+                raise Exception(f"Expected images with size {array.shape[3]}x{array.shape[2]} but avatar "
+                                f"{images[i].get_avatar_id()} has images with size "
+                                f"{images[i].get_width()}x{images[i].get_height()}")
+            indices = {images[i].get_pass_mask(j): j for j in range(images[i].get_num_passes())}
+            for j in range(len(pass_masks)):
+                if pass_masks[j] not in indices:
+                    raise Exception(f"Avatar {images[i].get_avatar_id()} doesn't have pass {pass_masks[j]}")
+                tasks.append((images[i], indices[pass_masks[j]], array[i, j]))
+        # Decode in parallel. Exceptions are raised here.
+        for _ in self._executor.map(ImageDecoder._decode, *zip(*tasks)):
+            pass
+        return array
+
+    def close(self) -> None:
+        """
+        Stop the worker threads.
+        """
+
+        self._executor.shutdown()
+
+    @staticmethod
+    def _decode(images: Images, index: int, array: np.ndarray) -> None:
+        """
+        Decode an image pass. This is called in a worker thread.
+
+        :param images: The `Images` output data.
+        :param index: The index of the pass.
+        :param array: The `(height, width, 3)` array that the decoded image will be copied into.
+        """
+
+        pass_mask = images.get_pass_mask(index)
+        if pass_mask == "_depth" or pass_mask == "_depth_simple":
+            array[:] = TDWUtils.get_shaped_depth_pass(images=images, index=index)
+        else:
+            image = Image.open(io.BytesIO(images.get_image(index)))
+            if image.mode != "RGB":
+                image = image.convert("RGB")
+            # PIL can't decode an RGB image into an external buffer, so the decoded image is copied.
+            array[:] = np.asarray(image)
@@ -0,0 +1,168 @@
+import io
+import os
+import json
+import mmap
+import tarfile
+from threading import Lock
+from pathlib import Path
+from typing import Dict, List, Tuple, Union
+from PIL import Image
+from tdw.type_aliases import PATH
+
+
+class ImageShardReader:
+    """
+    Read images saved by [`ImageShardWriter`](image_shard_writer.md) or by [`ImageCapture`](../add_ons/image_capture.md) with `shard_size` greater than 0.
+
+    Frames can be read in any order. Each shard is memory-mapped, and each file is read using the shard's index, which means that reading a frame doesn't require scanning the shard. If a shard doesn't have an index (for example, because the simulation crashed before the shard was closed), the shard is scanned once. If a shard is still being written, it is memory-mapped again whenever a file is beyond the end of the current mapping.
+
+    ```python
+    from tdw.image_data.image_shard_reader import ImageShardReader
+
+    reader = ImageShardReader(path="D:/image_shards")
+    print(len(reader))
+    # Get every file in frame 42.
+    files = reader.get_frame(reader.keys[42])
+    # Get the _img pass of avatar "a" on frame 42.
+    image = reader.get_pil_image(key=reader.keys[42], avatar_id="a", pass_mask="_img")
+    reader.close()
+    ```
+
+    `ImageShardReader` can be used from multiple threads.
+    """
+
+    def __init__(self, path: PATH):
+        """
+        :param path: The path to the directory of shards.
+        """
+
+        if isinstance(path, str):
+            """:field
+            The path to the directory of shards.
+            """
+            self.path: Path = Path(path)
+        else:
+            self.path: Path = path
+        # The location of each file. Key = The record key. Value = A dictionary. Key = The file name. Value = Tuple: The shard path, the offset, and the size.
+        self._files: Dict[str, Dict[str, Tuple[Path, int, int]]] = dict()
+        for shard in sorted(self.path.glob("shard-*.tar")):
+            index_path = shard.with_suffix(".json")
+            if index_path.exists():
+                index: Dict[str, Dict[str, List[int]]] = json.loads(index_path.read_text())
+            else:
+                index = ImageShardReader._scan(shard)
+            for key in index:
+                self._files[key] = {name: (shard, index[key][name][0], index[key][name][1]) for name in index[key]}
+        """:field
+        The key of each record (frame) in the order in which they were written.
+        """
+        self.keys: List[str] = list(self._files.keys())
+        # Memory-mapped shards. Key = The shard path.
+        self._mmaps: Dict[Path, mmap.mmap] = dict()
+        self._mmaps_lock: Lock = Lock()
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def get_frame(self, key: Union[str, int]) -> Dict[str, bytes]:
+        """
+        :param key: The key of the record or its index in `self.keys`.
+
+        :return: Every file in the record. Key = The name of the file minus the record key, for example `a.img.jpg`. Value = The file data.
+        """
+
+        if isinstance(key, int):
+            key = self.keys[key]
+        return {name: self._read(*self._files[key][name]) for name in self._files[key]}
+
+    def get_image(self, key: Union[str, int], avatar_id: str, pass_mask: str) -> bytes:
+        """
+        :param key: The key of the record or its index in `self.keys`.
+        :param avatar_id: The ID of the avatar.
+        :param pass_mask: The pass mask, for example `"_img"`.
+
+        :return: The image file data.
+        """
+
+        if isinstance(key, int):
+            key = self.keys[key]
+        prefix = f"{avatar_id}.{pass_mask[1:]}."
+        for name in self._files[key]:
+            if name.startswith(prefix):
+                return self._read(*self._files[key][name])
+        raise Exception(f"Record {key} doesn't have a {pass_mask} pass for avatar {avatar_id}")
+
+    def get_pil_image(self, key: Union[str, int], avatar_id: str, pass_mask: str) -> Image.Image:
+        """
+        :param key: The key of the record or its index in `self.keys`.
+        :param avatar_id: The ID of the avatar.
+        :param pass_mask: The pass mask, for example `"_img"`.
+
+        :return: The image as a PIL image.
+        """
+
+        return Image.open(io.BytesIO(self.get_image(key=key, avatar_id=avatar_id, pass_mask=pass_mask)))
+
+    def close(self) -> None:
+        """
+        Close each memory-mapped shard.
+        """
+
+        for m in self._mmaps.values():
+            m.close()
+        self._mmaps.clear()
+
+    def _read(self, shard: Path, offset: int, size: int) -> bytes:
+        """
+        :param shard: The path to the shard.
+        :param offset: The offset of the file in the shard.
+        :param size: The size of the file.
+
+        :return: The file data.
+        """
+
+        end = offset + size
+        m = self._mmaps.get(shard)
+        # Map the shard. If the shard has grown since it was mapped, map it again.
+        if m is None or len(m) < end:
+            with self._mmaps_lock:
+                m = self._mmaps.get(shard)
+                if m is None or len(m) < end:
+                    with shard.open("rb") as f:
+                        # An empty file can't be memory-mapped.
+                        if os.fstat(f.fileno()).st_size < end:
+                            raise Exception(f"Shard {shard} is smaller than expected: {end} bytes")
+                        # Other threads might still be reading the previous mapping, so it isn't closed here.
+                        m = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                    self._mmaps[shard] = m
+        return m[offset: end]
+
+    @staticmethod
+    def _scan(shard: Path) -> Dict[str, Dict[str, List[int]]]:
+        """
+        Build the index of a shard by scanning the .tar file.
+
+        :param shard: The path to the shard.
+
+        :return: The index of the shard. Key = The record key. Value = A dictionary. Key = The file name. Value = The offset and size of the file.
+        """
+
+        index: Dict[str, Dict[str, List[int]]] = dict()
+        shard_size = shard.stat().st_size
+        # The shard is empty.
+        if shard_size == 0:
+            return index
+        try:
+            with tarfile.open(str(shard.resolve()), mode="r") as tar:
+                for info in tar:
+                    # The file is truncated.
+                    if info.offset_data + info.size > shard_size:
+                        break
+                    key, name = info.name.split(".", 1)
+                    if key not in index:
+                        index[key] = dict()
+                    index[key][name] = [info.offset_data, info.size]
+        # The shard is truncated. Keep every complete file.
+        except tarfile.ReadError:
+            pass
+        return index
@@ -0,0 +1,206 @@
+import io
+import json
+import tarfile
+from threading import Lock
+from pathlib import Path
+from typing import Dict, List, Optional, BinaryIO
+from PIL import Image
+from tdw.output_data import Images
+from tdw.tdw_utils import TDWUtils
+from tdw.type_aliases import PATH
+
+
+class ImageShardWriter:
+    """
+    Write images to [WebDataset](https://github.com/webdataset/webdataset)-style .tar shards rather than to separate files.
+
+    Each frame is a record: a group of files in the .tar file that share the same key (the frame number). Each file in a record is named `key.avatar_id.pass.extension`, for example `0000.a.img.jpg` and `0000.a.depth.png`.
+
+    When a shard is larger than `shard_size` bytes, a new shard is created. Shards are named `shard-000000.tar`, `shard-000001.tar`, etc. Each shard has an index file, for example `shard-000000.json`, that stores the position of each file in the shard. The index is used by [`ImageShardReader`](image_shard_reader.md) to read frames without scanning the whole shard.
+
+    ```python
+    from tdw.controller import Controller
+    from tdw.output_data import OutputData, Images
+    from tdw.add_ons.third_person_camera import ThirdPersonCamera
+    from tdw.image_data.image_shard_writer import ImageShardWriter
+
+    c = Controller()
+    camera = ThirdPersonCamera(position={"x": 0, "y": 1.5, "z": -2}, avatar_id="a")
+    c.add_ons.append(camera)
+    writer = ImageShardWriter(path="D:/image_shards")
+    c.communicate([{"$type": "create_empty_environment"},
+                   {"$type": "send_images",
+                    "frequency": "always"}])
+    for i in range(100):
+        resp = c.communicate([])
+        images = [Images(resp[j]) for j in range(len(resp) - 1) if OutputData.get_data_type_id(resp[j]) == "imag"]
+        writer.write_images(key=str(i).zfill(8), images=images)
+    writer.close()
+    c.communicate({"$type": "terminate"})
+    ```
+
+    Usually, you don't need to use this class directly; set `shard_size` in the [`ImageCapture`](../add_ons/image_capture.md) constructor instead.
+
+    `write(key, files)` and `write_images(key, images)` can be called from multiple threads.
+    """
+
+    def __init__(self, path: PATH, shard_size: int = 1 << 30):
+        """
+        :param path: The path to the output directory. If this doesn't exist, it will be created.
+        :param shard_size: The maximum size of each shard in bytes. A shard can be larger than this if a single record is larger than this.
+        """
+
+        if isinstance(path, str):
+            """:field
+            The path to the output directory.
+            """
+            self.path: Path = Path(path)
+        else:
+            self.path: Path = path
+        if not self.path.exists():
+            self.path.mkdir(parents=True)
+        """:field
+        The maximum size of each shard in bytes.
+        """
+        self.shard_size: int = shard_size
+        """:field
+        The index of the current shard.
+        """
+        self.shard_index: int = -1
+        # The current shard.
+        self._tar: Optional[tarfile.TarFile] = None
+        # The current shard file.
+        self._file: Optional[BinaryIO] = None
+        # The index of the current shard. Key = The record key. Value = A dictionary. Key = The file name. Value = The offset and size of the file.
+        self._index: Dict[str, Dict[str, List[int]]] = dict()
+        # Only one thread can write at a time.
+        self._lock: Lock = Lock()
+
+    def write(self, key: str, files: Dict[str, bytes]) -> None:
+        """
+        Write a record.
+
+        :param key: The key of the record, for example the zero-padded frame number. This can't contain any `.` characters.
+        :param files: The files in the record. Key = The name of the file minus the key, for example `a.img.jpg`. Value = The file data.
+        """
+
+        if "." in key:
+            raise Exception(f"Invalid key: {key}")
+        with self._lock:
+            record_size = sum([len(data) for data in files.values()])
+            # Start a new shard.
+            if self._tar is None or (self._tar.offset > 0 and self._tar.offset + record_size > self.shard_size):
+                self._start_shard()
+            record: Dict[str, List[int]] = dict()
+            for name in files:
+                data = files[name]
+                info = tarfile.TarInfo(name=f"{key}.{name}")
+                info.size = len(data)
+                self._tar.addfile(info, io.BytesIO(data))
+                # The data is at the end of the archive, followed by padding up to the next block.
+                offset = self._tar.offset - (len(data) + tarfile.BLOCKSIZE - 1) // tarfile.BLOCKSIZE * tarfile.BLOCKSIZE
+                record[name] = [offset, len(data)]
+            self._index[key] = record
+
+    def write_images(self, key: str, images: List[Images]) -> None:
+        """
+        Write each pass of each avatar's images as a record.
+
+        :param key: The key of the record, for example the zero-padded frame number. This can't contain any `.` characters.
+        :param images: The `Images` output data, one per avatar.
+        """
+
+        self.write(key=key, files=ImageShardWriter.get_record(images=images))
+
+    def flush(self) -> None:
+        """
+        Write any buffered data to disk and update the index of the current shard. After this, every record that has been written so far can be read.
+        """
+
+        with self._lock:
+            if self._tar is not None:
+                self._file.flush()
+                self._write_index()
+
+    def close(self) -> None:
+        """
+        Close the current shard and write its index. If more records are written after this, they will be written to a new shard.
+        """
+
+        with self._lock:
+            self._close_shard()
+
+    @staticmethod
+    def get_record(images: List[Images]) -> Dict[str, bytes]:
+        """
+        :param images: The `Images` output data, one per avatar.
+
+        :return: The files of each pass of each avatar's images. Key = The name of the file minus the record key, for example `a.img.jpg`. Value = The file data.
+        """
+
+        files: Dict[str, bytes] = dict()
+        for image in images:
+            files.update(ImageShardWriter.get_files(images=image))
+        return files
+
+    @staticmethod
+    def get_files(images: Images) -> Dict[str, bytes]:
+        """
+        :param images: `Images` output data.
+
+        :return: The files of each pass. Key = The name of the file minus the record key, for example `a.img.jpg`. Value = The file data. The `_depth` and `_depth_simple` passes are encoded as .png files.
+        """
+
+        avatar_id = images.get_avatar_id()
+        files: Dict[str, bytes] = dict()
+        for i in range(images.get_num_passes()):
+            pass_mask = images.get_pass_mask(i)
+            # The depth passes aren't png files, so we need to convert them.
+            if pass_mask == "_depth" or pass_mask == "_depth_simple":
+                with io.BytesIO() as f:
+                    Image.fromarray(TDWUtils.get_shaped_depth_pass(images=images, index=i)).save(f, format="png")
+                    data = f.getvalue()
+            else:
+                data = images.get_image(i).tobytes()
+            files[f"{avatar_id}.{pass_mask[1:]}.{images.get_extension(i)}"] = data
+        return files
+
+    def _start_shard(self) -> None:
+        """
+        Close the current shard and start a new one.
+        """
+
+        self._close_shard()
+        self.shard_index += 1
+        self._file = self._get_path(".tar").open("wb")
+        self._tar = tarfile.open(fileobj=self._file, mode="w", format=tarfile.USTAR_FORMAT)
+
+    def _close_shard(self) -> None:
+        """
+        Close the current shard and write its index.
+        """
+
+        if self._tar is None:
+            return
+        self._tar.close()
+        self._file.close()
+        self._write_index()
+        self._tar = None
+        self._file = None
+        self._index.clear()
+
+    def _write_index(self) -> None:
+        """
+        Write the index of the current shard.
+        """
+
+        self._get_path(".json").write_text(json.dumps(self._index))
+
+    def _get_path(self, extension: str) -> Path:
+        """
+        :param extension: The file extension.
+
+        :return: The path to a file of the current shard.
+        """
+
+        return self.path.joinpath(f"shard-{str(self.shard_index).zfill(6)}{extension}")
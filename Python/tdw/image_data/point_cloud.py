@@ -0,0 +1,210 @@
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+import numpy as np
+from tdw.output_data import CameraMatrices
+from tdw.type_aliases import PATH
+
+
+class PointCloud:
+    """
+    Convert depth values to point clouds. This is the same conversion as `TDWUtils.get_point_cloud()`, but:
+
+    - The image-to-camera matrix is cached per image size and field of view, so repeated calls don't recompute it. All of the images in a single call must have the same size and field of view; convert images of different sizes or fields of view in separate calls.
+    - Multiple depth images (for example, from multiple avatars) are converted in a single vectorized call.
+    - Points beyond the far clipping plane are removed with a mask.
+    - Point clouds are saved as binary .ply or .npz files in a single write.
+
+    ```python
+    from tdw.controller import Controller
+    from tdw.add_ons.third_person_camera import ThirdPersonCamera
+    from tdw.add_ons.image_capture import ImageCapture
+    from tdw.output_data import OutputData, CameraMatrices
+    from tdw.image_data.depth_decoder import DepthDecoder
+    from tdw.image_data.point_cloud import PointCloud
+
+    c = Controller()
+    cameras = [ThirdPersonCamera(position={"x": 2, "y": 1.5, "z": -2}, look_at={"x": 0, "y": 0, "z": 0}, avatar_id="a"),
+               ThirdPersonCamera(position={"x": -2, "y": 1.5, "z": 2}, look_at={"x": 0, "y": 0, "z": 0}, avatar_id="b")]
+    capture = ImageCapture(path="images", avatar_ids=["a", "b"], pass_masks=["_depth"])
+    c.add_ons.extend(cameras)
+    c.add_ons.append(capture)
+    resp = c.communicate([{"$type": "create_empty_environment"},
+                          c.get_add_object(model_name="iron_box", object_id=0),
+                          {"$type": "send_camera_matrices", "frequency": "once"}])
+    camera_matrices = dict()
+    for i in range(len(resp) - 1):
+        if OutputData.get_data_type_id(resp[i]) == "cama":
+            matrices = CameraMatrices(resp[i])
+            camera_matrices[matrices.get_avatar_id()] = matrices
+    decoder = DepthDecoder()
+    depths = [decoder.decode(images=capture.images[a], index=0) for a in ["a", "b"]]
+    point_cloud = PointCloud()
+    # Shape: (2, 3, 256, 256)
+    points = point_cloud.get_points(depths=depths, camera_matrices=[camera_matrices["a"], camera_matrices["b"]])
+    # Remove points at the far clipping plane. Shape: (N, 3)
+    points = PointCloud.get_masked_points(points=points, mask=point_cloud.get_mask(depths))
+    PointCloud.save_ply(path="point_cloud.ply", points=points)
+    c.communicate({"$type": "terminate"})
+    ```
+    """
+
+    def __init__(self, near_plane: float = 0.1, far_plane: float = 100):
+        """
+        :param near_plane: The near clipping plane. See command `set_camera_clipping_planes`. The default value is the default value of the near clipping plane.
+        :param far_plane: The far clipping plane. See command `set_camera_clipping_planes`. The default value is the default value of the far clipping plane.
+        """
+
+        """:field
+        The near clipping plane.
+        """
+        self.near_plane: float = near_plane
+        """:field
+        The far clipping plane.
+        """
+        self.far_plane: float = far_plane
+        # The image-to-camera matrix multiplied by each pixel. Key = Tuple: The height, the width, the field of view.
+        self._pixel_rays: Dict[Tuple[int, int, float], np.ndarray] = dict()
+
+    def get_points(self, depths: Union[np.ndarray, List[np.ndarray]],
+                   camera_matrices: List[Union[CameraMatrices, np.ndarray, tuple]],
+                   vfov: float = 54.43222) -> np.ndarray:
+        """
+        :param depths: Depth values as a `(height, width)` array, a `(N, height, width)` array, or a list of `(height, width)` arrays. See: `DepthDecoder` and `TDWUtils.get_depth_values()`.
+        :param camera_matrices: The camera matrix per depth image. Each element can be `CameraMatrices` output data or a camera matrix (see: `CameraMatrices.get_camera_matrix()`). If `depths` is a single `(height, width)` array, this can be a single camera matrix.
+        :param vfov: The field of view. See: [`set_field_of_view`](https://github.com/threedworld-mit/tdw/blob/master/Documentation/api/command_api.md#set_field_of_view)
+
+        :return: The point cloud as a float32 numpy array of `[x, y, z]` worldspace coordinates. If `depths` is a single image, the shape is `(3, height, width)`; otherwise, the shape is `(N, 3, height, width)`.
+        """
+
+        depths = np.asarray(depths, dtype=np.float32)
+        single = depths.ndim == 2
+        if single:
+            depths = depths[np.newaxis]
+            if not isinstance(camera_matrices, list):
+                camera_matrices = [camera_matrices]
+        if len(camera_matrices) != depths.shape[0]:
+            raise Exception(f"Got {depths.shape[0]} depth images but {len(camera_matrices)} camera matrices.")
+        num_images, height, width = depths.shape
+        pixel_rays = self._get_pixel_rays(height=height, width=width, vfov=vfov)
+        # Camera-to-world matrices. Shape: (N, 4, 4)
+        matrices = np.linalg.inv(np.array([m.get_camera_matrix() if isinstance(m, CameraMatrices) else m
+                                           for m in camera_matrices], dtype=np.float64).reshape(-1, 4, 4))
+        # Different from real-world camera coordinate system.
+        # OpenGL uses negative z axis as the camera front direction.
+        # x axes are same, hence y axis is reversed as well.
+        matrices[:, :, 1:3] *= -1
+        matrices = matrices.astype(np.float32)
+        # Shape: (N, 3, height * width)
+        points = pixel_rays * depths.reshape(num_images, 1, height * width)
+        points = np.matmul(matrices[:, :3, :3], points)
+        points += matrices[:, :3, 3:]
+        points = points.reshape(num_images, 3, height, width)
+        if single:
+            return points[0]
+        else:
+            return points
+
+    def get_mask(self, depths: Union[np.ndarray, List[np.ndarray]]) -> np.ndarray:
+        """
+        :param depths: Depth values as a `(height, width)` array, a `(N, height, width)` array, or a list of `(height, width)` arrays.
+
+        :return: A boolean array with the same shape as `depths`. Pixels at the far clipping plane (i.e. that don't hit anything) are False.
+        """
+
+        return np.asarray(depths) < self.far_plane - self.near_plane
+
+    @staticmethod
+    def get_masked_points(points: np.ndarray, mask: np.ndarray) -> np.ndarray:
+        """
+        :param points: Points from `get_points()` with shape `(3, height, width)` or `(N, 3, height, width)`.
+        :param mask: A mask from `get_mask()` with shape `(height, width)` or `(N, height, width)`.
+
+        :return: The points where the mask is True as an `(M, 3)` array.
+        """
+
+        if points.ndim == 3:
+            points = points[np.newaxis]
+            mask = np.asarray(mask)[np.newaxis]
+        return np.moveaxis(points, 1, -1)[mask]
+
+    @staticmethod
+    def save_ply(path: PATH, points: np.ndarray, colors: Optional[np.ndarray] = None) -> None:
+        """
+        Save a point cloud as a binary little-endian .ply file.
+
+        :param path: The path to the file.
+        :param points: The points as an `(M, 3)` array.
+        :param colors: If not None, the color of each point as an `(M, 3)` uint8 array.
+        """
+
+        path = PointCloud._get_path(path=path)
+        points = np.ascontiguousarray(points, dtype="<f4").reshape(-1, 3)
+        header = f"ply\nformat binary_little_endian 1.0\nelement vertex {points.shape[0]}\n" \
+                 "property float x\nproperty float y\nproperty float z\n"
+        if colors is None:
+            vertices = points
+        else:
+            header += "property uchar red\nproperty uchar green\nproperty uchar blue\n"
+            vertices = np.empty(points.shape[0], dtype=[("position", "<f4", 3), ("color", "u1", 3)])
+            vertices["position"] = points
+            vertices["color"] = np.asarray(colors, dtype=np.uint8).reshape(-1, 3)
+        header += "end_header\n"
+        with path.open("wb") as f:
+            f.write(header.encode("ascii"))
+            f.write(vertices.tobytes())
+
+    @staticmethod
+    def save_npz(path: PATH, points: np.ndarray, colors: Optional[np.ndarray] = None) -> None:
+        """
+        Save a point cloud as a .npz file with a `points` array and, optionally, a `colors` array.
+
+        :param path: The path to the file.
+        :param points: The points as an `(M, 3)` array.
+        :param colors: If not None, the color of each point as an `(M, 3)` uint8 array.
+        """
+
+        path = PointCloud._get_path(path=path)
+        if colors is None:
+            np.savez(str(path.resolve()), points=points)
+        else:
+            np.savez(str(path.resolve()), points=points, colors=colors)
+
+    def _get_pixel_rays(self, height: int, width: int, vfov: float) -> np.ndarray:
+        """
+        :param height: The height of the image.
+        :param width: The width of the image.
+        :param vfov: The field of view.
+
+        :return: The camera-space ray of each pixel at a depth of 1 as a `(3, height * width)` float32 array.
+        """
+
+        key = (height, width, vfov)
+        if key not in self._pixel_rays:
+            img_pixs = np.mgrid[0: height, 0: width].reshape(2, -1)
+            # Swap (v, u) into (u, v).
+            img_pixs[[0, 1], :] = img_pixs[[1, 0], :]
+            img_pix_ones = np.concatenate((img_pixs, np.ones((1, img_pixs.shape[1]))))
+            # Calculate the intrinsic matrix from the vertical field of view.
+            tan_half_vfov = np.tan(vfov / 180.0 * np.pi / 2.0)
+            tan_half_hfov = tan_half_vfov * width / float(height)
+            fx = width / 2.0 / tan_half_hfov
+            fy = height / 2.0 / tan_half_vfov
+            intrinsics = np.array([[fx, 0, width / 2.0],
+                                   [0, fy, height / 2.0],
+                                   [0, 0, 1]])
+            self._pixel_rays[key] = np.dot(np.linalg.inv(intrinsics), img_pix_ones).astype(np.float32)
+        return self._pixel_rays[key]
+
+    @staticmethod
+    def _get_path(path: PATH) -> Path:
+        """
+        :param path: The path to a file.
+
+        :return: The path as a `Path`. The parent directory is created if needed.
+        """
+
+        if isinstance(path, str):
+            path = Path(path)
+        if not path.parent.exists():
+            path.parent.mkdir(parents=True)
+        return path
@@ -0,0 +1,137 @@
+from typing import Dict, Optional
+import numpy as np
+from tdw.output_data import SegmentationColors
+from tdw.object_data.object_static import ObjectStatic
+from tdw.image_data.segmentation_statistics import SegmentationStatistics
+from tdw.tdw_utils import TDWUtils
+
+
+class Segmentation:
+    """
+    Convert `_id` passes to object ID maps and per-object statistics.
+
+    The segmentation colors of the objects are converted to a lookup table of packed RGB values (see: `TDWUtils.color_to_hashable(color)`). An entire `_id` pass is converted to an object ID map in a single vectorized pass, rather than comparing the image to each segmentation color.
+
+    ```python
+    import numpy as np
+    from tdw.controller import Controller
+    from tdw.add_ons.third_person_camera import ThirdPersonCamera
+    from tdw.add_ons.image_capture import ImageCapture
+    from tdw.add_ons.object_manager import ObjectManager
+    from tdw.image_data.segmentation import Segmentation
+
+    c = Controller()
+    camera = ThirdPersonCamera(position={"x": 0, "y": 1.5, "z": -2}, look_at={"x": 0, "y": 0, "z": 0}, avatar_id="a")
+    capture = ImageCapture(path="images", avatar_ids=["a"], pass_masks=["_id"])
+    om = ObjectManager()
+    c.add_ons.extend([camera, capture, om])
+    c.communicate([{"$type": "create_empty_environment"},
+                   c.get_add_object(model_name="iron_box", object_id=0)])
+    segmentation = Segmentation.from_objects_static(om.objects_static)
+    id_pass = np.array(capture.get_pil_images()["a"]["_id"])
+    # Each pixel is an object ID, or -1 if there isn't an object.
+    object_id_map = segmentation.get_object_id_map(id_pass)
+    statistics = segmentation.get_statistics(id_pass)
+    for object_id, pixel_count, bounding_box in zip(statistics.object_ids, statistics.pixel_counts, statistics.bounding_boxes):
+        print(object_id, pixel_count, bounding_box)
+    c.communicate({"$type": "terminate"})
+    ```
+    """
+
+    def __init__(self, object_ids: np.ndarray, colors: np.ndarray):
+        """
+        :param object_ids: The object IDs.
+        :param colors: The segmentation color of each object as an `(N, 3)` array of integers between 0 and 255.
+        """
+
+        object_ids = np.array(object_ids, dtype=np.int32)
+        colors = np.array(colors, dtype=np.int32).reshape(-1, 3)
+        # The lookup table is the sorted packed colors.
+        hashables = TDWUtils.color_to_hashable(colors.T)
+        order = np.argsort(hashables)
+        self._hashables: np.ndarray = hashables[order]
+        # The object ID of each color in `self._hashables`.
+        self._object_ids: np.ndarray = object_ids[order]
+
+    @staticmethod
+    def from_segmentation_colors(segmentation_colors: SegmentationColors) -> "Segmentation":
+        """
+        :param segmentation_colors: [`SegmentationColors`](../../api/output_data.md#SegmentationColors) output data.
+
+        :return: A `Segmentation` for each object in the output data.
+        """
+
+        return Segmentation(object_ids=np.array([segmentation_colors.get_object_id(i) for i in range(segmentation_colors.get_num())], dtype=np.int32),
+                            colors=np.array([segmentation_colors.get_object_color(i) for i in range(segmentation_colors.get_num())], dtype=np.int32))
+
+    @staticmethod
+    def from_objects_static(objects_static: Dict[int, ObjectStatic]) -> "Segmentation":
+        """
+        :param objects_static: Static object data, for example `ObjectManager.objects_static`.
+
+        :return: A `Segmentation` for each object.
+        """
+
+        return Segmentation(object_ids=np.array(list(objects_static.keys()), dtype=np.int32),
+                            colors=np.array([o.segmentation_color for o in objects_static.values()], dtype=np.int32))
+
+    def get_object_id_map(self, id_pass: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        :param id_pass: The `_id` pass as an `(height, width, 3)` uint8 numpy array.
+        :param out: If not None, the object ID map is written into this `(height, width)` int32 array.
+
+        :return: The object ID map as an `(height, width)` int32 array. Each value is an object ID or -1 if there isn't an object at that pixel.
+        """
+
+        indices = self._get_indices(id_pass=id_pass)
+        if out is None:
+            out = np.empty(indices.shape, dtype=np.int32)
+        # Index -1 is a placeholder for pixels without an object.
+        np.take(np.append(self._object_ids, np.int32(-1)), indices, out=out)
+        return out
+
+    def get_statistics(self, id_pass: np.ndarray) -> SegmentationStatistics:
+        """
+        :param id_pass: The `_id` pass as an `(height, width, 3)` uint8 numpy array.
+
+        :return: [Per-object statistics](segmentation_statistics.md) for each object that is visible in the image.
+        """
+
+        height, width = id_pass.shape[0], id_pass.shape[1]
+        indices = self._get_indices(id_pass=id_pass)
+        num_objects = len(self._object_ids)
+        # Ignore pixels without an object.
+        mask = indices < num_objects
+        object_indices = indices[mask]
+        pixel_counts = np.bincount(object_indices, minlength=num_objects)
+        visible = np.flatnonzero(pixel_counts)
+        # Count the pixels of each object per row and per column.
+        rows, columns = np.nonzero(mask)
+        row_counts = np.bincount(object_indices * height + rows, minlength=num_objects * height).reshape(num_objects, height)[visible] > 0
+        column_counts = np.bincount(object_indices * width + columns, minlength=num_objects * width).reshape(num_objects, width)[visible] > 0
+        bounding_boxes = np.stack([np.argmax(column_counts, axis=1),
+                                   np.argmax(row_counts, axis=1),
+                                   width - 1 - np.argmax(column_counts[:, ::-1], axis=1),
+                                   height - 1 - np.argmax(row_counts[:, ::-1], axis=1)], axis=1)
+        return SegmentationStatistics(object_ids=self._object_ids[visible],
+                                      pixel_counts=pixel_counts[visible],
+                                      bounding_boxes=bounding_boxes,
+                                      visibility=pixel_counts[visible] / (height * width))
+
+    def _get_indices(self, id_pass: np.ndarray) -> np.ndarray:
+        """
+        :param id_pass: The `_id` pass as an `(height, width, 3)` uint8 numpy array.
+
+        :return: The index of each pixel in the lookup table as an `(height, width)` array. Pixels without an object have an index equal to the number of objects.
+        """
+
+        hashables = TDWUtils.color_to_hashable(np.moveaxis(id_pass, -1, 0).astype(np.int32))
+        if len(self._hashables) == 0:
+            return np.zeros(hashables.shape, dtype=np.int64)
+        indices = np.searchsorted(self._hashables, hashables)
+        # Colors that aren't in the lookup table.
+        missing = indices >= len(self._hashables)
+        indices[missing] = 0
+        missing |= self._hashables[indices] != hashables
+        indices[missing] = len(self._hashables)
+        return indices
@@ -0,0 +1,35 @@
+import numpy as np
+
+
+class SegmentationStatistics:
+    """
+    Per-object statistics of an `_id` pass. See: [`Segmentation`](segmentation.md).
+
+    Each array has one element (or row) per object that is visible in the image, in the same order as `object_ids`.
+    """
+
+    def __init__(self, object_ids: np.ndarray, pixel_counts: np.ndarray, bounding_boxes: np.ndarray,
+                 visibility: np.ndarray):
+        """
+        :param object_ids: The IDs of the visible objects.
+        :param pixel_counts: The number of pixels of each object.
+        :param bounding_boxes: The 2D bounding box of each object.
+        :param visibility: The fraction of the image that each object covers.
+        """
+
+        """:field
+        The IDs of the objects that are visible in the image.
+        """
+        self.object_ids: np.ndarray = object_ids
+        """:field
+        The number of pixels of each object.
+        """
+        self.pixel_counts: np.ndarray = pixel_counts
+        """:field
+        The 2D bounding box of each object in pixels as an `(N, 4)` array: `[x_min, y_min, x_max, y_max]`. The maximum values are inclusive. The origin is the top-left corner of the image.
+        """
+        self.bounding_boxes: np.ndarray = bounding_boxes
+        """:field
+        The fraction of the image that each object covers, between 0 and 1.
+        """
+        self.visibility: np.ndarray = visibility
@@ -0,0 +1,49 @@
+from abc import ABC, abstractmethod
+from pathlib import Path
+from tdw.type_aliases import PATH
+
+
+class VideoEncoder(ABC):
+    """
+    Abstract base class for video encoders. A video encoder receives encoded images (jpg or png file data) one frame at a time and writes them to a video file.
+
+    To use a custom video encoder with [`ImageCapture`](../add_ons/image_capture.md), subclass `VideoEncoder` and set the `video_encoder` parameter of the `ImageCapture` constructor to the subclass. See: [`FfmpegEncoder`](ffmpeg_encoder.md).
+    """
+
+    def __init__(self, path: PATH, framerate: int = 30):
+        """
+        :param path: The path to the video file.
+        :param framerate: The framerate of the video.
+        """
+
+        if isinstance(path, str):
+            """:field
+            The path to the video file.
+            """
+            self.path: Path = Path(path)
+        else:
+            self.path: Path = path
+        if not self.path.parent.exists():
+            self.path.parent.mkdir(parents=True)
+        """:field
+        The framerate of the video.
+        """
+        self.framerate: int = framerate
+
+    @abstractmethod
+    def write(self, image: bytes) -> None:
+        """
+        Write a frame to the video.
+
+        :param image: The image file data (a jpg or png file), for example `Images.get_image(index)`.
+        """
+
+        raise Exception()
+
+    @abstractmethod
+    def close(self) -> None:
+        """
+        Finish writing the video.
+        """
+
+        raise Exception()
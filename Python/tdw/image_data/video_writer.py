@@ -0,0 +1,149 @@
+from pathlib import Path
+from queue import Queue
+from threading import Thread
+from typing import Callable, Dict, Optional
+from tdw.image_data.video_encoder import VideoEncoder
+from tdw.image_data.ffmpeg_encoder import FfmpegEncoder
+from tdw.type_aliases import PATH
+
+
+class VideoWriter:
+    """
+    Write images to one video per avatar. Images are encoded in a writer thread, which means that `write(frame)` returns immediately unless `max_in_flight` frames are already waiting to be encoded.
+
+    This is used by [`ImageCapture`](../add_ons/image_capture.md) when its `video_encoder` parameter isn't None, but it can also be used on its own:
+
+    ```python
+    from tdw.image_data.video_writer import VideoWriter
+
+    writer = VideoWriter(path="D:/videos", framerate=30)
+    # Each frame is a dictionary. Key = The avatar ID. Value = The image file data.
+    for frame in frames:
+        writer.write(frame)
+    writer.close()
+    ```
+    """
+
+    def __init__(self, path: PATH, video_encoder: Callable[[Path, int], VideoEncoder] = None, framerate: int = 30,
+                 extension: str = "mp4", max_in_flight: int = 4):
+        """
+        :param path: The path to the output directory. Each avatar's video is saved to `path/<avatar_id>.<extension>`.
+        :param video_encoder: A function or class that creates a [`VideoEncoder`](video_encoder.md) given a path and a framerate. If None, [`FfmpegEncoder`](ffmpeg_encoder.md) is used.
+        :param framerate: The framerate of each video.
+        :param extension: The file extension of each video.
+        :param max_in_flight: The maximum number of frames that can be waiting to be encoded.
+        """
+
+        if isinstance(path, str):
+            """:field
+            The path to the output directory.
+            """
+            self.path: Path = Path(path)
+        else:
+            self.path: Path = path
+        if video_encoder is None:
+            self._video_encoder: Callable[[Path, int], VideoEncoder] = FfmpegEncoder
+        else:
+            self._video_encoder = video_encoder
+        self._framerate: int = framerate
+        self._extension: str = extension
+        # Frames waiting to be encoded. None tells the writer thread to stop.
+        self._queue: Queue = Queue(maxsize=max_in_flight)
+        # The writer thread. This is created when it is first needed.
+        self._thread: Optional[Thread] = None
+        # The video encoders. Key = The avatar ID. This is only accessed by the writer thread.
+        self._encoders: Dict[str, VideoEncoder] = dict()
+        # An exception raised in the writer thread.
+        self._exception: Optional[Exception] = None
+
+    def write(self, frame: Dict[str, bytes], block: bool = True) -> bool:
+        """
+        Add a frame to the queue of frames that will be encoded. If an exception was raised in the writer thread, it is raised here.
+
+        :param frame: The frame. Key = The avatar ID. Value = The image file data (a jpg or png file), for example `Images.get_image(index)`.
+        :param block: If True and `max_in_flight` frames are waiting to be encoded, wait until there is room for this frame. If False, don't add the frame.
+
+        :return: True if the frame was added to the queue.
+        """
+
+        self._raise_exception()
+        if self._thread is None:
+            self._thread = Thread(target=self._encode, daemon=True)
+            self._thread.start()
+        if not block and self._queue.full():
+            return False
+        self._queue.put(frame)
+        return True
+
+    def get_queue_depth(self) -> int:
+        """
+        :return: The number of frames that are waiting to be encoded.
+        """
+
+        return self._queue.qsize()
+
+    def is_full(self) -> bool:
+        """
+        :return: True if `max_in_flight` frames are waiting to be encoded.
+        """
+
+        return self._queue.full()
+
+    def flush(self) -> None:
+        """
+        Wait until every frame has been encoded. The videos aren't finished until `close()` is called.
+        """
+
+        if self._thread is not None:
+            self._queue.join()
+        self._raise_exception()
+
+    def close(self) -> None:
+        """
+        Wait until every frame has been encoded and then finish writing each video. If more frames are written after this, new videos are started and the previous videos will be overwritten.
+        """
+
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+        self._raise_exception()
+
+    def _encode(self) -> None:
+        """
+        Encode frames until `close()` is called. This is called in the writer thread.
+        """
+
+        while True:
+            frame: Optional[Dict[str, bytes]] = self._queue.get()
+            try:
+                # Finish each video.
+                if frame is None:
+                    for encoder in self._encoders.values():
+                        encoder.close()
+                # Stop encoding if there was an error.
+                elif self._exception is None:
+                    for avatar_id in frame:
+                        if avatar_id not in self._encoders:
+                            if not self.path.exists():
+                                self.path.mkdir(parents=True)
+                            self._encoders[avatar_id] = self._video_encoder(self.path.joinpath(f"{avatar_id}.{self._extension}"),
+                                                                            self._framerate)
+                        self._encoders[avatar_id].write(frame[avatar_id])
+            except Exception as e:
+                self._exception = e
+            finally:
+                self._queue.task_done()
+            if frame is None:
+                self._encoders.clear()
+                return
+
+    def _raise_exception(self) -> None:
+        """
+        If there was an exception in the writer thread, raise it.
+        """
+
+        if self._exception is not None:
+            exception = self._exception
+            self._exception = None
+            raise exception
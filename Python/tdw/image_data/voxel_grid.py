@@ -0,0 +1,411 @@
+from typing import List, Optional, Tuple, Union
+import numpy as np
+from tdw.output_data import CameraMatrices
+from tdw.image_data.point_cloud import PointCloud
+
+
+class VoxelGrid:
+    """
+    A sparse voxel grid that fuses point clouds from multiple frames and cameras into a single map of the scene.
+
+    Each voxel has a key (the voxel's integer coordinates packed into a 64-bit integer). A hash table maps each key to the voxel's index in a set of arrays: the number of points that have been in the voxel, the frame on which the voxel was last seen, and, optionally, the ID of an object in the voxel. The hash table and the arrays grow geometrically. A removed voxel is replaced by the voxel at the end of the arrays, so the arrays never have gaps. Integrating a frame is proportional to the number of pixels, not to the number of voxels in the grid or to the number of frames that have already been integrated. The exception is eviction: if the grid has more than `max_voxels` voxels, selecting the voxels to evict is a partial sort that is proportional to the number of voxels.
+
+    ```python
+    import numpy as np
+    from tdw.controller import Controller
+    from tdw.add_ons.third_person_camera import ThirdPersonCamera
+    from tdw.add_ons.image_capture import ImageCapture
+    from tdw.add_ons.object_manager import ObjectManager
+    from tdw.output_data import OutputData, CameraMatrices
+    from tdw.image_data.depth_decoder import DepthDecoder
+    from tdw.image_data.segmentation import Segmentation
+    from tdw.image_data.voxel_grid import VoxelGrid
+
+    c = Controller()
+    camera = ThirdPersonCamera(position={"x": 2, "y": 1.5, "z": -2}, look_at={"x": 0, "y": 0, "z": 0}, avatar_id="a")
+    capture = ImageCapture(path="images", avatar_ids=["a"], pass_masks=["_depth", "_id"])
+    om = ObjectManager()
+    c.add_ons.extend([camera, capture, om])
+    c.communicate([{"$type": "create_empty_environment"},
+                   c.get_add_object(model_name="iron_box", object_id=0),
+                   {"$type": "send_camera_matrices", "frequency": "always"}])
+    segmentation = Segmentation.from_objects_static(om.objects_static)
+    decoder = DepthDecoder()
+    grid = VoxelGrid(voxel_size=0.05, max_voxels=1000000)
+    for i in range(100):
+        camera.rotate({"x": 0, "y": 3.6, "z": 0})
+        resp = c.communicate([])
+        for j in range(len(resp) - 1):
+            if OutputData.get_data_type_id(resp[j]) == "cama":
+                depth = decoder.decode(images=capture.images["a"], index=0)
+                object_id_map = segmentation.get_object_id_map(np.array(capture.get_pil_images()["a"]["_id"]))
+                grid.integrate_depth(depths=depth, camera_matrices=CameraMatrices(resp[j]), object_id_maps=object_id_map)
+    occupancy_map, positions = grid.get_occupancy_map()
+    c.communicate({"$type": "terminate"})
+    ```
+    """
+
+    # The number of bits per axis in a voxel key.
+    _BITS: int = 21
+    # The offset of each axis in a voxel key, such that negative coordinates are positive.
+    _OFFSET: int = 1 << (_BITS - 1)
+    # The mask of each axis in a voxel key.
+    _MASK: int = (1 << _BITS) - 1
+    # The initial size of the arrays.
+    _INITIAL_CAPACITY: int = 1024
+    # The minimum size of the hash table. This must be a power of 2.
+    _MIN_TABLE_CAPACITY: int = 2048
+    # A hash table entry that has never been used.
+    _EMPTY: int = -1
+    # A hash table entry of a removed voxel.
+    _REMOVED: int = -2
+    # A 64-bit multiplier for Fibonacci hashing.
+    _HASH: np.uint64 = np.uint64(0x9E3779B97F4A7C15)
+
+    def __init__(self, voxel_size: float = 0.1, max_voxels: int = 0, near_plane: float = 0.1, far_plane: float = 100):
+        """
+        :param voxel_size: The size of each voxel in meters.
+        :param max_voxels: The maximum number of voxels. If there are more voxels than this, the voxels that were seen least recently are evicted. If 0, there is no maximum.
+        :param near_plane: The near clipping plane. See command `set_camera_clipping_planes`. This is used in `integrate_depth()`.
+        :param far_plane: The far clipping plane. See command `set_camera_clipping_planes`. This is used in `integrate_depth()`.
+        """
+
+        """:field
+        The size of each voxel in meters.
+        """
+        self.voxel_size: float = voxel_size
+        """:field
+        The maximum number of voxels. If 0, there is no maximum.
+        """
+        self.max_voxels: int = max_voxels
+        """:field
+        The number of frames that have been integrated.
+        """
+        self.frame: int = 0
+        """:field
+        The number of points that have been in each voxel, in the same order as `get_positions()`.
+        """
+        self.counts: np.ndarray = np.zeros(0, dtype=np.int32)
+        """:field
+        The ID of the object in each voxel, in the same order as `get_positions()`. If there isn't a known object in a voxel, the value is -1.
+        """
+        self.object_ids: np.ndarray = np.zeros(0, dtype=np.int32)
+        # The voxel keys.
+        self._keys: np.ndarray = np.zeros(0, dtype=np.int64)
+        # The frame on which each voxel was last seen.
+        self._last_frames: np.ndarray = np.zeros(0, dtype=np.int32)
+        # An open-addressing hash table with linear probing: the voxel key of each entry, and the index of the voxel in the arrays.
+        self._table_keys: np.ndarray = np.zeros(0, dtype=np.int64)
+        self._table_indices: np.ndarray = np.zeros(0, dtype=np.int64)
+        # The number of hash table entries of removed voxels.
+        self._num_removed: int = 0
+        # The arrays. `self._keys`, `self.counts`, etc. are views of the first `len(self)` elements.
+        self._key_buffer: np.ndarray = np.zeros(0, dtype=np.int64)
+        self._count_buffer: np.ndarray = np.zeros(0, dtype=np.int32)
+        self._object_id_buffer: np.ndarray = np.zeros(0, dtype=np.int32)
+        self._last_frame_buffer: np.ndarray = np.zeros(0, dtype=np.int32)
+        # Converts depth images to points.
+        self._point_cloud: PointCloud = PointCloud(near_plane=near_plane, far_plane=far_plane)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def integrate(self, points: np.ndarray, object_ids: Optional[np.ndarray] = None) -> None:
+        """
+        Add points to the voxel grid. Each call is one frame.
+
+        :param points: The worldspace points as an `(N, 3)` array. See: [`PointCloud`](point_cloud.md).
+        :param object_ids: If not None, the ID of the object at each point as an `(N,)` array, or -1 if there isn't an object at the point. See: [`Segmentation.get_object_id_map()`](segmentation.md).
+        """
+
+        self.frame += 1
+        points = np.asarray(points).reshape(-1, 3)
+        if len(points) == 0:
+            return
+        keys = VoxelGrid._get_keys(np.floor(points / self.voxel_size).astype(np.int64))
+        if object_ids is None:
+            object_ids = np.full(len(keys), -1, dtype=np.int32)
+        else:
+            object_ids = np.asarray(object_ids, dtype=np.int32).reshape(-1)
+        # Sort by key. Within a key, points with an object ID come first.
+        order = np.lexsort((object_ids < 0, keys))
+        keys = keys[order]
+        object_ids = object_ids[order]
+        keys, first, counts = np.unique(keys, return_index=True, return_counts=True)
+        object_ids = object_ids[first]
+        counts = counts.astype(np.int32)
+        # Look up each voxel in the hash table.
+        entries = self._find(keys)
+        # Update the voxels that are already in the grid.
+        found = entries >= 0
+        existing = self._table_indices[entries[found]]
+        self.counts[existing] += counts[found]
+        self._last_frames[existing] = self.frame
+        labeled = object_ids[found] >= 0
+        self.object_ids[existing[labeled]] = object_ids[found][labeled]
+        # Append the new voxels.
+        new = ~found
+        num_new = int(np.count_nonzero(new))
+        if num_new > 0:
+            start = len(self._keys)
+            self._resize(start + num_new)
+            self._keys[start:] = keys[new]
+            self.counts[start:] = counts[new]
+            self.object_ids[start:] = object_ids[new]
+            self._last_frames[start:] = self.frame
+            # Keep the hash table at most half full.
+            if (len(self._keys) + self._num_removed) * 2 > len(self._table_keys):
+                self._rehash()
+            else:
+                self._insert(keys=keys[new], indices=np.arange(start, len(self._keys)))
+        # Evict the voxels that were seen least recently and, of those, have the fewest points.
+        num_evicted = len(self._keys) - self.max_voxels
+        if self.max_voxels > 0 and num_evicted > 0:
+            priorities = (self._last_frames.astype(np.int64) << 32) | self.counts
+            self._remove(np.argpartition(priorities, num_evicted - 1)[:num_evicted])
+
+    def integrate_depth(self, depths: Union[np.ndarray, List[np.ndarray]],
+                        camera_matrices: Union[CameraMatrices, np.ndarray, tuple, List[Union[CameraMatrices, np.ndarray, tuple]]],
+                        object_id_maps: Union[np.ndarray, List[np.ndarray]] = None, vfov: float = 54.43222,
+                        stride: int = 1) -> None:
+        """
+        Convert depth images to points and add them to the voxel grid. Points at the far clipping plane are ignored. Each call is one frame.
+
+        :param depths: Depth values as a `(height, width)` array, a `(N, height, width)` array, or a list of `(height, width)` arrays. See: [`DepthDecoder`](depth_decoder.md).
+        :param camera_matrices: The camera matrix per depth image. See: [`PointCloud.get_points()`](point_cloud.md).
+        :param object_id_maps: If not None, the object ID map per depth image with the same shape as `depths`. See: [`Segmentation.get_object_id_map()`](segmentation.md).
+        :param vfov: The field of view. See: [`set_field_of_view`](https://github.com/threedworld-mit/tdw/blob/master/Documentation/api/command_api.md#set_field_of_view)
+        :param stride: Downsample the images by using every `stride`th row and column of pixels.
+        """
+
+        depths = np.asarray(depths, dtype=np.float32)
+        single = depths.ndim == 2
+        if single:
+            depths = depths[np.newaxis]
+            if not isinstance(camera_matrices, list):
+                camera_matrices = [camera_matrices]
+        points = self._point_cloud.get_points(depths=depths, camera_matrices=camera_matrices, vfov=vfov)
+        mask = self._point_cloud.get_mask(depths)
+        if stride > 1:
+            points = points[:, :, ::stride, ::stride]
+            mask = mask[:, ::stride, ::stride]
+        if object_id_maps is not None:
+            object_id_maps = np.asarray(object_id_maps).reshape(depths.shape)
+            if stride > 1:
+                object_id_maps = object_id_maps[:, ::stride, ::stride]
+            object_id_maps = object_id_maps[mask]
+        self.integrate(points=PointCloud.get_masked_points(points=points, mask=mask), object_ids=object_id_maps)
+
+    def get_indices(self) -> np.ndarray:
+        """
+        :return: The integer coordinates of each voxel as an `(N, 3)` array.
+        """
+
+        return np.stack([((self._keys >> (VoxelGrid._BITS * i)) & VoxelGrid._MASK) - VoxelGrid._OFFSET
+                         for i in [2, 1, 0]], axis=1)
+
+    def get_positions(self) -> np.ndarray:
+        """
+        :return: The worldspace position of the center of each voxel as an `(N, 3)` array.
+        """
+
+        return (self.get_indices() + 0.5) * self.voxel_size
+
+    def get_last_frames(self) -> np.ndarray:
+        """
+        :return: The frame on which each voxel was last seen, in the same order as `get_positions()`. See: `self.frame`.
+        """
+
+        return self._last_frames
+
+    def downsample(self, factor: int) -> "VoxelGrid":
+        """
+        :param factor: The downsampling factor. Each voxel in the new grid contains `factor ** 3` voxels of this grid.
+
+        :return: A new voxel grid with a voxel size of `self.voxel_size * factor`. Each voxel's count is the sum of the counts of the voxels it contains.
+        """
+
+        grid = VoxelGrid(voxel_size=self.voxel_size * factor, max_voxels=self.max_voxels,
+                         near_plane=self._point_cloud.near_plane, far_plane=self._point_cloud.far_plane)
+        grid.frame = self.frame
+        if len(self) == 0:
+            return grid
+        keys = VoxelGrid._get_keys(self.get_indices() // factor)
+        # Within a new voxel, voxels with an object ID come first, and then voxels are sorted by key.
+        order = np.lexsort((self._keys, self.object_ids < 0, keys))
+        keys, first, inverse = np.unique(keys[order], return_index=True, return_inverse=True)
+        grid._resize(len(keys))
+        grid._keys[:] = keys
+        grid.counts[:] = np.bincount(inverse, weights=self.counts[order], minlength=len(keys))
+        grid.object_ids[:] = self.object_ids[order][first]
+        grid._last_frames[:] = 0
+        np.maximum.at(grid._last_frames, inverse, self._last_frames[order])
+        grid._rehash()
+        return grid
+
+    def get_occupancy_map(self, floor_height: float = 0.1, max_height: float = 2, min_count: int = 1) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Project the voxel grid onto a 2D grid with the same values as [`OccupancyMap`](../add_ons/occupancy_map.md). Each cell is the size of a voxel.
+
+        | Value | Meaning |
+        | --- | --- |
+        | 0 | The cell is free: there are floor voxels but no voxels above the floor. |
+        | 1 | The cell is occupied: there are voxels between `floor_height` and `max_height`. |
+        | 2 | The cell hasn't been observed. |
+
+        :param floor_height: Voxels below this height are floor voxels.
+        :param max_height: Voxels above this height are ignored.
+        :param min_count: Ignore voxels with fewer than this many points.
+
+        :return: Tuple: The occupancy map as an `(width, length)` array, the worldspace `(x, z)` position of each cell as a `(width, length, 2)` array. These are equivalent to `OccupancyMap.occupancy_map` and `OccupancyMap.positions`.
+        """
+
+        indices = self.get_indices()[self.counts >= min_count]
+        if len(indices) == 0:
+            return np.zeros((0, 0), dtype=np.int32), np.zeros((0, 0, 2), dtype=np.float32)
+        heights = (indices[:, 1] + 0.5) * self.voxel_size
+        indices = indices[heights <= max_height]
+        heights = heights[heights <= max_height]
+        xz = indices[:, [0, 2]]
+        origin = np.min(xz, axis=0)
+        xz -= origin
+        shape = tuple(np.max(xz, axis=0) + 1)
+        occupancy_map = np.full(shape, 2, dtype=np.int32)
+        floor = heights < floor_height
+        occupancy_map[xz[floor, 0], xz[floor, 1]] = 0
+        occupancy_map[xz[~floor, 0], xz[~floor, 1]] = 1
+        positions = np.stack(np.meshgrid(np.arange(shape[0]) + origin[0] + 0.5,
+                                         np.arange(shape[1]) + origin[1] + 0.5,
+                                         indexing="ij"), axis=-1) * self.voxel_size
+        return occupancy_map, positions.astype(np.float32)
+
+    def clear(self) -> None:
+        """
+        Remove every voxel.
+        """
+
+        self.frame = 0
+        self._resize(0)
+        self._rehash()
+
+    def _resize(self, size: int) -> None:
+        """
+        Set the number of voxels in the arrays. If the arrays are too small, their capacity is doubled.
+
+        :param size: The number of voxels.
+        """
+
+        capacity = len(self._key_buffer)
+        if size > capacity:
+            capacity = max(size, capacity * 2, VoxelGrid._INITIAL_CAPACITY)
+            buffers = []
+            for buffer in [self._key_buffer, self._count_buffer, self._object_id_buffer, self._last_frame_buffer]:
+                resized = np.zeros(capacity, dtype=buffer.dtype)
+                resized[:len(self._keys)] = buffer[:len(self._keys)]
+                buffers.append(resized)
+            self._key_buffer, self._count_buffer, self._object_id_buffer, self._last_frame_buffer = buffers
+        self._keys = self._key_buffer[:size]
+        self.counts = self._count_buffer[:size]
+        self.object_ids = self._object_id_buffer[:size]
+        self._last_frames = self._last_frame_buffer[:size]
+
+    def _remove(self, indices: np.ndarray) -> None:
+        """
+        Remove voxels. Each removed voxel is replaced by a voxel from the end of the arrays.
+
+        :param indices: The indices of the voxels that will be removed.
+        """
+
+        self._table_keys[self._find(self._keys[indices])] = VoxelGrid._REMOVED
+        self._num_removed += len(indices)
+        size = len(self._keys) - len(indices)
+        # The removed voxels that aren't at the end of the arrays.
+        holes = indices[indices < size]
+        # The voxels at the end of the arrays that aren't being removed.
+        tail = np.arange(size, len(self._keys))
+        moved = tail[~np.isin(tail, indices)]
+        self._table_indices[self._find(self._keys[moved])] = holes
+        for array in [self._keys, self.counts, self.object_ids, self._last_frames]:
+            array[holes] = array[moved]
+        self._resize(size)
+
+    def _hash(self, keys: np.ndarray) -> np.ndarray:
+        """
+        :param keys: Voxel keys.
+
+        :return: The first hash table entry of each key.
+        """
+
+        bits = len(self._table_keys).bit_length() - 1
+        return ((keys.astype(np.uint64) * VoxelGrid._HASH) >> np.uint64(64 - bits)).astype(np.int64)
+
+    def _find(self, keys: np.ndarray) -> np.ndarray:
+        """
+        :param keys: Voxel keys.
+
+        :return: The hash table entry of each key, or -1 if the key isn't in the hash table.
+        """
+
+        entries = np.full(len(keys), -1, dtype=np.int64)
+        if len(self._table_keys) == 0:
+            return entries
+        mask = len(self._table_keys) - 1
+        # Probe the hash table for every key at the same time.
+        active = np.arange(len(keys))
+        probes = self._hash(keys)
+        while len(active) > 0:
+            table_keys = self._table_keys[probes]
+            hit = table_keys == keys[active]
+            entries[active[hit]] = probes[hit]
+            # Keep probing until the key or an empty entry is found.
+            more = ~hit & (table_keys != VoxelGrid._EMPTY)
+            active = active[more]
+            probes = (probes[more] + 1) & mask
+        return entries
+
+    def _insert(self, keys: np.ndarray, indices: np.ndarray) -> None:
+        """
+        Add keys to the hash table. The keys must be unique and not already in the hash table.
+
+        :param keys: Voxel keys.
+        :param indices: The index of each voxel in the arrays.
+        """
+
+        mask = len(self._table_keys) - 1
+        active = np.arange(len(keys))
+        probes = self._hash(keys)
+        while len(active) > 0:
+            empty = np.flatnonzero(self._table_keys[probes] == VoxelGrid._EMPTY)
+            # If more than one key probes the same empty entry, the first key gets the entry.
+            entries, first = np.unique(probes[empty], return_index=True)
+            inserted = empty[first]
+            self._table_keys[entries] = keys[active[inserted]]
+            self._table_indices[entries] = indices[active[inserted]]
+            more = np.ones(len(active), dtype=bool)
+            more[inserted] = False
+            active = active[more]
+            probes = (probes[more] + 1) & mask
+
+    def _rehash(self) -> None:
+        """
+        Rebuild the hash table from the voxel keys. The hash table will be at most a quarter full.
+        """
+
+        capacity = VoxelGrid._MIN_TABLE_CAPACITY
+        while capacity < len(self._keys) * 4:
+            capacity *= 2
+        self._table_keys = np.full(capacity, VoxelGrid._EMPTY, dtype=np.int64)
+        self._table_indices = np.zeros(capacity, dtype=np.int64)
+        self._num_removed = 0
+        self._insert(keys=self._keys, indices=np.arange(len(self._keys)))
+
+    @staticmethod
+    def _get_keys(indices: np.ndarray) -> np.ndarray:
+        """
+        :param indices: The integer coordinates of voxels as an `(N, 3)` int64 array.
+
+        :return: The key of each voxel as an `(N,)` int64 array.
+        """
+
+        indices = indices + VoxelGrid._OFFSET
+        return (indices[:, 0] << (VoxelGrid._BITS * 2)) | (indices[:, 1] << VoxelGrid._BITS) | indices[:, 2]
@@ -1,9 +1,14 @@
 import json
+import os
+import mmap
+from hashlib import sha1
 from typing import List, Dict, TypeVar, Union, Generic, Optional, Tuple
 import pkg_resources
 from pathlib import Path
 import platform
 from secrets import token_hex
+from tdw.version import __version__
+from tdw.backend.paths import LIBRARIAN_CACHE_DIR
 from tdw.collision_data.trigger_collider_shape import TriggerColliderShape
 from tdw.scene_data.room import Room
 from tdw.scene_data.interior_region import InteriorRegion
@@ -307,6 +312,10 @@ class VisualEffectRecord(_Record):
 
 
 T = TypeVar("T", bound=_Record)
+# The format of librarian cache files. Increment this whenever the format changes.
+_LIBRARY_CACHE_FORMAT = 2
+# The maximum number of cached results of `search_records(search)` per librarian.
+_MAX_NUM_SEARCHES = 256
 
 
 class _Librarian(Generic[T]):
@@ -314,9 +323,10 @@ class _Librarian(Generic[T]):
     Base abstract class for a metadata librarian.
     """
 
-    def __init__(self, library: str = ""):
+    def __init__(self, library: str = "", cache: bool = True):
         """
         :param library: The absolute path to the library .json file. If empty, a default path in the tdw module will be used.
+        :param cache: If True, load the records from a cache file, which is much faster than parsing the .json file. The cache file is created the first time the library is loaded and is rebuilt whenever the .json file or the version of TDW changes. Each record is stored as JSON and is read from the cache file only when it's needed. If the cache file can't be read, the .json file is parsed instead.
         """
 
         if library == "":
@@ -328,29 +338,54 @@ class _Librarian(Generic[T]):
             else:
                 self.library = library
 
-        with open(self.library, "rt") as f:
-            self.data = json.load(f)
+        # The library data. This is loaded from the .json file only when it's needed.
+        self._data: Optional[dict] = None
+        # The records. If this is None, the records haven't been read from the cache file yet.
+        self._records: Optional[List[T]] = None
+        # Records per name.
+        self._names: Dict[str, T] = dict()
+        # Cached results of `search_records(search)`. Key = The search string. This holds at most `_MAX_NUM_SEARCHES` results.
+        self._searches: Dict[str, List[T]] = dict()
+        # The memory-mapped cache file.
+        self._cache: Optional[mmap.mmap] = None
+        # The names of the records in the cache file, in order.
+        self._cache_names: List[str] = list()
+        # The byte offset and length of each record in the cache file. Key = The name of the record.
+        self._cache_offsets: Dict[str, Tuple[int, int]] = dict()
+        if cache and self._read_cache():
+            return
+        self._set_records(self._get_json_records())
+        if cache:
+            self._write_cache()
+
+    @property
+    def data(self) -> dict:
+        """
+        :return: The library .json data. This is loaded only when it's needed.
+        """
 
-        self.description = self.data["description"]
+        if self._data is None:
+            with open(self.library, "rt") as f:
+                self._data = json.load(f)
+        return self._data
 
-        self.records: List[T] = []
-        for key in self.data["records"]:
-            record = self._generate_record(self.data["records"][key])
-            temp_urls = dict()
-            # De-localize URLs
-            for p in record.urls:
-                # Set an absolute path.
-                absolute = False
-                for prefix in ["file:///", "http://", "https://"]:
-                    if record.urls[p].startswith(prefix):
-                        temp_urls[p] = record.urls[p]
-                        absolute = True
-                # De-localize a local path.
-                if not absolute:
-                    temp_urls[p] = f"file:///{str(Path(self.library).parent.joinpath(record.urls[p]).resolve())}"
-                temp_urls[p] = temp_urls[p].replace("\\", "/")
-            record.urls = temp_urls
-            self.records.append(record)
+    @data.setter
+    def data(self, value: dict) -> None:
+        self._data = value
+
+    @property
+    def records(self) -> List[T]:
+        """
+        :return: A list of all records. If the library was loaded from a cache file, every record is read from the cache file the first time this is called.
+        """
+
+        self._load_records()
+        return self._records
+
+    @records.setter
+    def records(self, value: List[T]) -> None:
+        self._clear_indices()
+        self._set_records(value)
 
     def get_default_library(self) -> str:
         """
@@ -389,12 +424,18 @@ class _Librarian(Generic[T]):
         :param name: The name of the record.
         """
 
-        records = [r for r in self.records if r.name == name]
-
-        if len(records) == 0:
-            return None
+        if name in self._names:
+            return self._names[name]
+        # Read only this record from the cache file.
+        elif self._records is None and name in self._cache_offsets:
+            try:
+                return self._read_cached_record(name)
+            # The cache file is corrupted. Parse the .json file instead.
+            except (ValueError, KeyError, TypeError):
+                self._reload_json_records()
+                return self._names.get(name)
         else:
-            return records[0]
+            return None
 
     def search_records(self, search: str) -> List[T]:
         """
@@ -403,7 +444,17 @@ class _Librarian(Generic[T]):
         :param search: The string to search for in the model name.
         """
 
-        return [r for r in self.records if search in r.name]
+        if search not in self._searches:
+            # Search the names in the cache file so that only the matching records are read.
+            if self._records is None:
+                records = [self.get_record(name) for name in self._cache_names if search in name]
+            else:
+                records = [r for r in self.records if search in r.name]
+            # Forget the oldest search.
+            if len(self._searches) >= _MAX_NUM_SEARCHES:
+                del self._searches[next(iter(self._searches))]
+            self._searches[search] = records
+        return self._searches[search][:]
 
     def add_or_update_record(self, record: T, overwrite: bool, write: bool = True, quiet: bool = True) -> bool:
         """
@@ -424,15 +475,19 @@ class _Librarian(Generic[T]):
                 print(f"\t{p}")
 
         added = False
-        if len([r for r in self.records if r.name == record.name]) > 0:
+        if record.name in self._load_records():
             # If this record exists and we want to overwrite, update the record.
             if overwrite:
-                records_list = [r for r in self.records if r.name != record.name]
-                records_list.append(record)
+                old_record = self._names[record.name]
+                self._remove_from_indices(old_record)
+                self.records.remove(old_record)
+                self.records.append(record)
+                self._add_to_indices(record)
                 added = True
         # Add the record.
         else:
             self.records.append(record)
+            self._add_to_indices(record)
             added = True
 
         # Write to disk.
@@ -459,11 +514,12 @@ class _Librarian(Generic[T]):
         else:
             record_name = record.name
 
-        records_list = [r for r in self.records if r.name != record_name]
-        removed = len(records_list) < len(self.records)
+        removed = record_name in self._load_records()
         if removed:
             del self.data["records"][record_name]
-            self.records = records_list
+            old_record = self._names[record_name]
+            self._remove_from_indices(old_record)
+            self.records.remove(old_record)
         if write:
             self.write()
 
@@ -490,7 +546,7 @@ class _Librarian(Generic[T]):
         :param overwrite: If true, raise an exception if the record doesn't exist. Otherwise, overwrite. If False: If the record exists, suggest a new name.
         """
 
-        record_names = [r.name for r in self.records]
+        record_names = self._load_records()
 
         if overwrite and name not in record_names:
             return False, name, [f"Can't override a record named {name} because no such record exists!"]
@@ -523,12 +579,240 @@ class _Librarian(Generic[T]):
 
         raise Exception("Not defined.")
 
+    def _get_json_records(self) -> List[T]:
+        """
+        Parse the .json file.
+
+        :return: A list of records with absolute URLs.
+        """
+
+        self.description = self.data["description"]
+        records: List[T] = []
+        for key in self.data["records"]:
+            record = self._generate_record(self.data["records"][key])
+            temp_urls = dict()
+            # De-localize URLs
+            for p in record.urls:
+                # Set an absolute path.
+                absolute = False
+                for prefix in ["file:///", "http://", "https://"]:
+                    if record.urls[p].startswith(prefix):
+                        temp_urls[p] = record.urls[p]
+                        absolute = True
+                # De-localize a local path.
+                if not absolute:
+                    temp_urls[p] = f"file:///{str(Path(self.library).parent.joinpath(record.urls[p]).resolve())}"
+                temp_urls[p] = temp_urls[p].replace("\\", "/")
+            record.urls = temp_urls
+            records.append(record)
+        return records
+
+    def _load_records(self) -> Dict[str, T]:
+        """
+        Make sure that every record has been read from the cache file.
+
+        :return: A dictionary of every record. Key = The name of the record. Value = The record.
+        """
+
+        if self._records is None:
+            try:
+                self._set_records([self._read_cached_record(name) for name in self._cache_names])
+            except (ValueError, KeyError, TypeError):
+                self._reload_json_records()
+        return self._names
+
+    def _reload_json_records(self) -> None:
+        """
+        Replace the records read from a cache file that couldn't be read with the records in the .json file, and rebuild the cache file.
+        """
+
+        self._clear_indices()
+        self._set_records(self._get_json_records())
+        self._write_cache()
+
+    def _set_records(self, records: List[T]) -> None:
+        """
+        Set the list of records and index them.
+
+        :param records: The records.
+        """
+
+        self._records = records
+        self._searches.clear()
+        for record in self._records:
+            self._add_to_indices(record)
+        # The cache file isn't needed anymore.
+        if self._cache is not None:
+            self._cache.close()
+            self._cache = None
+            self._cache_offsets.clear()
+
+    def _get_cache_path(self) -> Tuple[Path, str]:
+        """
+        :return: Tuple: The path to the cache file, the filename prefix that is shared by every cache file of this library.
+        """
+
+        path = Path(self.library).resolve()
+        stat = path.stat()
+        prefix = f"{path.stem}_{sha1(str(path).encode('utf-8')).hexdigest()[:8]}"
+        key = sha1(f"{stat.st_mtime_ns}_{stat.st_size}_{__version__}_{_LIBRARY_CACHE_FORMAT}".encode('utf-8')).hexdigest()[:8]
+        return LIBRARIAN_CACHE_DIR.joinpath(f"{prefix}_{key}.bin"), prefix
+
+    def _read_cache(self) -> bool:
+        """
+        Read the header of the cache file and memory-map the rest of the file. Records are read only when they're needed.
+
+        :return: True if the cache file exists and could be read.
+        """
+
+        try:
+            cache_path, prefix = self._get_cache_path()
+            if not cache_path.exists():
+                return False
+            with cache_path.open("rb") as f:
+                self._cache = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            header_length = int.from_bytes(self._cache[:8], byteorder="little")
+            header = json.loads(self._cache[8: 8 + header_length])
+            if len(header["names"]) != len(header["lengths"]):
+                raise ValueError(f"Invalid cache file: {cache_path}")
+        except (OSError, ValueError, KeyError, TypeError):
+            if self._cache is not None:
+                self._cache.close()
+                self._cache = None
+            return False
+        self.description = header["description"]
+        self._cache_names = header["names"]
+        offset = 8 + header_length
+        for name, length in zip(self._cache_names, header["lengths"]):
+            self._cache_offsets[name] = (offset, length)
+            offset += length
+        return True
+
+    def _read_cached_record(self, name: str) -> T:
+        """
+        Read a record from the cache file.
+
+        :param name: The name of the record.
+
+        :return: The record.
+        """
+
+        if name in self._names:
+            return self._names[name]
+        offset, length = self._cache_offsets[name]
+        record = self._generate_record(json.loads(self._cache[offset: offset + length]))
+        self._names[name] = record
+        return record
+
+    def _write_cache(self) -> None:
+        """
+        Write the records to a cache file. Each record is serialized separately so that it can be read without reading any other record.
+        """
+
+        try:
+            cache_path, prefix = self._get_cache_path()
+            serialized = [json.dumps(record.get_serializable(), cls=_Encoder).encode("utf-8") for record in self._records]
+            header = json.dumps({"description": self.description,
+                                 "names": [record.name for record in self._records],
+                                 "lengths": [len(s) for s in serialized]}).encode("utf-8")
+            if not LIBRARIAN_CACHE_DIR.exists():
+                LIBRARIAN_CACHE_DIR.mkdir(parents=True)
+            # Remove out-of-date cache files.
+            for path in LIBRARIAN_CACHE_DIR.glob(f"{prefix}_*.bin"):
+                if path.name != cache_path.name:
+                    path.unlink()
+            # Write to a temporary file and then rename it so that other processes never read a partial file.
+            temp_path = cache_path.parent.joinpath(f"{cache_path.name}.{token_hex(4)}.tmp")
+            with temp_path.open("wb") as f:
+                f.write(len(header).to_bytes(8, byteorder="little"))
+                f.write(header)
+                for s in serialized:
+                    f.write(s)
+            os.replace(str(temp_path), str(cache_path))
+        # If the cache can't be written (for example, if the directory is read-only), parse the .json file next time.
+        except (OSError, TypeError, ValueError):
+            pass
+
+    def _add_to_indices(self, record: T) -> None:
+        """
+        Add a record to the indices. Subclasses can override this to add secondary indices.
+
+        :param record: The record.
+        """
+
+        if record.name not in self._names:
+            self._names[record.name] = record
+        self._searches.clear()
+
+    def _clear_indices(self) -> None:
+        """
+        Remove every record from the indices. Subclasses can override this to clear secondary indices.
+        """
+
+        self._names.clear()
+        self._searches.clear()
+
+    def _remove_from_indices(self, record: T) -> None:
+        """
+        Remove a record from the indices. Subclasses can override this to remove it from secondary indices.
+
+        :param record: The record.
+        """
+
+        if record.name in self._names and self._names[record.name] is record:
+            del self._names[record.name]
+        self._searches.clear()
+
+    @staticmethod
+    def _add_to_index(index: Dict[str, List[T]], key: str, record: T) -> None:
+        """
+        Add a record to a secondary index.
+
+        :param index: The index. Key = A record attribute value. Value = A list of records, in the same order as `self.records`.
+        :param key: The key.
+        :param record: The record.
+        """
+
+        if key in index:
+            index[key].append(record)
+        else:
+            index[key] = [record]
+
+    @staticmethod
+    def _remove_from_index(index: Dict[str, List[T]], key: str, record: T) -> None:
+        """
+        Remove a record from a secondary index.
+
+        :param index: The index. Key = A record attribute value. Value = A list of records.
+        :param key: The key.
+        :param record: The record.
+        """
+
+        if key in index and record in index[key]:
+            index[key].remove(record)
+            if len(index[key]) == 0:
+                del index[key]
+
 
 class ModelLibrarian(_Librarian[ModelRecord]):
     """
     Librarian class for model metadata.
     """
 
+    def __init__(self, library: str = "", cache: bool = True):
+        """
+        :param library: The absolute path to the library .json file. If empty, a default path in the tdw module will be used.
+        :param cache: If True, load the records from a cache file, which is much faster than parsing the .json file. The cache file is created the first time the library is loaded and is rebuilt whenever the .json file or the version of TDW changes. Each record is stored as JSON and is read from the cache file only when it's needed. If the cache file can't be read, the .json file is parsed instead.
+        """
+
+        # Records per wnid.
+        self._wnids: Dict[str, List[ModelRecord]] = dict()
+        # Records per wcategory.
+        self._wcategories: Dict[str, List[ModelRecord]] = dict()
+        # Flex-compatible records.
+        self._flex: List[ModelRecord] = list()
+        super().__init__(library=library, cache=cache)
+
     def get_model_wnids_and_wcategories(self) -> Dict[str, str]:
         """
         Returns a dictionary of all model wnids and categories.
@@ -549,7 +833,8 @@ class ModelLibrarian(_Librarian[ModelRecord]):
         Returns a list of all unique wnids in the database, sorted numerically.
         """
 
-        return sorted(set([r.wnid for r in self.records]))
+        self._load_records()
+        return sorted(self._wnids.keys())
 
     def get_all_models_in_wnid(self, wnid: str) -> List[ModelRecord]:
         """
@@ -558,14 +843,32 @@ class ModelLibrarian(_Librarian[ModelRecord]):
         :param wnid: The WordNet ID.
         """
 
-        return [r for r in self.records if r.wnid == wnid]
+        self._load_records()
+        if wnid in self._wnids:
+            return self._wnids[wnid][:]
+        else:
+            return []
+
+    def get_all_models_in_wcategory(self, wcategory: str) -> List[ModelRecord]:
+        """
+        Returns a list of all models with the same wcategory.
+
+        :param wcategory: The WordNet category.
+        """
+
+        self._load_records()
+        if wcategory in self._wcategories:
+            return self._wcategories[wcategory][:]
+        else:
+            return []
 
     def get_flex_models(self) -> List[ModelRecord]:
         """
         Returns a list of all Flex-compatible models.
         """
 
-        return [r for r in self.records if r.flex]
+        self._load_records()
+        return self._flex[:]
 
     @staticmethod
     def get_library_filenames() -> List[str]:
@@ -574,12 +877,42 @@ class ModelLibrarian(_Librarian[ModelRecord]):
     def _generate_record(self, data: dict) -> T:
         return ModelRecord(data)
 
+    def _add_to_indices(self, record: ModelRecord) -> None:
+        super()._add_to_indices(record)
+        _Librarian._add_to_index(index=self._wnids, key=record.wnid, record=record)
+        _Librarian._add_to_index(index=self._wcategories, key=record.wcategory, record=record)
+        if record.flex:
+            self._flex.append(record)
+
+    def _clear_indices(self) -> None:
+        super()._clear_indices()
+        self._wnids.clear()
+        self._wcategories.clear()
+        self._flex.clear()
+
+    def _remove_from_indices(self, record: ModelRecord) -> None:
+        super()._remove_from_indices(record)
+        _Librarian._remove_from_index(index=self._wnids, key=record.wnid, record=record)
+        _Librarian._remove_from_index(index=self._wcategories, key=record.wcategory, record=record)
+        if record in self._flex:
+            self._flex.remove(record)
+
 
 class MaterialLibrarian(_Librarian[MaterialRecord]):
     """
     Librarian class for material metadata.
     """
 
+    def __init__(self, library: str = "", cache: bool = True):
+        """
+        :param library: The absolute path to the library .json file. If empty, a default path in the tdw module will be used.
+        :param cache: If True, load the records from a cache file, which is much faster than parsing the .json file. The cache file is created the first time the library is loaded and is rebuilt whenever the .json file or the version of TDW changes. Each record is stored as JSON and is read from the cache file only when it's needed. If the cache file can't be read, the .json file is parsed instead.
+        """
+
+        # Records per material type.
+        self._types: Dict[str, List[MaterialRecord]] = dict()
+        super().__init__(library=library, cache=cache)
+
     def get_all_materials_of_type(self, material_type: str) -> List[MaterialRecord]:
         """
         Returns a list of all material records of a given type.
@@ -587,14 +920,19 @@ class MaterialLibrarian(_Librarian[MaterialRecord]):
         :param material_type: The type of material.
         """
 
-        return [r for r in self.records if r.type == material_type]
+        self._load_records()
+        if material_type in self._types:
+            return self._types[material_type][:]
+        else:
+            return []
 
     def get_material_types(self) -> List[str]:
         """
         Returns a list of all types of materials, sorted alphabetically.
         """
 
-        return sorted(set([r.type for r in self.records]))
+        self._load_records()
+        return sorted(self._types.keys())
 
     @staticmethod
     def get_library_filenames() -> List[str]:
@@ -603,6 +941,18 @@ class MaterialLibrarian(_Librarian[MaterialRecord]):
     def _generate_record(self, data: dict) -> T:
         return MaterialRecord(data)
 
+    def _add_to_indices(self, record: MaterialRecord) -> None:
+        super()._add_to_indices(record)
+        _Librarian._add_to_index(index=self._types, key=record.type, record=record)
+
+    def _clear_indices(self) -> None:
+        super()._clear_indices()
+        self._types.clear()
+
+    def _remove_from_indices(self, record: MaterialRecord) -> None:
+        super()._remove_from_indices(record)
+        _Librarian._remove_from_index(index=self._types, key=record.type, record=record)
+
 
 class SceneLibrarian(_Librarian[SceneRecord]):
     """
@@ -83,20 +83,34 @@ class OutputDataUndefinedError(Exception):
 
 class OutputData(object):
     def __init__(self, b):
-        self.bytes = bytearray(b)
+        # A `memoryview` is a zero-copy ZMQ frame (see `Controller(zero_copy=True)`). Don't copy it.
+        # Numpy arrays returned by this object are views of the buffer.
+        if isinstance(b, memoryview):
+            self.bytes = b
+        # Otherwise, copy the bytes into a writable buffer.
+        else:
+            self.bytes = bytearray(b)
         self.data = self.get_data()
 
     def get_data(self):
         raise OutputDataUndefinedError("Undefined!")
 
+    def copy(self):
+        """
+        Returns a copy of this output data with its own writable buffer.
+        Call this if you need to modify the data or retain it after the frame.
+        """
+
+        return self.__class__(bytearray(self.bytes))
+
     @staticmethod
     def get_data_type_id(b: bytes) -> str:
         """
         Returns the ID of the serialized object.
-        :param b: A byte array.
+        :param b: A byte array or a memoryview.
         """
 
-        return b[4:8].decode('utf-8')
+        return str(b[4:8], 'utf-8')
 
     @staticmethod
     def _get_vector3(constructor) -> Tuple[float, float, float]:
@@ -201,6 +215,18 @@ class Transforms(OutputData):
     def get_rotation(self, index: int) -> np.ndarray:
         return self._rotations[index]
 
+    def get_ids(self) -> np.ndarray:
+        return self._ids
+
+    def get_positions(self) -> np.ndarray:
+        return self._positions
+
+    def get_rotations(self) -> np.ndarray:
+        return self._rotations
+
+    def get_forwards(self) -> np.ndarray:
+        return self._forwards
+
 
 class Rigidbodies(OutputData):
     def __init__(self, b):
@@ -228,6 +254,18 @@ class Rigidbodies(OutputData):
     def get_sleeping(self, index: int) -> bool:
         return bool(self._sleeping[index])
 
+    def get_ids(self) -> np.ndarray:
+        return self._ids
+
+    def get_velocities(self) -> np.ndarray:
+        return self._velocities
+
+    def get_angular_velocities(self) -> np.ndarray:
+        return self._angular_velocities
+
+    def get_sleeping_states(self) -> np.ndarray:
+        return self._sleeping
+
 
 class StaticRigidbodies(OutputData):
     def __init__(self, b):
@@ -297,6 +335,12 @@ class Bounds(OutputData):
     def get_center(self, index: int) -> np.ndarray:
         return self._bounds_positions[index][6]
 
+    def get_ids(self) -> np.ndarray:
+        return self._ids
+
+    def get_bounds_positions(self) -> np.ndarray:
+        return self._bounds_positions
+
 
 class Images(OutputData):
     PASS_MASKS = {PassMask.PassMask._img: "_img",
@@ -720,8 +764,8 @@ class Version:
     def __init__(self, b):
         self._standalone: bool = b[8] == b'\x01'
         version_length = int(b[9])
-        self._tdw_version: str = b[10: 10 + version_length].decode('utf-8')
-        self._unity_version = b[10 + version_length:].decode('utf-8')
+        self._tdw_version: str = str(b[10: 10 + version_length], 'utf-8')
+        self._unity_version = str(b[10 + version_length:], 'utf-8')
 
     def get_unity_version(self) -> str:
         return self._unity_version
@@ -1944,7 +1988,7 @@ class AvatarIds:
         lengths: np.ndarray = np.frombuffer(b[12:offset], dtype=np.int32)
         self._ids: List[str] = list()
         for length in lengths:
-            self._ids.append(b[offset: offset + length].decode('utf8'))
+            self._ids.append(str(b[offset: offset + length], 'utf8'))
             offset += length
         self._types: np.ndarray = np.frombuffer(b[offset:], dtype=np.uint8)
 
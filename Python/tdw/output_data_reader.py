@@ -0,0 +1,119 @@
+import mmap
+from pathlib import Path
+from typing import List, Optional
+import numpy as np
+from tdw.type_aliases import PATH
+
+
+class OutputDataReader:
+    """
+    Read output data saved by [`OutputDataWriter`](add_ons/output_data_writer.md) with `binary=True`.
+
+    The output data log is a single append-only file. Each frame is the number of output data buffers (a 32-bit integer), the size of each buffer (32-bit integers), and then the buffers. The index file contains the offset of each frame in the log (64-bit integers). The log is memory-mapped and frames are read using the index, which means that frames can be read in any order without reading the rest of the log. If the index is missing or incomplete (for example, because the simulation crashed), the unindexed part of the log is scanned once.
+
+    ```python
+    from tdw.output_data_reader import OutputDataReader
+    from tdw.response import Response
+
+    reader = OutputDataReader(path="D:/output_data")
+    print(len(reader))
+    # Read frame 42. This is the same as `resp` in `resp = c.communicate(commands)`.
+    resp = reader.get_frame(42)
+    transforms = Response.get_response(resp).get_output_data("tran")
+    reader.close()
+    ```
+    """
+
+    """:class_var
+    The name of the output data log file.
+    """
+    DATA_FILENAME: str = "output_data.bin"
+    """:class_var
+    The name of the index file.
+    """
+    INDEX_FILENAME: str = "output_data.index"
+
+    def __init__(self, path: PATH):
+        """
+        :param path: The path to the directory containing the output data log.
+        """
+
+        if isinstance(path, str):
+            """:field
+            The path to the directory containing the output data log.
+            """
+            self.path: Path = Path(path)
+        else:
+            self.path: Path = path
+        data_path = self.path.joinpath(OutputDataReader.DATA_FILENAME)
+        if not data_path.exists():
+            raise Exception(f"No output data log found in: {self.path.resolve()}")
+        self._size: int = data_path.stat().st_size
+        # An empty file can't be memory-mapped.
+        if self._size > 0:
+            with data_path.open("rb") as f:
+                self._mmap: Optional[mmap.mmap] = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            self._mmap = None
+        index_path = self.path.joinpath(OutputDataReader.INDEX_FILENAME)
+        if index_path.exists():
+            offsets = np.fromfile(str(index_path.resolve()), dtype="<u8").tolist()
+        else:
+            offsets = list()
+        # Remove frames that were indexed but not completely written.
+        while len(offsets) > 0 and self._get_frame_end(offsets[-1]) < 0:
+            offsets.pop()
+        # Scan the frames that weren't indexed.
+        offset = 0 if len(offsets) == 0 else self._get_frame_end(offsets[-1])
+        while True:
+            end = self._get_frame_end(offset)
+            if end < 0:
+                break
+            offsets.append(offset)
+            offset = end
+        # The offset of each frame.
+        self._offsets: List[int] = offsets
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    def get_frame(self, frame: int) -> List[bytes]:
+        """
+        :param frame: The frame number, where 0 is the first frame in the log. Negative values are counted from the end of the log.
+
+        :return: The output data, equivalent to the return value of a `c.communicate(commands)` call. If types of output data were ignored by `OutputDataWriter`, they aren't included.
+        """
+
+        offset = self._offsets[frame]
+        num_buffers = int.from_bytes(self._mmap[offset: offset + 4], "little")
+        sizes = np.frombuffer(self._mmap, dtype="<u4", count=num_buffers, offset=offset + 4)
+        ends = (offset + 4 + 4 * num_buffers + np.cumsum(sizes, dtype=np.int64)).tolist()
+        starts = [offset + 4 + 4 * num_buffers] + ends[:-1]
+        return [self._mmap[start: end] for start, end in zip(starts, ends)]
+
+    def close(self) -> None:
+        """
+        Close the memory-mapped log.
+        """
+
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+
+    def _get_frame_end(self, offset: int) -> int:
+        """
+        :param offset: The offset of a frame.
+
+        :return: The offset of the end of the frame, or -1 if the frame wasn't completely written.
+        """
+
+        if offset + 4 > self._size:
+            return -1
+        num_buffers = int.from_bytes(self._mmap[offset: offset + 4], "little")
+        header_end = offset + 4 + 4 * num_buffers
+        if header_end > self._size:
+            return -1
+        end = header_end + int(np.frombuffer(self._mmap, dtype="<u4", count=num_buffers, offset=offset + 4).sum(dtype=np.int64))
+        if end > self._size:
+            return -1
+        return end
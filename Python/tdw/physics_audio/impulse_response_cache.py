@@ -0,0 +1,105 @@
+from collections import OrderedDict
+from typing import Hashable, Optional
+import numpy as np
+
+
+class ImpulseResponseCache:
+    """
+    This class is used only in PyImpact, which has been deprecated. See: [`Clatter`](../add_ons/clatter.md).
+
+    A least-recently-used cache of synthesized sounds, for example the sum of an object's modes or the impulse response of two objects. The cache has a maximum size in bytes; when it is full, the least recently used sounds are removed.
+
+    ```python
+    import numpy as np
+    from tdw.physics_audio.impulse_response_cache import ImpulseResponseCache
+
+    cache = ImpulseResponseCache(max_bytes=1024 * 1024)
+    cache.put(key=("metal_3", 0.45, 2, 0), value=np.zeros(44100))
+    print(cache.get(key=("metal_3", 0.45, 2, 0)) is not None)  # True
+    print(cache.get(key=("glass_1", 0.45, 0, 0)) is not None)  # False
+    print(cache.hits, cache.misses)  # 1 1
+    ```
+    """
+
+    def __init__(self, max_bytes: int):
+        """
+        :param max_bytes: The maximum total size of the cached sounds in bytes. If 0, nothing is cached.
+        """
+
+        """:field
+        The maximum total size of the cached sounds in bytes. If 0, nothing is cached.
+        """
+        self.max_bytes: int = max_bytes
+        """:field
+        The current total size of the cached sounds in bytes.
+        """
+        self.num_bytes: int = 0
+        """:field
+        The number of times `get(key)` returned a cached sound.
+        """
+        self.hits: int = 0
+        """:field
+        The number of times `get(key)` didn't find a cached sound.
+        """
+        self.misses: int = 0
+        """:field
+        The number of sounds that were removed because the cache was full.
+        """
+        self.evictions: int = 0
+        # The cached sounds, from least recently used to most recently used.
+        self._sounds: OrderedDict = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._sounds)
+
+    def get(self, key: Hashable) -> Optional[np.ndarray]:
+        """
+        :param key: The key.
+
+        :return: The cached sound, or None if there isn't a sound with this key. Don't modify the sound in-place.
+        """
+
+        if key in self._sounds:
+            self._sounds.move_to_end(key)
+            self.hits += 1
+            return self._sounds[key]
+        else:
+            self.misses += 1
+            return None
+
+    def put(self, key: Hashable, value: np.ndarray) -> None:
+        """
+        Add a sound to the cache. If the cache is full, remove the least recently used sounds. If the sound is bigger than `max_bytes`, it isn't cached.
+
+        :param key: The key.
+        :param value: The sound.
+        """
+
+        if value.nbytes > self.max_bytes:
+            return
+        if key in self._sounds:
+            self.num_bytes -= self._sounds.pop(key).nbytes
+        self._sounds[key] = value
+        self.num_bytes += value.nbytes
+        while self.num_bytes > self.max_bytes:
+            self.num_bytes -= self._sounds.popitem(last=False)[1].nbytes
+            self.evictions += 1
+
+    def get_hit_rate(self) -> float:
+        """
+        :return: The fraction of `get(key)` calls that returned a cached sound.
+        """
+
+        total = self.hits + self.misses
+        return 0 if total == 0 else self.hits / total
+
+    def clear(self) -> None:
+        """
+        Remove every cached sound and reset the statistics.
+        """
+
+        self._sounds.clear()
+        self.num_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
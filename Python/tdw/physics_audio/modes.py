@@ -1,4 +1,5 @@
 import math
+from typing import List
 import numpy as np
 
 
@@ -7,8 +8,25 @@ class Modes:
     This class is used only in PyImpact, which has been deprecated. See: [`Clatter`](../add_ons/clatter.md).
 
     Resonant mode properties: Frequencies, powers, and times.
+
+    ## Batch synthesis
+
+    `Modes.sum_modes_batch()` synthesizes several sounds in one call. Each sound is the sum of the modes of one or more `Modes` objects; for example, an impact sound is the sum of the modes of two colliding objects. In this example, `modes_0`, `modes_1`, `modes_2`, and `modes_3` are `Modes` objects:
+
+    ```python
+    from tdw.physics_audio.modes import Modes
+
+    sounds = Modes.sum_modes_batch(modes=[[modes_0, modes_1], [modes_2, modes_3]],
+                                   resonances=[[0.45, 0.45], [0.2, 0.6]])
+    ```
+
+    The result is the same as calling `sum_modes()` per `Modes` object and then adding the results with `Modes.mode_add()`, but every mode of every sound is evaluated at once.
     """
 
+    # Modes are synthesized in blocks of this many samples.
+    # Each block is the state of each mode at the start of the block multiplied by the oscillation of each mode within a block.
+    _BLOCK_SIZE: int = 128
+
     def __init__(self, frequencies: np.ndarray, powers: np.ndarray, decay_times: np.ndarray):
         """
         :param frequencies: A numpy array of mode frequencies in Hz.
@@ -39,28 +57,75 @@ class Modes:
         :return A synthesized sound.
         """
 
-        synth_sound: np.ndarray = np.empty
-        # Scroll through modes.
-        for i in range(len(self.frequencies)):
-            H_dB = 80 + self.powers[i]
-            L_ms = self.decay_times[i] * H_dB / 60
-            mLen = math.ceil(L_ms / 1e3 * fs)
-            # if mode length is greater than the current time-series we have had make our time series longer
-            max_len = mLen
-            if mLen > max_len:
-                max_len = mLen
-            tt = np.arange(0, max_len) / fs
-            # synthesize a sinusoid
-            mode = np.cos(2 * math.pi * self.frequencies[i] * tt)
-            mode = mode * (10 ** (self.powers[i] / 20))
-            dcy = tt * (60 / (self.decay_times[i] * resonance / 1e3))
-            env = 10 ** (-dcy / 20)
-            mode = mode * env
-            if i == 0:
-                synth_sound = mode
-            else:
-                synth_sound = Modes.mode_add(synth_sound, mode)
-        return synth_sound
+        return Modes.sum_modes_batch(modes=[[self]], resonances=[[resonance]], fs=fs)[0]
+
+    @staticmethod
+    def sum_modes_batch(modes: List[List["Modes"]], resonances: List[List[float]], fs: int = 44100) -> List[np.ndarray]:
+        """
+        Synthesize several sounds at once. Each sound is the sum of the modes of one or more `Modes` objects.
+
+        :param modes: A list of sounds. Each element is a list of `Modes` objects whose modes will be summed together.
+        :param resonances: The resonance of each `Modes` object in `modes`. This must have the same shape as `modes`.
+        :param fs: The framerate.
+
+        :return A list of synthesized sounds, one per element in `modes`.
+        """
+
+        num_sounds = len(modes)
+        counts = [sum([len(m.frequencies) for m in sound]) for sound in modes]
+        num_modes = max(counts) if num_sounds > 0 else 0
+        # Arrange the modes as (sounds, modes). Unused modes have zero length and zero amplitude.
+        frequencies = np.zeros((num_sounds, num_modes))
+        powers = np.zeros((num_sounds, num_modes))
+        decay_times = np.ones((num_sounds, num_modes))
+        mode_resonances = np.ones((num_sounds, num_modes))
+        lengths = np.zeros((num_sounds, num_modes), dtype=np.int64)
+        for i, (sound, rs) in enumerate(zip(modes, resonances)):
+            if counts[i] == 0:
+                continue
+            frequencies[i, :counts[i]] = np.concatenate([m.frequencies for m in sound])
+            powers[i, :counts[i]] = np.concatenate([m.powers for m in sound])
+            decay_times[i, :counts[i]] = np.concatenate([m.decay_times for m in sound])
+            mode_resonances[i, :counts[i]] = np.concatenate([np.full(len(m.frequencies), r) for m, r in zip(sound, rs)])
+            # The length of each mode is the time it takes to decay to -80 dB (regardless of the resonance).
+            lengths[i, :counts[i]] = np.maximum(np.ceil(decay_times[i, :counts[i]] * (80 + powers[i, :counts[i]]) / 60 / 1e3 * fs), 0)
+        amplitudes = np.where(lengths > 0, 10 ** (powers / 20), 0)
+        # Each mode is a damped oscillator: z^n, where z is a complex pole derived from the decay rate and frequency.
+        poles = np.exp(-(60 / (decay_times * mode_resonances / 1e3)) / 20 * math.log(10) / fs +
+                       1j * 2 * math.pi * frequencies / fs)
+        # Each mode within a block, stacked as [real; imaginary]: (sounds, 2 * modes, block size).
+        block_size = Modes._BLOCK_SIZE
+        oscillators = Modes._get_powers(poles, block_size)
+        oscillators = np.concatenate([oscillators.real, oscillators.imag], axis=1)
+        # The number of blocks per sound.
+        sound_lengths = lengths.max(axis=1) if num_modes > 0 else np.zeros(num_sounds, dtype=np.int64)
+        num_blocks = (sound_lengths + block_size - 1) // block_size
+        block_offsets = np.concatenate([[0], np.cumsum(num_blocks)])
+        block_sounds = np.repeat(np.arange(num_sounds), num_blocks)
+        block_indices = np.arange(block_offsets[-1]) - block_offsets[block_sounds]
+        # The state of each mode at the start of each block: (blocks, modes).
+        states = Modes._get_powers(poles ** block_size, int(num_blocks.max()) if num_sounds > 0 else 0)
+        states = (amplitudes[..., np.newaxis] * states)[block_sounds, :, block_indices]
+        states *= block_indices[:, np.newaxis] * block_size < lengths[block_sounds]
+        weights = np.concatenate([states.real, -states.imag], axis=1)
+        # Sum the modes in each block into a single buffer.
+        buffer = np.empty((block_offsets[-1], block_size))
+        for i in range(num_sounds):
+            b = slice(block_offsets[i], block_offsets[i + 1])
+            np.matmul(weights[b], oscillators[i], out=buffer[b])
+        # Remove each mode after it ends partway through a block.
+        sound_indices, mode_indices = np.nonzero(lengths % block_size > 0)
+        if len(sound_indices) > 0:
+            last_blocks = block_offsets[sound_indices] + lengths[sound_indices, mode_indices] // block_size
+            tails = weights[last_blocks, mode_indices, np.newaxis] * oscillators[sound_indices, mode_indices] + \
+                weights[last_blocks, num_modes + mode_indices, np.newaxis] * oscillators[sound_indices, num_modes + mode_indices]
+            tails *= np.arange(block_size) >= (lengths[sound_indices, mode_indices] % block_size)[:, np.newaxis]
+            # Sum the tails per block.
+            order = np.argsort(last_blocks, kind="stable")
+            blocks, indices = np.unique(last_blocks[order], return_index=True)
+            buffer[blocks] -= np.add.reduceat(tails[order], indices, axis=0)
+        buffer = buffer.reshape(-1)
+        return [buffer[block_offsets[i] * block_size: block_offsets[i] * block_size + sound_lengths[i]] for i in range(num_sounds)]
 
     @staticmethod
     def mode_add(a: np.ndarray, b: np.ndarray) -> np.ndarray:
@@ -80,3 +145,26 @@ class Modes:
             c = a.copy()
             c[:len(b)] += b
         return c
+
+    @staticmethod
+    def _get_powers(z: np.ndarray, n: int) -> np.ndarray:
+        """
+        :param z: A numpy array of complex numbers.
+        :param n: The number of powers.
+
+        :return: A numpy array with an additional last axis of length `n`: z^0, z^1, ..., z^(n - 1).
+        """
+
+        powers = np.empty(z.shape + (n,), dtype=np.complex128)
+        if n == 0:
+            return powers
+        powers[..., 0] = 1
+        # Double the number of powers per iteration: z^(i + j) = z^i * z^j
+        p = z[..., np.newaxis]
+        i = 1
+        while i < n:
+            j = min(i, n - i)
+            np.multiply(powers[..., :j], p, out=powers[..., i: i + j])
+            i += j
+            p = p * p
+        return powers
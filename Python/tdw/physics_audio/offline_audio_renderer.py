@@ -0,0 +1,186 @@
+from base64 import b64decode
+from concurrent.futures import ProcessPoolExecutor
+from json import loads
+from pathlib import Path
+from typing import List, Tuple, Iterable
+import wave
+import numpy as np
+from tdw.add_ons.py_impact import PyImpact
+from tdw.output_data_reader import OutputDataReader
+from tdw.audio_constants import SAMPLE_RATE, CHANNELS, SAMPLE_WIDTH
+from tdw.type_aliases import PATH
+
+
+class OfflineAudioRenderer:
+    """
+    This class is used only in PyImpact, which has been deprecated. See: [`Clatter`](../add_ons/clatter.md).
+
+    Render PyImpact audio from recorded output data without running the build. Each trial is a directory of frames saved by [`OutputDataWriter`](../add_ons/output_data_writer.md) (either as text files or, preferably, with `binary=True`). The frames must include the output data that PyImpact requests (see `PyImpact.get_initialization_commands()`): collisions and rigidbodies per frame and, in the first frame, the static data that PyImpact uses to derive each object's audio values (`StaticRigidbodies`, `SegmentationColors`, `Bounds`, etc.). The easiest way to do this is to add PyImpact to the controller before the first frame that `OutputDataWriter` records, so that the static output data is in the first recorded frame. If the static data is missing, rendering raises an exception.
+
+    Per trial, the frames are sent to a new [`PyImpact`](../add_ons/py_impact.md) add-on in order. Each sound that PyImpact generates starts at `frame * frame_duration` seconds; the sounds are mixed into a single mono .wav file. The position of each sound is ignored.
+
+    Trials are rendered in parallel in a pool of worker processes. Because physics isn't simulated again, the same recorded trials can be re-rendered with different audio parameters, for example different materials or amp values:
+
+    ```python
+    from tdw.physics_audio.offline_audio_renderer import OfflineAudioRenderer
+
+    renderer = OfflineAudioRenderer(frame_duration=0.01, num_workers=4, py_impact_parameters={"initial_amp": 0.8})
+    paths = renderer.render(trials=["D:/trials/0", "D:/trials/1"], output_directory="D:/audio")
+    ```
+    """
+
+    def __init__(self, frame_duration: float = 0.01, num_workers: int = 0, py_impact_parameters: dict = None, seed: int = 0):
+        """
+        :param frame_duration: The duration of each recorded frame in seconds. This is usually the physics time step multiplied by the number of physics steps per frame.
+        :param num_workers: The number of worker processes. If 0, trials are rendered one at a time in this process.
+        :param py_impact_parameters: If not None, these are parameters for the `PyImpact` constructor, for example: `{"initial_amp": 0.8, "static_audio_data_overrides": overrides}`. The values must be picklable. `rng` is ignored; see `seed`.
+        :param seed: The random seed. The random number generator of each trial's `PyImpact` is seeded with this and the index of the trial, so rendering the same trials again produces the same audio.
+        """
+
+        """:field
+        The duration of each recorded frame in seconds.
+        """
+        self.frame_duration: float = frame_duration
+        """:field
+        Parameters for the `PyImpact` constructor.
+        """
+        self.py_impact_parameters: dict = dict() if py_impact_parameters is None else py_impact_parameters
+        """:field
+        The random seed.
+        """
+        self.seed: int = seed
+        self._num_workers: int = num_workers
+
+    def render(self, trials: List[PATH], output_directory: PATH) -> List[Path]:
+        """
+        Render the audio of each trial and save it as a .wav file named after the trial directory, for example `trials/0` is saved as `<output_directory>/0.wav`.
+
+        :param trials: A list of paths to directories of recorded frames as strings or [`Path`](https://docs.python.org/3/library/pathlib.html).
+        :param output_directory: The output directory as a string or [`Path`](https://docs.python.org/3/library/pathlib.html). If this doesn't exist, it will be created.
+
+        :return: The path to each .wav file, in the same order as `trials`.
+        """
+
+        if isinstance(output_directory, str):
+            output_directory = Path(output_directory)
+        if not output_directory.exists():
+            output_directory.mkdir(parents=True)
+        jobs: List[Tuple[Path, Path, float, dict, List[int]]] = list()
+        for i, trial in enumerate(trials):
+            if isinstance(trial, str):
+                trial = Path(trial)
+            jobs.append((trial, output_directory.joinpath(trial.name + ".wav"), self.frame_duration,
+                         self.py_impact_parameters, [self.seed, i]))
+        if self._num_workers <= 0:
+            return [OfflineAudioRenderer._render_job(job) for job in jobs]
+        with ProcessPoolExecutor(max_workers=self._num_workers) as executor:
+            return list(executor.map(OfflineAudioRenderer._render_job, jobs))
+
+    def render_trial(self, trial: PATH, output_path: PATH, index: int = 0) -> Path:
+        """
+        Render the audio of a single trial in this process and save it as a .wav file.
+
+        :param trial: The path to a directory of recorded frames as a string or [`Path`](https://docs.python.org/3/library/pathlib.html).
+        :param output_path: The path to the .wav file as a string or [`Path`](https://docs.python.org/3/library/pathlib.html).
+        :param index: The index of the trial. This is used to seed the random number generator.
+
+        :return: The path to the .wav file.
+        """
+
+        if isinstance(trial, str):
+            trial = Path(trial)
+        if isinstance(output_path, str):
+            output_path = Path(output_path)
+        if not output_path.parent.exists():
+            output_path.parent.mkdir(parents=True)
+        return OfflineAudioRenderer._render_job((trial, output_path, self.frame_duration, self.py_impact_parameters,
+                                                 [self.seed, index]))
+
+    @staticmethod
+    def get_sounds(frames: Iterable[List[bytes]], frame_duration: float, py_impact: PyImpact) -> List[Tuple[int, np.ndarray]]:
+        """
+        Send recorded frames to PyImpact and get every sound that it generates.
+
+        :param frames: The recorded frames. Each frame is a list of bytes, equivalent to the return value of a `c.communicate(commands)` call.
+        :param frame_duration: The duration of each frame in seconds.
+        :param py_impact: The PyImpact add-on. This should be a new add-on, or an add-on that has just been reset. Its `frame_time` is set per frame.
+
+        :return: A list of sounds. Each element is a tuple: The index of the first sample of the sound and the sound as a numpy int16 array.
+        """
+
+        sounds: List[Tuple[int, np.ndarray]] = list()
+        for frame, resp in enumerate(frames):
+            # Use the time of the frame rather than the system time to set the minimum time between impact events.
+            py_impact.frame_time = frame * frame_duration
+            try:
+                py_impact.on_send(resp=resp)
+            except KeyError as e:
+                raise Exception(f"Failed to render frame {frame}: PyImpact doesn't have static audio data for {e}. "
+                                f"The first frame must include PyImpact's static output data; add PyImpact to the "
+                                f"controller before OutputDataWriter records the first frame of the trial.") from e
+            start = int(round(py_impact.frame_time * SAMPLE_RATE))
+            for command in py_impact.commands:
+                if "wav_data" in command:
+                    sounds.append((start, np.frombuffer(b64decode(command["wav_data"]), dtype=np.int16)))
+            # The commands would normally be sent to the build.
+            py_impact.commands.clear()
+        return sounds
+
+    @staticmethod
+    def mix(sounds: List[Tuple[int, np.ndarray]]) -> np.ndarray:
+        """
+        :param sounds: A list of sounds. Each element is a tuple: The index of the first sample of the sound and the sound as a numpy int16 array.
+
+        :return: The mixed sounds as a numpy int16 array. Samples are clipped to the 16-bit range.
+        """
+
+        length = max([start + len(sound) for start, sound in sounds], default=0)
+        mixed = np.zeros(length, dtype=np.int32)
+        for start, sound in sounds:
+            mixed[start: start + len(sound)] += sound
+        return np.clip(mixed, -32768, 32767).astype(np.int16)
+
+    @staticmethod
+    def get_frames(trial: PATH) -> Iterable[List[bytes]]:
+        """
+        :param trial: The path to a directory of frames saved by `OutputDataWriter` as a string or [`Path`](https://docs.python.org/3/library/pathlib.html).
+
+        :return: The recorded frames in order. Frames are read one at a time.
+        """
+
+        if isinstance(trial, str):
+            trial = Path(trial)
+        # Read a binary log.
+        if trial.joinpath(OutputDataReader.DATA_FILENAME).exists():
+            reader = OutputDataReader(path=trial)
+            try:
+                for i in range(len(reader)):
+                    yield reader.get_frame(i)
+            finally:
+                reader.close()
+        else:
+            for path in sorted(trial.glob("*.txt")):
+                yield [b64decode(r) for r in loads(path.read_text())]
+
+    @staticmethod
+    def _render_job(job: Tuple[Path, Path, float, dict, List[int]]) -> Path:
+        """
+        Render a trial. This is a static method so that it can be sent to a worker process.
+
+        :param job: A tuple: The trial directory, the output path, the frame duration, the PyImpact parameters, and the random seed.
+
+        :return: The output path.
+        """
+
+        trial, output_path, frame_duration, py_impact_parameters, seed = job
+        parameters = {k: v for k, v in py_impact_parameters.items() if k != "rng"}
+        py_impact = PyImpact(rng=np.random.RandomState(seed), **parameters)
+        mixed = OfflineAudioRenderer.mix(OfflineAudioRenderer.get_sounds(frames=OfflineAudioRenderer.get_frames(trial),
+                                                                         frame_duration=frame_duration,
+                                                                         py_impact=py_impact))
+        with wave.open(str(output_path.resolve()), "wb") as w:
+            w.setnchannels(CHANNELS)
+            w.setframerate(SAMPLE_RATE)
+            w.setsampwidth(SAMPLE_WIDTH)
+            w.writeframes(mixed.tobytes())
+        return output_path
@@ -1,5 +1,6 @@
 from typing import List, Dict
-from tdw.output_data import OutputData, Replicants
+from tdw.output_data import Replicants
+from tdw.response import Response
 from tdw.object_data.transform import Transform
 from tdw.replicant.collision_detection import CollisionDetection
 from tdw.replicant.action_status import ActionStatus
@@ -19,6 +20,7 @@ class ReplicantDynamic(AgentDynamic):
         :param frame_count: The current frame count.
         """
 
+        resp = Response.get_response(resp)
         super().__init__(resp=resp, agent_id=replicant_id, frame_count=frame_count)
 
         """:field
@@ -41,40 +43,38 @@ class ReplicantDynamic(AgentDynamic):
         self.output_data_status: ActionStatus = ActionStatus.ongoing
         self._frame_count: int = frame_count
         got_data = False
-        for i in range(len(resp) - 1):
-            r_id = OutputData.get_data_type_id(resp[i])
-            # Get replicant's data.
-            if r_id == "repl":
-                replicants = Replicants(resp[i])
-                for j in range(replicants.get_num()):
-                    object_id = replicants.get_id(j)
-                    # We found the ID of this replicant.
-                    if object_id == replicant_id:
-                        # Get the held objects.
-                        if replicants.get_is_holding_left(j):
-                            self.held_objects[Arm.left] = replicants.get_held_left(j)
-                        if replicants.get_is_holding_right(j):
-                            self.held_objects[Arm.right] = replicants.get_held_right(j)
-                        # Get the body part transforms.
-                        num_body_parts = replicants.get_num_body_parts()
-                        for k in range(num_body_parts - 1):
-                            # Cache the transform.
-                            body_part_id = replicants.get_body_part_id(j, k)
-                            self.body_parts[body_part_id] = Transform(position=replicants.get_body_part_position(j, k),
-                                                                      forward=replicants.get_body_part_forward(j, k),
-                                                                      rotation=replicants.get_body_part_rotation(j, k))
-                            # Get collisions.
-                            self.collisions[body_part_id] = list()
-                            for m in range(10):
-                                if replicants.get_is_collision(j, k, m):
-                                    self.collisions[body_part_id].append(replicants.get_collision_id(j, k, m))
-                        self.transform = Transform(position=replicants.get_position(j),
-                                                   rotation=replicants.get_rotation(j),
-                                                   forward=replicants.get_forward(j))
-                        self.output_data_status = replicants.get_status(j)
-                        # Get collision data.
-                        got_data = True
-                        break
+        # Get replicant's data.
+        replicants: Replicants
+        for replicants in resp.get_output_data("repl"):
+            for j in range(replicants.get_num()):
+                object_id = replicants.get_id(j)
+                # We found the ID of this replicant.
+                if object_id == replicant_id:
+                    # Get the held objects.
+                    if replicants.get_is_holding_left(j):
+                        self.held_objects[Arm.left] = replicants.get_held_left(j)
+                    if replicants.get_is_holding_right(j):
+                        self.held_objects[Arm.right] = replicants.get_held_right(j)
+                    # Get the body part transforms.
+                    num_body_parts = replicants.get_num_body_parts()
+                    for k in range(num_body_parts - 1):
+                        # Cache the transform.
+                        body_part_id = replicants.get_body_part_id(j, k)
+                        self.body_parts[body_part_id] = Transform(position=replicants.get_body_part_position(j, k),
+                                                                  forward=replicants.get_body_part_forward(j, k),
+                                                                  rotation=replicants.get_body_part_rotation(j, k))
+                        # Get collisions.
+                        self.collisions[body_part_id] = list()
+                        for m in range(10):
+                            if replicants.get_is_collision(j, k, m):
+                                self.collisions[body_part_id].append(replicants.get_collision_id(j, k, m))
+                    self.transform = Transform(position=replicants.get_position(j),
+                                               rotation=replicants.get_rotation(j),
+                                               forward=replicants.get_forward(j))
+                    self.output_data_status = replicants.get_status(j)
+                    # Get collision data.
+                    got_data = True
+                    break
             if got_data:
                 break
 
@@ -0,0 +1,238 @@
+from typing import List, Dict, Optional, Union
+from tdw.output_data import OutputData, SceneRegions, Transforms, Rigidbodies, StaticRigidbodies, Bounds, Images, \
+    AvatarKinematic, AvatarNonKinematic, AvatarSimpleBody, SegmentationColors, AvatarSegmentationColor, IsOnNavMesh, \
+    IdPassGrayscale, Collision, ImageSensors, CameraMatrices, IdPassSegmentationColors, FlexParticles, VRRig, \
+    OculusTouchButtons, StaticOculusTouch, LogMessage, Meshes, Substructure, Version, EnvironmentCollision, Volumes, \
+    AudioSources, AudioSourceDone, Raycast, Overlap, Containment, NavMeshPath, StaticRobot, RobotJointVelocities, \
+    DynamicRobots, Keyboard, ScreenPosition, Magnebot, TriggerCollision, LocalTransforms, QuitSignal, MagnebotWheels, \
+    Occlusion, Lights, Categories, StaticEmptyObjects, DynamicEmptyObjects, ObjectColliderIntersection, \
+    EnvironmentColliderIntersection, StaticCompositeObjects, DynamicCompositeObjects, ObiParticles, Mouse, \
+    TransformMatrices, AvatarTransformMatrices, FieldOfView, Replicants, LeapMotion, ReplicantSegmentationColors, \
+    Framerate, OccupancyMap, EulerAngles, Drones, AlbedoColors, Fove, Models, ObjectScales, PostProcess, Scene, \
+    ObjectIds, AvatarIds, FastAvatars, FastImageSensors, SystemInfo
+
+
+# Output data types per identifier. Key = The 4-character identifier. Value = The output data class.
+OUTPUT_DATA_TYPES: Dict[str, type] = {"acol": AlbedoColors,
+                                      "ausd": AudioSourceDone,
+                                      "audi": AudioSources,
+                                      "avki": AvatarKinematic,
+                                      "avnk": AvatarNonKinematic,
+                                      "avsc": AvatarSegmentationColor,
+                                      "avsb": AvatarSimpleBody,
+                                      "atrm": AvatarTransformMatrices,
+                                      "boun": Bounds,
+                                      "cama": CameraMatrices,
+                                      "cate": Categories,
+                                      "coll": Collision,
+                                      "cont": Containment,
+                                      "dron": Drones,
+                                      "dcom": DynamicCompositeObjects,
+                                      "dyem": DynamicEmptyObjects,
+                                      "drob": DynamicRobots,
+                                      "enci": EnvironmentColliderIntersection,
+                                      "enco": EnvironmentCollision,
+                                      "eule": EulerAngles,
+                                      "fofv": FieldOfView,
+                                      "flex": FlexParticles,
+                                      "fove": Fove,
+                                      "fram": Framerate,
+                                      "idgs": IdPassGrayscale,
+                                      "ipsc": IdPassSegmentationColors,
+                                      "imag": Images,
+                                      "imse": ImageSensors,
+                                      "isnm": IsOnNavMesh,
+                                      "keyb": Keyboard,
+                                      "leap": LeapMotion,
+                                      "ligh": Lights,
+                                      "ltra": LocalTransforms,
+                                      "logm": LogMessage,
+                                      "magn": Magnebot,
+                                      "mwhe": MagnebotWheels,
+                                      "mesh": Meshes,
+                                      "mode": Models,
+                                      "mous": Mouse,
+                                      "path": NavMeshPath,
+                                      "obip": ObiParticles,
+                                      "obci": ObjectColliderIntersection,
+                                      "osca": ObjectScales,
+                                      "occl": Occlusion,
+                                      "occu": OccupancyMap,
+                                      "octb": OculusTouchButtons,
+                                      "over": Overlap,
+                                      "post": PostProcess,
+                                      "quit": QuitSignal,
+                                      "rayc": Raycast,
+                                      "repl": Replicants,
+                                      "rseg": ReplicantSegmentationColors,
+                                      "rigi": Rigidbodies,
+                                      "rojv": RobotJointVelocities,
+                                      "scen": Scene,
+                                      "sreg": SceneRegions,
+                                      "scre": ScreenPosition,
+                                      "segm": SegmentationColors,
+                                      "scom": StaticCompositeObjects,
+                                      "stem": StaticEmptyObjects,
+                                      "soct": StaticOculusTouch,
+                                      "srig": StaticRigidbodies,
+                                      "srob": StaticRobot,
+                                      "subs": Substructure,
+                                      "syst": SystemInfo,
+                                      "trma": TransformMatrices,
+                                      "tran": Transforms,
+                                      "trco": TriggerCollision,
+                                      "vers": Version,
+                                      "volu": Volumes,
+                                      "vrri": VRRig,
+                                      "avid": AvatarIds,
+                                      "fava": FastAvatars,
+                                      "fims": FastImageSensors,
+                                      "obid": ObjectIds}
+
+
+class Response(list):
+    """
+    The response from the build, indexed by output data type.
+
+    This is a list of byte arrays, exactly like the list that `Controller.communicate(commands)` has always returned: the last element is the frame number. The list is indexed *once* by the 4-character output data identifier, and each output data object is deserialized the first time it is requested and then cached. This way, every add-on that reads the same output data (such as `Transforms`) will share the same deserialized object rather than each add-on deserializing it again.
+
+    `Controller.communicate(commands)` returns a `Response`, and each add-on's `on_send(resp)` receives the same `Response`.
+
+    ```python
+    from tdw.controller import Controller
+
+    c = Controller()
+    resp = c.communicate({"$type": "send_transforms"})
+    for transforms in resp.get_output_data("tran"):
+        for i in range(transforms.get_num()):
+            print(transforms.get_id(i), transforms.get_position(i))
+    c.communicate({"$type": "terminate"})
+    ```
+
+    The output data objects are shared. Treat them as read-only.
+    """
+
+    def __init__(self, resp: List[bytes]):
+        """
+        :param resp: The response from the build.
+        """
+
+        super().__init__(resp)
+        # The indices of each output data type. Key = The output data identifier.
+        self._indices: Dict[str, List[int]] = dict()
+        for i in range(len(resp) - 1):
+            r_id = OutputData.get_data_type_id(resp[i])
+            if r_id in self._indices:
+                self._indices[r_id].append(i)
+            else:
+                self._indices[r_id] = [i]
+        # Cached output data objects. Key = The index in the response.
+        self._output_data: Dict[int, object] = dict()
+
+    @staticmethod
+    def get_response(resp: Union[List[bytes], "Response"]) -> "Response":
+        """
+        :param resp: The response from the build. This can be either a `Response` or a list of byte arrays.
+
+        :return: `resp` if it is already a `Response`, or a new `Response` if not.
+        """
+
+        if isinstance(resp, Response):
+            return resp
+        else:
+            return Response(resp)
+
+    def get_frame(self) -> int:
+        """
+        :return: The frame number.
+        """
+
+        return int.from_bytes(self[-1], byteorder='big')
+
+    def get_data_type_ids(self) -> List[str]:
+        """
+        :return: The identifiers of each type of output data in the response.
+        """
+
+        return list(self._indices.keys())
+
+    def has(self, r_id: str) -> bool:
+        """
+        :param r_id: The output data identifier, for example `"tran"`.
+
+        :return: True if the response includes at least one of this type of output data.
+        """
+
+        return r_id in self._indices
+
+    def get_num(self, r_id: str) -> int:
+        """
+        :param r_id: The output data identifier, for example `"tran"`.
+
+        :return: The number of output data objects of this type in the response.
+        """
+
+        if r_id in self._indices:
+            return len(self._indices[r_id])
+        else:
+            return 0
+
+    def get_indices(self, r_id: str) -> List[int]:
+        """
+        :param r_id: The output data identifier, for example `"tran"`.
+
+        :return: The index of each output data object of this type in the response.
+        """
+
+        if r_id in self._indices:
+            return self._indices[r_id]
+        else:
+            return []
+
+    def get_bytes(self, r_id: str) -> List[bytes]:
+        """
+        :param r_id: The output data identifier, for example `"tran"`.
+
+        :return: The serialized byte arrays of each output data object of this type in the response.
+        """
+
+        return [self[i] for i in self.get_indices(r_id)]
+
+    def get_output_data(self, r_id: str) -> list:
+        """
+        Get each output data object of a type. The first time an output data object is requested, it will be deserialized and cached.
+
+        :param r_id: The output data identifier, for example `"tran"`.
+
+        :return: A list of output data objects of this type, for example a list of `Transforms`. This list is empty if there isn't any output data of this type.
+        """
+
+        if r_id not in self._indices:
+            return []
+        if r_id not in OUTPUT_DATA_TYPES:
+            raise Exception(f"Undefined output data type: {r_id}")
+        output_data_type = OUTPUT_DATA_TYPES[r_id]
+        output_data = list()
+        for i in self._indices[r_id]:
+            if i not in self._output_data:
+                self._output_data[i] = output_data_type(self[i])
+            output_data.append(self._output_data[i])
+        return output_data
+
+    def get_first(self, r_id: str) -> Optional[object]:
+        """
+        Get the first output data object of a type. The first time an output data object is requested, it will be deserialized and cached.
+
+        :param r_id: The output data identifier, for example `"tran"`.
+
+        :return: The first output data object of this type, for example `Transforms`. If there isn't any output data of this type, this is None.
+        """
+
+        if r_id not in self._indices:
+            return None
+        if r_id not in OUTPUT_DATA_TYPES:
+            raise Exception(f"Undefined output data type: {r_id}")
+        i = self._indices[r_id][0]
+        if i not in self._output_data:
+            self._output_data[i] = OUTPUT_DATA_TYPES[r_id](self[i])
+        return self._output_data[i]